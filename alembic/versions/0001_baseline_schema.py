@@ -0,0 +1,113 @@
+"""baseline schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-16 09:00:00.000000
+
+Existing databases created by Base.metadata.create_all already match this
+revision; mark them with `alembic stamp 0001` before upgrading.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'players',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('matches', sa.Integer(), nullable=True),
+        sa.Column('rating', sa.Integer(), nullable=True),
+        sa.Column('handedness', sa.String(length=10), nullable=True),
+        sa.Column('forehand_rubber', sa.String(length=100), nullable=True),
+        sa.Column('backhand_rubber', sa.String(length=100), nullable=True),
+        sa.Column('blade', sa.String(length=100), nullable=True),
+        sa.Column('age', sa.Integer(), nullable=True),
+        sa.Column('gender', sa.String(length=10), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_players_id', 'players', ['id'])
+
+    op.create_table(
+        'tournaments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('knockout_size', sa.Integer(), nullable=True),
+        sa.Column('num_players', sa.Integer(), nullable=False),
+        sa.Column('num_groups', sa.Integer(), nullable=False),
+        sa.Column('players_advance_per_group', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.Date(), nullable=False),
+        sa.Column('is_customized', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tournaments_id', 'tournaments', ['id'])
+
+    op.create_table(
+        'matches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tournament_id', sa.Integer(), sa.ForeignKey('tournaments.id'), nullable=True),
+        sa.Column('player1_id', sa.Integer(), sa.ForeignKey('players.id'), nullable=False),
+        sa.Column('player2_id', sa.Integer(), sa.ForeignKey('players.id'), nullable=True),
+        sa.Column('player1_score', sa.Integer(), nullable=True),
+        sa.Column('player2_score', sa.Integer(), nullable=True),
+        sa.Column('winner_id', sa.Integer(), sa.ForeignKey('players.id'), nullable=True),
+        sa.Column('round', sa.String(length=50), nullable=True),
+        sa.Column('stage', sa.String(length=20), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_matches_id', 'matches', ['id'])
+
+    op.create_table(
+        'tournament_standings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tournament_id', sa.Integer(), sa.ForeignKey('tournaments.id'), nullable=False),
+        sa.Column('player_id', sa.Integer(), sa.ForeignKey('players.id'), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tournament_standings_id', 'tournament_standings', ['id'])
+
+    op.create_table(
+        'tournament_players',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tournament_id', sa.Integer(), sa.ForeignKey('tournaments.id'), nullable=False),
+        sa.Column('player_id', sa.Integer(), sa.ForeignKey('players.id'), nullable=False),
+        sa.Column('group_number', sa.Integer(), nullable=False),
+        sa.Column('seed', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tournament_players_id', 'tournament_players', ['id'])
+
+    op.create_table(
+        'set_scores',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('match_id', sa.Integer(), sa.ForeignKey('matches.id'), nullable=True),
+        sa.Column('set_number', sa.Integer(), nullable=True),
+        sa.Column('player1_score', sa.Integer(), nullable=True),
+        sa.Column('player2_score', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_set_scores_id', 'set_scores', ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('set_scores')
+    op.drop_table('tournament_players')
+    op.drop_table('tournament_standings')
+    op.drop_table('matches')
+    op.drop_table('tournaments')
+    op.drop_table('players')
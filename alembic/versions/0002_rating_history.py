@@ -0,0 +1,44 @@
+"""rating history table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'rating_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('player_id', sa.Integer(), sa.ForeignKey('players.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('match_id', sa.Integer(), sa.ForeignKey('matches.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('match_timestamp', sa.DateTime(), nullable=False),
+        sa.Column('rating_before', sa.Integer(), nullable=False),
+        sa.Column('rating_after', sa.Integer(), nullable=False),
+        sa.Column('k_factor', sa.SmallInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_rating_history_player_timestamp',
+        'rating_history',
+        ['player_id', 'match_timestamp', 'match_id', 'rating_before', 'rating_after', 'k_factor'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rating_history_player_timestamp', table_name='rating_history')
+    op.drop_table('rating_history')
@@ -0,0 +1,35 @@
+"""match keyset pagination indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_matches_timestamp_id', 'matches', ['timestamp', 'id'])
+    op.create_index('ix_matches_player1_timestamp', 'matches', ['player1_id', 'timestamp', 'id'])
+    op.create_index('ix_matches_player2_timestamp', 'matches', ['player2_id', 'timestamp', 'id'])
+    op.create_index('ix_matches_tournament_stage', 'matches', ['tournament_id', 'stage'])
+    op.create_index('ix_set_scores_match_id', 'set_scores', ['match_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_set_scores_match_id', table_name='set_scores')
+    op.drop_index('ix_matches_tournament_stage', table_name='matches')
+    op.drop_index('ix_matches_player2_timestamp', table_name='matches')
+    op.drop_index('ix_matches_player1_timestamp', table_name='matches')
+    op.drop_index('ix_matches_timestamp_id', table_name='matches')
@@ -0,0 +1,44 @@
+"""head-to-head aggregate table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 10:30:00.000000
+
+Populate existing data with `python rebuild_head_to_head.py` after upgrading.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'head_to_head',
+        sa.Column('player_low_id', sa.Integer(), sa.ForeignKey('players.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('player_high_id', sa.Integer(), sa.ForeignKey('players.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('matches_played', sa.Integer(), nullable=False),
+        sa.Column('low_wins', sa.Integer(), nullable=False),
+        sa.Column('high_wins', sa.Integer(), nullable=False),
+        sa.Column('low_sets', sa.Integer(), nullable=False),
+        sa.Column('high_sets', sa.Integer(), nullable=False),
+        sa.Column('low_points', sa.Integer(), nullable=False),
+        sa.Column('high_points', sa.Integer(), nullable=False),
+        sa.Column('last_match_at', sa.DateTime(), nullable=True),
+        sa.Column('last_winner_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('player_low_id', 'player_high_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('head_to_head')
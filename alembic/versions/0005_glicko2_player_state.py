@@ -0,0 +1,35 @@
+"""glicko-2 player state
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('players', sa.Column('rating_deviation', sa.Float(), nullable=False, server_default='350'))
+    op.add_column('players', sa.Column('volatility', sa.Float(), nullable=False, server_default='0.06'))
+    op.add_column('players', sa.Column('rated_at', sa.DateTime(), nullable=True))
+    op.alter_column('rating_history', 'k_factor', existing_type=sa.SmallInteger(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE rating_history SET k_factor = 0 WHERE k_factor IS NULL")
+    op.alter_column('rating_history', 'k_factor', existing_type=sa.SmallInteger(), nullable=False)
+    op.drop_column('players', 'rated_at')
+    op.drop_column('players', 'volatility')
+    op.drop_column('players', 'rating_deviation')
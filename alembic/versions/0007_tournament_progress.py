@@ -0,0 +1,51 @@
+"""tournament progress counters
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'tournament_progress',
+        sa.Column('tournament_id', sa.Integer(), sa.ForeignKey('tournaments.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('group_total', sa.Integer(), nullable=False),
+        sa.Column('group_completed', sa.Integer(), nullable=False),
+        sa.Column('knockout_total', sa.Integer(), nullable=False),
+        sa.Column('knockout_completed', sa.Integer(), nullable=False),
+        sa.Column('knockout_generated', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('tournament_id'),
+    )
+    # Backfill from the existing matches
+    op.execute("""
+        INSERT INTO tournament_progress
+            (tournament_id, group_total, group_completed, knockout_total, knockout_completed, knockout_generated)
+        SELECT t.id,
+               COALESCE(SUM(CASE WHEN m.stage = 'group' THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN m.stage = 'group' AND m.winner_id IS NOT NULL THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN m.stage = 'knockout' THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN m.stage = 'knockout' AND m.winner_id IS NOT NULL THEN 1 ELSE 0 END), 0),
+               CASE WHEN SUM(CASE WHEN m.stage = 'knockout' THEN 1 ELSE 0 END) > 0 THEN 1 ELSE 0 END
+        FROM tournaments t
+        LEFT JOIN matches m ON m.tournament_id = t.id
+        GROUP BY t.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('tournament_progress')
@@ -0,0 +1,44 @@
+"""knockout bracket links
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16 17:00:00.000000
+
+Knockout stages generated before this revision have no links; finish them (or reset the
+tournament) before upgrading.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('matches', 'player1_id', existing_type=sa.Integer(), nullable=True)
+    op.add_column('matches', sa.Column('next_match_id', sa.Integer(), nullable=True))
+    op.add_column('matches', sa.Column('next_slot', sa.SmallInteger(), nullable=True))
+    op.add_column('matches', sa.Column('loser_next_match_id', sa.Integer(), nullable=True))
+    op.add_column('matches', sa.Column('loser_next_slot', sa.SmallInteger(), nullable=True))
+    op.create_foreign_key('fk_matches_next_match', 'matches', 'matches', ['next_match_id'], ['id'], ondelete='SET NULL')
+    op.create_foreign_key('fk_matches_loser_next_match', 'matches', 'matches', ['loser_next_match_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_matches_loser_next_match', 'matches', type_='foreignkey')
+    op.drop_constraint('fk_matches_next_match', 'matches', type_='foreignkey')
+    op.drop_column('matches', 'loser_next_slot')
+    op.drop_column('matches', 'loser_next_match_id')
+    op.drop_column('matches', 'next_slot')
+    op.drop_column('matches', 'next_match_id')
+    op.execute("DELETE FROM matches WHERE player1_id IS NULL")
+    op.alter_column('matches', 'player1_id', existing_type=sa.Integer(), nullable=False)
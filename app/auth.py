@@ -1,8 +1,14 @@
 from fastapi import Depends, HTTPException, status, Request, APIRouter
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from collections import OrderedDict
+import hashlib
+import logging
 import os
+import threading
+import time
+
+from app.metrics import Counter
 
 # 🔐 Load secrets from environment
 SECRET_KEY = os.getenv("SECRET_KEY", "fallback_key")
@@ -24,39 +30,106 @@ if not ADMIN_USERNAME or not ADMIN_PASSWORD:
 # 🔐 Token auth config
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+logger = logging.getLogger(__name__)
+
+
+# python-jose loads its crypto backends on import (~50ms), so it's imported on first use
+# instead of on every worker boot
+class InvalidToken(Exception):
+    """jose's JWTError, re-raised so the validators don't need jose imported."""
+
+
 # 🔐 Token creation
 def create_access_token(data: dict, expires_delta: timedelta):
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.utcnow() + expires_delta
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+class TokenCache:
+    """LRU of verified tokens (by SHA-256 digest) -> decoded payload, dropped once the token expires."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+        self.expired = Counter()
+
+    def get(self, token: str):
+        key = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits.inc()
+                    return payload
+                del self._entries[key]
+                self.expired.inc()
+        self.misses.inc()
+        return None
+
+    def put(self, token: str, payload: dict):
+        key = hashlib.sha256(token.encode()).digest()
+        expires_at = payload.get("exp")
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {
+            "size": len(self._entries),
+            "hits": self.hits.value,
+            "misses": self.misses.value,
+            "expired": self.expired.value,
+        }
+
+
+token_cache = TokenCache(maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "1024")))
+
+
+def decode_token(token: str) -> dict:
+    """jwt.decode with a cache in front: a scorer's tablet sends the same token all day."""
+    payload = token_cache.get(token)
+    if payload is None:
+        from jose import JWTError, jwt
+
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError as e:
+            raise InvalidToken(str(e)) from e
+        token_cache.put(token, payload)
+    return payload
+
 # ✅ Auth validators
 async def is_admin(token: str = Depends(oauth2_scheme)):
-    print("🧠 is_admin() called")
-    print(f"🔐 Raw token: {token}")
-
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        print(f"✅ Decoded JWT payload: {payload}")
+        payload = decode_token(token)
 
         if payload.get("role") != "admin":
-            print("❌ Access denied: role is not admin")
+            logger.info("Access denied for %s: role is not admin", payload.get("sub"))
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden: Admins only")
 
         return payload
-    except JWTError as e:
-        print(f"❌ JWT decode error: {e}")
+    except InvalidToken as e:
+        logger.debug("JWT decode error: %s", e)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Login to change details")
 
 def verify_admin(token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username != ADMIN_USERNAME:
             raise HTTPException(status_code=403, detail="Admin access required")
         return username
-    except JWTError:
+    except InvalidToken:
         raise HTTPException(status_code=403, detail="Invalid token")
 
 # 🚪 Auth endpoints
@@ -64,7 +137,7 @@ router = APIRouter()
 
 @router.post("/token")
 async def login_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    print("DEBUG: Login attempt with", form_data.username, form_data.password)
+    logger.info("Login attempt for %s", form_data.username)
     if form_data.username != ADMIN_USERNAME or form_data.password != ADMIN_PASSWORD:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
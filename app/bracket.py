@@ -0,0 +1,210 @@
+import logging
+
+from sqlalchemy import delete, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Match, TournamentStanding
+from app import tournament_progress
+
+# Knockout brackets as linked matches. The whole bracket is created up front; every match points at
+# the slot its winner moves into (next_match_id/next_slot) and the semifinals also point their
+# losers at the 3rd place match, so a result fills the following slot directly.
+
+logger = logging.getLogger(__name__)
+
+FINAL = "Final"
+THIRD_PLACE = "3rd Place Match"
+
+
+def round_name(size: int) -> str:
+    return FINAL if size == 2 else f"Round of {size}"
+
+
+def loser_of(match):
+    if match.winner_id is None:
+        return None
+    return match.player2_id if match.winner_id == match.player1_id else match.player1_id
+
+
+def _walkover(match, player_id):
+    # A missing opponent is a bye: the present player advances with a 1-0 walkover
+    match.player1_id, match.player2_id = player_id, None
+    match.winner_id = player_id
+    match.player1_score, match.player2_score = 1, 0
+
+
+def _fill(match, slot, player_id):
+    if slot == 1:
+        match.player1_id = player_id
+    else:
+        match.player2_id = player_id
+
+
+def _settle(match, feeds):
+    """Place decided feeders' players; with every feeder decided and a player short, it's a walkover.
+
+    feeds = [(slot, feeder, player)]. Returns False when nobody can reach the match.
+    """
+    for slot, feeder, player in feeds:
+        if feeder.winner_id is not None:
+            _fill(match, slot, player)
+    if all(feeder.winner_id is not None for _, feeder, _ in feeds) and not (match.player1_id and match.player2_id):
+        present = match.player1_id or match.player2_id
+        if present is None:
+            return False
+        _walkover(match, present)
+    return True
+
+
+def build(tournament_id: int, first_round):
+    """Every knockout Match for first_round [(player1, player2), ...], linked through to the Final.
+
+    first_round holds knockout_size / 2 pairs with None for an empty slot. Byes are decided here
+    and matches nobody can reach are left out; add the result to the session and flush once.
+    """
+    def new(name):
+        return Match(tournament_id=tournament_id, round=name, stage="knockout")
+
+    size = len(first_round) * 2
+    current = []
+    for pair in first_round:
+        present = [pid for pid in pair if pid]
+        if not present:
+            current.append(None)
+            continue
+        match = new(round_name(size))
+        match.player1_id = present[0]
+        if len(present) == 2:
+            match.player2_id = present[1]
+        else:
+            _walkover(match, present[0])
+        current.append(match)
+    matches = [m for m in current if m is not None]
+
+    while len(current) > 1:
+        if len(current) == 2 and all(current):
+            third = new(THIRD_PLACE)
+            for slot, semi in enumerate(current, 1):
+                semi.loser_next_match, semi.loser_next_slot = third, slot
+            if _settle(third, [(slot, semi, loser_of(semi)) for slot, semi in enumerate(current, 1)]):
+                matches.append(third)
+            else:
+                for semi in current:
+                    semi.loser_next_match = semi.loser_next_slot = None
+
+        size //= 2
+        following = []
+        for a, b in zip(current[::2], current[1::2]):
+            if a is None and b is None:
+                following.append(None)
+                continue
+            match = new(round_name(size))
+            feeds = []
+            for slot, feeder in ((1, a), (2, b)):
+                if feeder is not None:
+                    feeder.next_match, feeder.next_slot = match, slot
+                    feeds.append((slot, feeder, feeder.winner_id))
+            _settle(match, feeds)
+            following.append(match)
+            matches.append(match)
+        current = following
+
+    return matches
+
+
+async def _pending_feeders(db: AsyncSession, match_id: int) -> int:
+    return await db.scalar(
+        select(func.count())
+        .select_from(Match)
+        .where(or_(Match.next_match_id == match_id, Match.loser_next_match_id == match_id))
+        .where(Match.winner_id.is_(None))
+    )
+
+
+async def advance(db: AsyncSession, match_id: int):
+    """Move a decided match's winner (and loser) into their linked slots, inside the caller's transaction."""
+    match = await db.get(Match, match_id, populate_existing=True)
+    if match is None or match.winner_id is None:
+        return
+
+    links = ((match.next_match_id, match.next_slot, match.winner_id),
+             (match.loser_next_match_id, match.loser_next_slot, loser_of(match)))
+    if not any(target_id for target_id, _, _ in links):
+        await finish(db, match.tournament_id)
+        return
+
+    for target_id, slot, player_id in links:
+        if target_id is None:
+            continue
+        target = await db.get(Match, target_id, with_for_update=True, populate_existing=True)
+        if target.winner_id is not None:
+            if player_id not in (target.player1_id, target.player2_id):
+                logger.warning("Match %s already has a result; not moving player %s into it", target_id, player_id)
+            continue
+        _fill(target, slot, player_id)
+        await db.flush()
+        if target.player1_id and target.player2_id:
+            continue
+        if await _pending_feeders(db, target_id):
+            continue
+
+        present = target.player1_id or target.player2_id
+        if present is None:
+            # Both feeders were walkovers, so there is nobody to play for 3rd place
+            await db.delete(target)
+            await db.flush()
+            await tournament_progress.recount(db, match.tournament_id)
+            await finish(db, match.tournament_id)
+            continue
+        _walkover(target, present)
+        await db.flush()
+        await tournament_progress.record_result(db, target.tournament_id, target.stage, False)
+        await advance(db, target_id)
+
+
+async def finish(db: AsyncSession, tournament_id: int):
+    """Write the final standings once the Final (and the 3rd place match, if any) are decided."""
+    result = await db.execute(
+        select(Match)
+        .where(Match.tournament_id == tournament_id, Match.stage == "knockout")
+        .where(Match.round.in_((FINAL, THIRD_PLACE)))
+        .execution_options(populate_existing=True)
+    )
+    by_round = {m.round: m for m in result.scalars().all()}
+    final, third = by_round.get(FINAL), by_round.get(THIRD_PLACE)
+    if final is None or final.winner_id is None or (third is not None and third.winner_id is None):
+        return
+
+    placings = [final.winner_id, loser_of(final)]
+    if third is not None:
+        placings += [third.winner_id, loser_of(third)]
+
+    # A corrected Final or 3rd place result replaces the standings
+    await db.execute(delete(TournamentStanding).where(TournamentStanding.tournament_id == tournament_id))
+    db.add_all([
+        TournamentStanding(tournament_id=tournament_id, player_id=player_id, position=position)
+        for position, player_id in enumerate(placings, 1)
+        if player_id
+    ])
+    logger.info("Tournament %s: final standings saved: %s", tournament_id, placings)
+
+
+async def replay(db: AsyncSession, tournament_id: int):
+    """Re-run slot filling for every decided knockout match, earliest round first."""
+    result = await db.execute(
+        select(Match.id, Match.next_match_id, Match.winner_id)
+        .where(Match.tournament_id == tournament_id, Match.stage == "knockout")
+    )
+    rows = result.all()
+    next_of = {row.id: row.next_match_id for row in rows}
+
+    def depth(match_id):
+        steps = 0
+        while next_of.get(match_id) is not None:
+            match_id = next_of[match_id]
+            steps += 1
+        return steps
+
+    for row in sorted((r for r in rows if r.winner_id is not None), key=lambda r: -depth(r.id)):
+        await advance(db, row.id)
@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+import orjson
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Player
+from app import invalidation
+
+
+def encode_json(content) -> bytes:
+    # ✅ orjson: the same compact UTF-8 output as starlette's JSONResponse, several times faster.
+    # Non-str keys are stringified like json.dumps does
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    """JSON encoded once with orjson, skipping FastAPI's jsonable_encoder pass.
+
+    Return it from endpoints whose rows are already plain JSON types; bytes content is taken
+    as a pre-encoded payload (e.g. from a cache) and sent as is.
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return encode_json(content)
+
+
+def etag_matches(if_none_match, etag) -> bool:
+    if not if_none_match or not etag:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+class RankingsCache:
+    """Pre-serialized /rankings payload, kept in sync by the write endpoints.
+
+    The worker that handles a write patches its snapshot in place; every other worker
+    sees the RANKINGS topic move on the invalidation bus and reloads.
+    """
+
+    def __init__(self, bus=None):
+        self._order = None  # sorted (-rating, id) keys
+        self._keys = {}  # player id -> sort key
+        self._rows = {}  # player id -> encoded JSON object
+        self._payload = None
+        self._etag = None
+        self._generation = 0  # bumped by every write so a racing load can retry
+        self._lock = asyncio.Lock()
+        self._watch = (bus or invalidation.bus).watch(invalidation.RANKINGS)
+
+    @property
+    def loaded(self):
+        return self._order is not None
+
+    async def get(self, db: AsyncSession):
+        if self._payload is not None and self._watch.changed():
+            self._reset()
+        if self._payload is None:
+            async with self._lock:
+                if self._payload is None:
+                    versions = self._watch.current()
+                    await self._load(db)
+                    self._watch.mark(versions)
+        return self._payload, self._etag
+
+    async def _load(self, db: AsyncSession):
+        while True:
+            generation = self._generation
+            result = await db.execute(select(Player.id, Player.name, Player.rating, Player.matches))
+            rows = result.all()
+            if generation == self._generation:
+                break
+        self._keys, self._rows = {}, {}
+        for row in rows:
+            self._set_row(row.id, row.name, row.rating, row.matches)
+        self._order = sorted(self._keys.values())
+        self._render()
+
+    def _set_row(self, player_id, name, rating, matches):
+        key = (-(rating or 0), player_id)
+        self._keys[player_id] = key
+        self._rows[player_id] = encode_json({"name": name, "rating": rating, "matches": matches})
+        return key
+
+    def _put(self, player_id, name, rating, matches):
+        insort(self._order, self._set_row(player_id, name, rating, matches))
+
+    def _drop(self, player_id):
+        key = self._keys.pop(player_id, None)
+        if key is None:
+            return
+        del self._rows[player_id]
+        del self._order[bisect_left(self._order, key)]
+
+    def _render(self):
+        self._payload = b"[" + b",".join(self._rows[pid] for _, pid in self._order) + b"]"
+        self._etag = f'"{hashlib.blake2b(self._payload, digest_size=12).hexdigest()}"'
+
+    def _publish(self):
+        seen = self._watch.seen
+        version = self._watch.bus.publish(invalidation.RANKINGS)
+        # Our own patch is already applied; only skip the reload if nobody else wrote in between
+        if self.loaded and seen == (version - 1,):
+            self._watch.mark((version,))
+
+    def patch(self, players):
+        """Update the snapshot in place from (id, name, rating, matches) tuples."""
+        self._generation += 1
+        if self.loaded:
+            for player_id, name, rating, matches in players:
+                self._drop(player_id)
+                self._put(player_id, name, rating, matches)
+            self._render()
+        self._publish()
+
+    def remove(self, player_id):
+        self._generation += 1
+        if self.loaded:
+            self._drop(player_id)
+            self._render()
+        self._publish()
+
+    def _reset(self):
+        self._generation += 1
+        self._order = None
+        self._keys, self._rows = {}, {}
+        self._payload = None
+        self._etag = None
+
+    def invalidate(self):
+        self._reset()
+        self._watch.bus.publish(invalidation.RANKINGS)
+
+
+class TopicCache:
+    """Small LRU of values that stay valid until one of their invalidation topics moves."""
+
+    def __init__(self, maxsize=64, bus=None):
+        self.maxsize = maxsize
+        self._bus = bus or invalidation.bus
+        self._entries = OrderedDict()
+
+    def versions(self, topics):
+        return tuple(self._bus.version(t) for t in topics)
+
+    def get(self, key, topics):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        versions, value = entry
+        if versions != self.versions(topics):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key, versions, value):
+        # versions must be read before the data was queried, so a concurrent write forces a rebuild
+        self._entries[key] = (versions, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+rankings_cache = RankingsCache()
+tournament_details_cache = TopicCache(maxsize=64)
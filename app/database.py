@@ -1,16 +1,101 @@
+import time
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 import os
 from dotenv import load_dotenv
 
+from app.metrics import Histogram, Counter
+
 load_dotenv()  # Optional if you're also running locally with a .env file
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout takes and how often it had to wait."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_latency = Histogram()
+        self.wait_latency = Histogram()
+        self.timeouts = Counter()
+        self._pending = 0
+
+    def _do_get(self):
+        # At capacity, a checkout waits once every idle connection is already spoken for by an
+        # earlier checkout (the async queue only hands items out after the next loop iteration)
+        must_wait = -1 < self._max_overflow <= self._overflow and self._pending >= self._pool.qsize()
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts.inc()
+            raise
+        finally:
+            self._pending -= 1
+            elapsed = time.perf_counter() - start
+            self.checkout_latency.observe(elapsed)
+            if must_wait:
+                self.wait_latency.observe(elapsed)
+
+    def recreate(self):
+        # Keep the histograms when the engine recreates its pool (e.g. after dispose())
+        pool = super().recreate()
+        pool.checkout_latency, pool.wait_latency, pool.timeouts = self.checkout_latency, self.wait_latency, self.timeouts
+        return pool
+
+    def stats(self):
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": self.overflow(),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            "timeouts": self.timeouts.value,
+            "checkout_latency_seconds": self.checkout_latency.snapshot(),
+            "wait_latency_seconds": self.wait_latency.snapshot(),
+        }
+
+
+def engine_options(url: str) -> dict:
+    # ✅ SQL logging is opt-in; it used to log every statement in production
+    options = {"echo": env_bool("DB_ECHO", False)}
+    if url.startswith("sqlite"):
+        # SQLite picks its own pool (StaticPool for :memory:), pool sizing doesn't apply
+        return options
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # Cloud SQL / MySQL drop idle connections after wait_timeout, recycle before that
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=env_bool("DB_POOL_PRE_PING", True),
+    )
+    return options
+
+
 # ✅ Use create_async_engine for async operations
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+
+
+def pool_stats():
+    pool = engine.pool
+    if isinstance(pool, InstrumentedPool):
+        return pool.stats()
+    return {"pool": type(pool).__name__, "status": pool.status()}
 
 # ✅ Create an async session
 SessionLocal = sessionmaker(
@@ -27,6 +112,6 @@ Base = declarative_base()
 async def get_db():
     async with SessionLocal() as session:
         yield session
-        
+
 
 async_session = SessionLocal
@@ -1,11 +1,16 @@
+# K-factor schedule: 40 for the first 10 games, 24 up to 200 games, 16 after that
+K_THRESHOLDS = (10, 200)
+K_VALUES = (40, 24, 16)
+
+def k_factor(games_played):
+    for threshold, K in zip(K_THRESHOLDS, K_VALUES):
+        if games_played <= threshold:
+            return K
+    return K_VALUES[-1]
+
 # Elo calculation function
 def calculate_elo(old_rating, opponent_rating, outcome, games_played):
-    if games_played <= 10:
-        K = 40
-    elif games_played <= 200:
-        K = 24
-    else:
-        K = 16
+    K = k_factor(games_played)
 
     expected_score = 1 / (1 + 10 ** ((opponent_rating - old_rating) / 400))
     return old_rating + K * (outcome - expected_score)
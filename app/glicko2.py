@@ -0,0 +1,168 @@
+import math
+import os
+from datetime import datetime
+
+import numpy as np
+
+# Glicko-2 (Glickman, "Example of the Glicko-2 system"), vectorised over every player in a rating period
+DEFAULT_RATING = 1500.0
+DEFAULT_RD = 350.0
+DEFAULT_VOLATILITY = 0.06
+TAU = float(os.getenv("GLICKO2_TAU", "0.5"))  # how fast volatility may change
+SCALE = 173.7178
+RATING_PERIOD_DAYS = float(os.getenv("RATING_PERIOD_DAYS", "7"))
+CONVERGENCE = 1e-6
+
+_EPOCH = datetime(2000, 1, 1)
+
+
+def period_index(timestamp, period_days=RATING_PERIOD_DAYS) -> int:
+    if timestamp is None:
+        return 0
+    timestamp = timestamp.replace(tzinfo=None)
+    return int((timestamp - _EPOCH).total_seconds() // (period_days * 86400))
+
+
+def to_glicko2(rating, rd):
+    return (np.asarray(rating, dtype=np.float64) - DEFAULT_RATING) / SCALE, np.asarray(rd, dtype=np.float64) / SCALE
+
+
+def from_glicko2(mu, phi):
+    return mu * SCALE + DEFAULT_RATING, phi * SCALE
+
+
+def inflate(phi, sigma, idle_periods):
+    """RD growth for rating periods a player sat out, capped at the starting RD."""
+    grown = np.sqrt(phi ** 2 + np.asarray(idle_periods, dtype=np.float64) * sigma ** 2)
+    return np.minimum(grown, DEFAULT_RD / SCALE)
+
+
+def _g(phi):
+    return 1 / np.sqrt(1 + 3 * phi ** 2 / math.pi ** 2)
+
+
+def _volatility(delta, phi, v, sigma, tau):
+    # Step 5 of the paper (Illinois variant of regula falsi), run for all players at once
+    a = np.log(sigma ** 2)
+
+    def f(x):
+        ex = np.exp(x)
+        return ex * (delta ** 2 - phi ** 2 - v - ex) / (2 * (phi ** 2 + v + ex) ** 2) - (x - a) / tau ** 2
+
+    A = a.copy()
+    big = delta ** 2 > phi ** 2 + v
+    B = np.where(big, np.log(np.maximum(delta ** 2 - phi ** 2 - v, 1e-300)), a - tau)
+    pending = ~big
+    k = 1
+    while pending.any():
+        low = f(a - k * tau) < 0
+        k += 1
+        pending &= low
+        B = np.where(pending, a - k * tau, B)
+
+    fA, fB = f(A), f(B)
+    for _ in range(100):
+        active = np.abs(B - A) > CONVERGENCE
+        if not active.any():
+            break
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        move = active & (fC * fB < 0)
+        A = np.where(move, B, A)
+        fA = np.where(move, fB, np.where(active, fA / 2, fA))
+        B = np.where(active, C, B)
+        fB = np.where(active, fC, fB)
+    return np.exp(A / 2)
+
+
+def rate_period(mu, phi, sigma, players, opponents, scores, tau=TAU):
+    """One rating period for the given (player, opponent, score) results, on the Glicko-2 scale.
+
+    players/opponents index into mu/phi/sigma; every result is listed once per side and all of
+    them use the pre-period values. Returns new (mu, phi, sigma) arrays; players without a
+    result in the period are returned unchanged (idle RD growth is applied lazily by inflate()).
+    """
+    players = np.asarray(players, dtype=np.int64)
+    opponents = np.asarray(opponents, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float64)
+    size = len(mu)
+
+    g = _g(phi[opponents])
+    expected = 1 / (1 + np.exp(-g * (mu[players] - mu[opponents])))
+    v_inv = np.bincount(players, weights=g ** 2 * expected * (1 - expected), minlength=size)
+    improvement = np.bincount(players, weights=g * (scores - expected), minlength=size)
+
+    rated = np.unique(players)
+    v = 1 / v_inv[rated]
+    delta = v * improvement[rated]
+
+    new_sigma = _volatility(delta, phi[rated], v, sigma[rated], tau)
+    phi_star = np.sqrt(phi[rated] ** 2 + new_sigma ** 2)
+    new_phi = 1 / np.sqrt(1 / phi_star ** 2 + 1 / v)
+
+    mu, phi, sigma = mu.copy(), phi.copy(), sigma.copy()
+    mu[rated] = mu[rated] + new_phi ** 2 * improvement[rated]
+    phi[rated] = new_phi
+    sigma[rated] = new_sigma
+    return mu, phi, sigma
+
+
+def rate_match(rating1, rd1, vol1, idle1, rating2, rd2, vol2, idle2, outcome1, tau=TAU):
+    """Rate a single result as its own period. Returns ((rating, rd, vol) for player 1, same for player 2)."""
+    mu, phi = to_glicko2([rating1, rating2], [rd1, rd2])
+    sigma = np.array([vol1, vol2], dtype=np.float64)
+    phi = inflate(phi, sigma, [idle1, idle2])
+    mu, phi, sigma = rate_period(mu, phi, sigma, [0, 1], [1, 0], [outcome1, 1 - outcome1], tau)
+    ratings, rds = from_glicko2(mu, phi)
+    return (
+        (float(ratings[0]), float(rds[0]), float(sigma[0])),
+        (float(ratings[1]), float(rds[1]), float(sigma[1])),
+    )
+
+
+def replay_glicko2(player1_ids, player2_ids, winner_ids, periods, num_slots, tau=TAU):
+    """Replay matches (chronological, with their rating period index) one period at a time.
+
+    Returns (ratings, rds, vols, games, last_period, history); history holds (n, 2) arrays
+    "before", "after" and "rd" per match side, and last_period is -1 for players who never played.
+    """
+    player1_ids = np.asarray(player1_ids, dtype=np.int64)
+    player2_ids = np.asarray(player2_ids, dtype=np.int64)
+    outcome1 = (np.asarray(winner_ids, dtype=np.int64) == player1_ids).astype(np.float64)
+    periods = np.asarray(periods, dtype=np.int64)
+
+    mu = np.zeros(num_slots)
+    phi = np.full(num_slots, DEFAULT_RD / SCALE)
+    sigma = np.full(num_slots, DEFAULT_VOLATILITY)
+    games = np.zeros(num_slots, dtype=np.int64)
+    last_period = np.full(num_slots, -1, dtype=np.int64)
+    n = len(player1_ids)
+    history = {"before": np.empty((n, 2)), "after": np.empty((n, 2)), "rd": np.empty((n, 2))}
+
+    bounds = np.flatnonzero(np.diff(periods)) + 1
+    for idx in np.split(np.arange(n), bounds):
+        if len(idx) == 0:
+            continue
+        period = periods[idx[0]]
+        a, b = player1_ids[idx], player2_ids[idx]
+        rated = np.unique(np.concatenate([a, b]))
+        seen = last_period[rated] >= 0
+        idle = np.where(seen, period - last_period[rated] - 1, 0)
+        phi[rated] = inflate(phi[rated], sigma[rated], idle)
+
+        before = mu * SCALE + DEFAULT_RATING
+        history["before"][idx, 0], history["before"][idx, 1] = before[a], before[b]
+        mu, phi, sigma = rate_period(
+            mu, phi, sigma,
+            np.concatenate([a, b]), np.concatenate([b, a]),
+            np.concatenate([outcome1[idx], 1 - outcome1[idx]]), tau,
+        )
+        after, rd = from_glicko2(mu, phi)
+        history["after"][idx, 0], history["after"][idx, 1] = after[a], after[b]
+        history["rd"][idx, 0], history["rd"][idx, 1] = rd[a], rd[b]
+        np.add.at(games, a, 1)
+        np.add.at(games, b, 1)
+        last_period[rated] = period
+
+    ratings, rds = from_glicko2(mu, phi)
+    return ratings, rds, sigma, games, last_period, history
@@ -0,0 +1,171 @@
+from collections import defaultdict
+
+from sqlalchemy import and_, or_, delete, insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import HeadToHead, Match, SetScore
+
+COUNTERS = ("matches_played", "low_wins", "high_wins", "low_sets", "high_sets", "low_points", "high_points")
+
+
+def pair_key(a: int, b: int):
+    return (a, b) if a < b else (b, a)
+
+
+def pair_filter(a: int, b: int):
+    return or_(
+        and_(Match.player1_id == a, Match.player2_id == b),
+        and_(Match.player1_id == b, Match.player2_id == a),
+    )
+
+
+def counts_for_head_to_head(player1_id, player2_id, winner_id, timestamp) -> bool:
+    # Same rule the head-to-head endpoint has always used for "valid" matches
+    return bool(player1_id and player2_id and winner_id and timestamp)
+
+
+def contribution(player1_id, player2_id, winner_id, sets):
+    """Counter deltas for one match, oriented to the (low, high) player ids. sets = [(p1_score, p2_score)]."""
+    p1_sets = sum(1 for a, b in sets if a > b)
+    p2_sets = sum(1 for a, b in sets if b > a)
+    p1_points = sum(a for a, _ in sets)
+    p2_points = sum(b for _, b in sets)
+    low = min(player1_id, player2_id)
+    if player1_id == low:
+        low_sets, high_sets, low_points, high_points = p1_sets, p2_sets, p1_points, p2_points
+    else:
+        low_sets, high_sets, low_points, high_points = p2_sets, p1_sets, p2_points, p1_points
+    high = max(player1_id, player2_id)
+    return {
+        "matches_played": 1,
+        "low_wins": int(winner_id == low),
+        "high_wins": int(winner_id == high),
+        "low_sets": low_sets,
+        "high_sets": high_sets,
+        "low_points": low_points,
+        "high_points": high_points,
+    }
+
+
+async def match_sets(db: AsyncSession, match_id: int):
+    result = await db.execute(
+        select(SetScore.player1_score, SetScore.player2_score).where(SetScore.match_id == match_id)
+    )
+    return [(s.player1_score, s.player2_score) for s in result.all()]
+
+
+async def refresh_latest(db: AsyncSession, row: HeadToHead):
+    latest = (await db.execute(
+        select(Match.winner_id, Match.timestamp)
+        .where(pair_filter(row.player_low_id, row.player_high_id))
+        .where(Match.winner_id.isnot(None), Match.timestamp.isnot(None))
+        .order_by(Match.timestamp.desc(), Match.id.desc())
+        .limit(1)
+    )).first()
+    row.last_winner_id = latest.winner_id if latest else None
+    row.last_match_at = latest.timestamp if latest else None
+
+
+async def ensure_row(db: AsyncSession, low: int, high: int):
+    """Insert an all-zero row for the pair unless one exists; a concurrent first result can't make it fail."""
+    values = {"player_low_id": low, "player_high_id": high, **{c: 0 for c in COUNTERS}}
+    if db.get_bind().dialect.name == "mysql":
+        stmt = mysql_insert(HeadToHead).values(values)
+        stmt = stmt.on_duplicate_key_update(player_low_id=stmt.inserted.player_low_id)
+    else:
+        stmt = sqlite_insert(HeadToHead).values(values).on_conflict_do_nothing()
+    await db.execute(stmt)
+
+
+async def apply_result(db: AsyncSession, player1_id, player2_id, winner_id, sets, timestamp, sign=1):
+    """Add (sign=1) or remove (sign=-1) one match from the pair's aggregate row, inside the caller's transaction."""
+    if not counts_for_head_to_head(player1_id, player2_id, winner_id, timestamp):
+        return
+    # Columns are naive DATETIME, so compare wall-clock values like the stored ones
+    timestamp = timestamp.replace(tzinfo=None)
+
+    low, high = pair_key(player1_id, player2_id)
+    row = await db.get(HeadToHead, (low, high), with_for_update=True)
+    if row is None:
+        if sign < 0:
+            return
+        # A locking read of a missing row locks nothing, so two first results for a pair would both
+        # INSERT; upsert the empty row instead and take the lock on it
+        await ensure_row(db, low, high)
+        row = await db.get(HeadToHead, (low, high), with_for_update=True, populate_existing=True)
+
+    for column, delta in contribution(player1_id, player2_id, winner_id, sets).items():
+        setattr(row, column, getattr(row, column) + sign * delta)
+
+    if row.matches_played <= 0:
+        await db.delete(row)
+        # Flush now so a re-add for the pair in the same transaction (update_match) upserts onto no row
+        await db.flush()
+    elif sign > 0 and (row.last_match_at is None or timestamp >= row.last_match_at):
+        row.last_match_at = timestamp
+        row.last_winner_id = winner_id
+    elif sign < 0 and timestamp == row.last_match_at:
+        # The removed match was the latest one; callers must have flushed the delete/update first
+        await db.flush()
+        await refresh_latest(db, row)
+
+
+REBUILD_PAIRS_PER_QUERY = 200
+
+
+async def rebuild(db: AsyncSession, pairs=None):
+    """Recompute aggregate rows from the matches table, for the given (a, b) pairs or for everything."""
+    if pairs is None:
+        await _rebuild(db, None)
+        return
+    keys = sorted({pair_key(a, b) for a, b in pairs if a and b})
+    for start in range(0, len(keys), REBUILD_PAIRS_PER_QUERY):
+        await _rebuild(db, keys[start:start + REBUILD_PAIRS_PER_QUERY])
+
+
+async def _rebuild(db: AsyncSession, keys):
+    stmt = (
+        select(
+            Match.id,
+            Match.player1_id,
+            Match.player2_id,
+            Match.winner_id,
+            Match.timestamp,
+            SetScore.player1_score,
+            SetScore.player2_score,
+        )
+        .outerjoin(SetScore, SetScore.match_id == Match.id)
+        .where(Match.player2_id.isnot(None), Match.winner_id.isnot(None), Match.timestamp.isnot(None))
+        .order_by(Match.timestamp, Match.id)
+    )
+    if keys is not None:
+        stmt = stmt.where(or_(*(pair_filter(a, b) for a, b in keys)))
+
+    matches = {}
+    sets = defaultdict(list)
+    for row in (await db.execute(stmt)).all():
+        matches[row.id] = (row.player1_id, row.player2_id, row.winner_id, row.timestamp)
+        if row.player1_score is not None:
+            sets[row.id].append((row.player1_score, row.player2_score))
+
+    totals = {}
+    for match_id, (p1, p2, winner, timestamp) in matches.items():
+        low, high = pair_key(p1, p2)
+        entry = totals.setdefault((low, high), {"player_low_id": low, "player_high_id": high, **{c: 0 for c in COUNTERS}})
+        for column, delta in contribution(p1, p2, winner, sets[match_id]).items():
+            entry[column] += delta
+        # Rows arrive in (timestamp, id) order, so the last one seen is the latest
+        entry["last_match_at"] = timestamp
+        entry["last_winner_id"] = winner
+
+    if keys is None:
+        await db.execute(delete(HeadToHead))
+    else:
+        await db.execute(delete(HeadToHead).where(or_(*(
+            and_(HeadToHead.player_low_id == low, HeadToHead.player_high_id == high) for low, high in keys
+        ))))
+    if totals:
+        await db.execute(insert(HeadToHead), list(totals.values()))
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Header, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import encode_json
+from app.models import IdempotencyKey
+
+TTL = timedelta(hours=float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24")))
+PURGE_INTERVAL_SECONDS = 60
+
+_last_purge = 0.0
+
+
+def idempotency_key_header(idempotency_key: Optional[str] = Header(None, max_length=255)):
+    return idempotency_key
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _utcnow():
+    return datetime.utcnow()
+
+
+class Idempotency:
+    """Exactly-once handling for one submission carrying an Idempotency-Key header.
+
+    claim() inserts the key row before any other write of the request. A retry arriving while
+    the first attempt is still open blocks on that row (InnoDB row lock) and, once the first
+    commits, gets the stored response instead of re-running the rating update. complete()
+    stores the response in the same transaction as the writes it describes.
+    """
+
+    def __init__(self, db: AsyncSession, scope: str, key: str, payload):
+        self.db = db
+        self.key_hash = _digest(scope, key)
+        self.request_hash = _digest(json.dumps(jsonable_encoder(payload), sort_keys=True))
+        self.row = None
+
+    async def _stored(self):
+        row = await self.db.get(IdempotencyKey, self.key_hash, populate_existing=True)
+        if row is not None and row.expires_at <= _utcnow():
+            await self.db.delete(row)
+            await self.db.flush()
+            return None
+        return row
+
+    def _replay(self, row) -> Response:
+        if row.request_hash != self.request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request.")
+        if row.status_code is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress.")
+        return Response(
+            content=row.response_body, status_code=row.status_code,
+            media_type="application/json", headers={"Idempotent-Replayed": "true"},
+        )
+
+    async def claim(self) -> Optional[Response]:
+        """Return the stored response for a retry, or None after reserving the key for this request."""
+        row = await self._stored()
+        if row is not None:
+            return self._replay(row)
+
+        self.row = IdempotencyKey(key_hash=self.key_hash, request_hash=self.request_hash, expires_at=_utcnow() + TTL)
+        self.db.add(self.row)
+        try:
+            await self.db.flush()
+        except IntegrityError:
+            # Lost the race to a concurrent retry that has since committed
+            await self.db.rollback()
+            self.row = None
+            row = await self._stored()
+            if row is None:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress.")
+            return self._replay(row)
+        return None
+
+    async def complete(self, content, status_code=200):
+        """Record the response; the caller's commit makes it visible to retries."""
+        if self.row is not None:
+            self.row.status_code = status_code
+            self.row.response_body = encode_json(jsonable_encoder(content)).decode()
+            await _maybe_purge(self.db)
+        return content
+
+
+async def _maybe_purge(db: AsyncSession):
+    # ✅ TTL eviction rides along with a write at most once a minute per worker
+    global _last_purge
+    now = time.monotonic()
+    if now - _last_purge < PURGE_INTERVAL_SECONDS:
+        return
+    _last_purge = now
+    await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _utcnow()))
+
+
+async def begin(db: AsyncSession, scope: str, key: Optional[str], payload):
+    """(idempotency, replay): replay is the stored Response when this is a retry; both are None without a key."""
+    if not key:
+        return None, None
+    idempotency = Idempotency(db, scope, key, payload)
+    return idempotency, await idempotency.claim()
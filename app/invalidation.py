@@ -0,0 +1,134 @@
+import mmap
+from abc import ABC, abstractmethod
+import os
+import struct
+import tempfile
+import threading
+import zlib
+
+# Topics published by the write endpoints
+RANKINGS = "rankings"
+PLAYERS = "players"
+TOURNAMENTS = "tournaments"
+
+
+def tournament_topic(tournament_id: int) -> str:
+    return f"tournament:{tournament_id}"
+
+
+class InvalidationBus(ABC):
+    """Versioned invalidation topics shared by every worker.
+
+    Writers call publish() after committing; read-side caches remember the version they
+    were built at and rebuild when version() moves. A backend only needs an atomic
+    per-topic counter, e.g. INCR/GET on Redis.
+    """
+
+    @abstractmethod
+    def publish(self, *topics: str) -> int:
+        """Bump each topic and return the new version of the last one."""
+
+    @abstractmethod
+    def version(self, topic: str) -> int:
+        """Current version of a topic, 0 if it was never published."""
+
+    def watch(self, *topics: str) -> "Watch":
+        return Watch(self, topics)
+
+
+class Watch:
+    """Tracks whether any of a set of topics moved since the last check."""
+
+    def __init__(self, bus: InvalidationBus, topics):
+        self.bus = bus
+        self.topics = tuple(topics)
+        self.seen = None
+
+    def current(self):
+        return tuple(self.bus.version(t) for t in self.topics)
+
+    def changed(self) -> bool:
+        return self.current() != self.seen
+
+    def mark(self, versions=None):
+        self.seen = self.current() if versions is None else versions
+
+
+class LocalBus(InvalidationBus):
+    """In-process counters, for a single worker and for tests."""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def publish(self, *topics: str) -> int:
+        version = 0
+        with self._lock:
+            for topic in topics:
+                version = self._versions.get(topic, 0) + 1
+                self._versions[topic] = version
+        return version
+
+    def version(self, topic: str) -> int:
+        return self._versions.get(topic, 0)
+
+
+class SharedMemoryBus(InvalidationBus):
+    """Counters in a memory-mapped file shared by all workers on the host.
+
+    Topics hash onto a fixed table of 64-bit slots. Reads are a single unlocked
+    8-byte load; a collision only causes an extra rebuild, never a missed one.
+    """
+
+    SLOTS = 1024
+    _SLOT = struct.Struct("<Q")
+
+    def __init__(self, path: str):
+        import fcntl
+
+        self._fcntl = fcntl
+        self.path = path
+        size = self.SLOTS * self._SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size)
+
+    def _offset(self, topic: str) -> int:
+        return (zlib.crc32(topic.encode()) % self.SLOTS) * self._SLOT.size
+
+    def publish(self, *topics: str) -> int:
+        version = 0
+        self._fcntl.flock(self._fd, self._fcntl.LOCK_EX)
+        try:
+            for topic in topics:
+                offset = self._offset(topic)
+                version = self._SLOT.unpack_from(self._mm, offset)[0] + 1
+                self._SLOT.pack_into(self._mm, offset, version)
+        finally:
+            self._fcntl.flock(self._fd, self._fcntl.LOCK_UN)
+        return version
+
+    def version(self, topic: str) -> int:
+        return self._SLOT.unpack_from(self._mm, self._offset(topic))[0]
+
+
+def default_bus_path() -> str:
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "player-rankings-invalidation")
+
+
+def create_bus() -> InvalidationBus:
+    backend = os.getenv("INVALIDATION_BUS", "shm")
+    if backend == "local":
+        return LocalBus()
+    if backend == "shm":
+        try:
+            return SharedMemoryBus(os.getenv("INVALIDATION_BUS_PATH", default_bus_path()))
+        except (ImportError, OSError):
+            # No fcntl/mmap file available (e.g. Windows): fall back to per-process counters
+            return LocalBus()
+    raise RuntimeError(f"Unknown INVALIDATION_BUS backend: {backend}")
+
+
+bus = create_bus()
@@ -0,0 +1,120 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the field names Cloud Logging picks up (severity, message)."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in N records below WARNING for the configured loggers (and their children)."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = dict(rates)  # logger name -> keep every Nth record
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def _every(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return 1
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        every = self._every(record.name)
+        if every <= 1:
+            return True
+        with self._lock:
+            seen = self._seen.get(record.name, 0)
+            self._seen[record.name] = seen + 1
+        return seen % every == 0
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # The stdlib version formats the message here; leave that to the listener thread
+        # and only resolve the arguments, so later mutation can't change the logged text
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def parse_pairs(value: str):
+    """'app.routers=DEBUG, sqlalchemy.engine=WARNING' -> [('app.routers', 'DEBUG'), ...]"""
+    pairs = []
+    for item in (value or "").split(","):
+        name, sep, setting = item.partition("=")
+        if sep and name.strip() and setting.strip():
+            pairs.append((name.strip(), setting.strip()))
+    return pairs
+
+
+def configure_logging():
+    """Route all logging through a queue so request handlers never block on stdout.
+
+    LOG_LEVEL sets the root level, LOG_LEVELS overrides it per module, LOG_SAMPLE keeps
+    1 in N INFO/DEBUG records of noisy loggers and LOG_FORMAT=json emits structured lines.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "text") == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    sample_rates = [(name, int(every)) for name, every in parse_pairs(os.getenv("LOG_SAMPLE", ""))]
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, level in parse_pairs(os.getenv("LOG_LEVELS", "")):
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,9 +1,9 @@
-from fastapi import FastAPI, Depends
+# ✅ Imported first so the cold-start clock covers every other import
+from app.startup import cold_start, prepare_schema
+from fastapi import FastAPI, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-import uvicorn
 import logging
 from dotenv import load_dotenv
 
@@ -17,15 +17,20 @@ app = FastAPI(redirect_slashes=False)
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
 
 # ✅ Import internal modules
+from app.logging_config import configure_logging
 from app.database import Base, engine, get_db
-from app.models import Player
+from app.timing import TimingMiddleware, instrument_engine
+from app.cache import rankings_cache, etag_matches, FastJSONResponse
 from app.auth import router as auth_router
 from app.routers.players import router as players_router
 from app.routers.matches import router as matches_router
 from app.routers import tournaments
+from app.routers.internal import router as internal_router
+
+cold_start.mark("imports")
 
 # ✅ Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # ✅ CORS configuration
@@ -35,36 +40,49 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# ✅ Per-route latency, DB time and query counts (added last so it wraps everything)
+instrument_engine(engine)
+app.add_middleware(TimingMiddleware)
+
 
 # ✅ Health check
 @app.get("/")
 async def home():
     return {"message": "Player Rankings API is running!"}
 
-# ✅ Create DB tables on startup
+# ✅ Create or verify DB tables on startup (DB_SCHEMA_CHECK)
 @app.on_event("startup")
 async def startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    cold_start.mark("server")
+    await prepare_schema(engine, Base.metadata)
+    cold_start.mark("schema")
+    cold_start.log()
 
 # ✅ Rankings endpoint
 @app.get("/rankings")
-async def get_rankings(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Player).order_by(Player.rating.desc()))
-    rankings = result.scalars().all()
-    return [{"name": r.name, "rating": r.rating, "matches": r.matches} for r in rankings]
+async def get_rankings(request: Request, db: AsyncSession = Depends(get_db)):
+    # ✅ Served from the in-memory snapshot; the session only connects on a cold cache
+    payload, etag = await rankings_cache.get(db)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return FastJSONResponse(payload, headers={"ETag": etag})
 
 # ✅ Register routers
 app.include_router(players_router, prefix="/players", tags=["Players"])
 app.include_router(matches_router, prefix="/matches", tags=["Matches"])
 app.include_router(auth_router, tags=["Auth"])
 app.include_router(tournaments.router, prefix="/tournaments", tags=["Tournaments"])
+app.include_router(internal_router, prefix="/internal", tags=["Internal"])
+
+cold_start.mark("app")
 
 # ✅ Uvicorn entry point with proxy headers enabled
 if __name__ == "__main__":
     import os
+    import uvicorn
 
     # Optional: Allow from specific IP or set via environment variable
     forwarded_ips = os.getenv("FORWARDED_ALLOW_IPS", "*")
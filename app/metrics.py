@@ -0,0 +1,125 @@
+import bisect
+import threading
+
+# Latency buckets in seconds, Prometheus-style upper bounds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _bound(value):
+    # JSON has no infinity
+    return "+Inf" if value == float("inf") else value
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; cheap enough to observe on every request."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def sum(self):
+        return self._sum
+
+    def cumulative(self):
+        """[(upper_bound, cumulative_count)] including the +Inf bucket."""
+        with self._lock:
+            counts = list(self._counts)
+        total, out = 0, []
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-th observation (None when empty)."""
+        if not self._count:
+            return None
+        target = q * self._count
+        for bound, total in self.cumulative():
+            if total >= target:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self._count,
+            "sum": round(self._sum, 6),
+            "p50": _bound(self.quantile(0.5)),
+            "p95": _bound(self.quantile(0.95)),
+            "p99": _bound(self.quantile(0.99)),
+            "buckets": {str(_bound(bound)): total for bound, total in self.cumulative()},
+        }
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class PrometheusWriter:
+    """Builds the Prometheus text exposition format (version 0.0.4)."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._lines = []
+        self._declared = set()
+
+    def _declare(self, name, kind, help_text):
+        if name not in self._declared:
+            self._declared.add(name)
+            self._lines.append(f"# HELP {name} {help_text}")
+            self._lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name, kind, help_text, value, labels=None):
+        self._declare(name, kind, help_text)
+        self._lines.append(f"{name}{_labels(labels or {})} {_number(value)}")
+
+    def histogram(self, name, help_text, histogram: Histogram, labels=None):
+        self._declare(name, "histogram", help_text)
+        labels = labels or {}
+        for bound, total in histogram.cumulative():
+            self._lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {total}")
+        self._lines.append(f"{name}_sum{_labels(labels)} {_number(float(histogram.sum))}")
+        self._lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Date, SmallInteger, Float, Text, Boolean, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime, timezone
@@ -17,27 +17,51 @@ class Player(Base):
     blade = Column(String(100), nullable=True)  # ✅ Explicit length added
     age = Column(Integer, nullable=True)
     gender = Column(String(10), nullable=True)  # ✅ Explicit length added
+    # ✅ Glicko-2 state (only moves when RATING_ENGINE=glicko2); rated_at = last rated result
+    rating_deviation = Column(Float, nullable=False, default=350.0, server_default="350")
+    volatility = Column(Float, nullable=False, default=0.06, server_default="0.06")
+    rated_at = Column(DateTime, nullable=True)
 
 class Match(Base):
     __tablename__ = "matches"
 
     id = Column(Integer, primary_key=True, index=True)
     tournament_id = Column(Integer, ForeignKey("tournaments.id"), nullable=True)  # NULL for normal matches
-    player1_id = Column(Integer, ForeignKey("players.id"), nullable=False)
+    player1_id = Column(Integer, ForeignKey("players.id"), nullable=True)  # NULL until a knockout slot is filled
     player2_id = Column(Integer, ForeignKey("players.id"), nullable=True)
     player1_score = Column(Integer, nullable=True)
     player2_score = Column(Integer, nullable=True)
     winner_id = Column(Integer, ForeignKey("players.id"), nullable=True)
     round = Column(String(50), nullable=True)  # e.g., "Group A", "Quarterfinal", etc.
     stage = Column(String(20), nullable=True)  # "group", "knockout", or None
-    set_scores = relationship("SetScore", back_populates="match", cascade="all, delete-orphan")
+    # ✅ Read through explicit queries, never by touching the collection (that's a query per match);
+    # deletes clear set_scores with a bulk DELETE first
+    set_scores = relationship(
+        "SetScore", back_populates="match", cascade="all, delete-orphan", lazy="raise", passive_deletes=True
+    )
     timestamp = Column(DateTime, default=datetime.now(timezone.utc))
-
-    player1 = relationship("Player", foreign_keys=[player1_id])
-    player2 = relationship("Player", foreign_keys=[player2_id])
-    match_winner = relationship("Player", foreign_keys=[winner_id])
-
-    tournament = relationship("Tournament", back_populates="matches", lazy="joined")
+    # ✅ Knockout bracket links: the winner moves into next_match's slot (1 or 2), semifinal losers into the 3rd place match
+    next_match_id = Column(Integer, ForeignKey("matches.id", ondelete="SET NULL"), nullable=True)
+    next_slot = Column(SmallInteger, nullable=True)
+    loser_next_match_id = Column(Integer, ForeignKey("matches.id", ondelete="SET NULL"), nullable=True)
+    loser_next_slot = Column(SmallInteger, nullable=True)
+
+    # ✅ The routers join players/tournaments into column queries, so nothing here loads by default
+    player1 = relationship("Player", foreign_keys=[player1_id], lazy="raise")
+    player2 = relationship("Player", foreign_keys=[player2_id], lazy="raise")
+    match_winner = relationship("Player", foreign_keys=[winner_id], lazy="raise")
+
+    tournament = relationship("Tournament", back_populates="matches", lazy="raise")
+    # Only assigned while app.bracket builds a bracket; advancing goes through the *_id columns
+    next_match = relationship("Match", remote_side=[id], foreign_keys=[next_match_id], lazy="raise")
+    loser_next_match = relationship("Match", remote_side=[id], foreign_keys=[loser_next_match_id], lazy="raise")
+
+    __table_args__ = (
+        Index("ix_matches_timestamp_id", "timestamp", "id"),
+        Index("ix_matches_player1_timestamp", "player1_id", "timestamp", "id"),
+        Index("ix_matches_player2_timestamp", "player2_id", "timestamp", "id"),
+        Index("ix_matches_tournament_stage", "tournament_id", "stage"),
+    )
 
 class Tournament(Base):
     __tablename__ = "tournaments"
@@ -51,12 +75,20 @@ class Tournament(Base):
     num_groups = Column(Integer, nullable=False)
     players_advance_per_group = Column(Integer, nullable=True)
     created_at = Column(Date, nullable=False)
-    standings = relationship("TournamentStanding", back_populates="tournament", cascade="all, delete-orphan")
-    players = relationship("TournamentPlayer", back_populates="tournament", cascade="all, delete-orphan")
+    # ✅ Listing/detail endpoints ask for these with selectinload/joinedload; delete_tournament bulk-deletes
+    # the children itself instead of the ORM loading and deleting them row by row
+    standings = relationship(
+        "TournamentStanding", back_populates="tournament", cascade="all, delete-orphan", lazy="raise", passive_deletes=True
+    )
+    players = relationship(
+        "TournamentPlayer", back_populates="tournament", cascade="all, delete-orphan", lazy="raise", passive_deletes=True
+    )
     is_customized = Column(Integer, default=0)  # 1 = customized, 0 = auto
     final_standings: Optional[Dict[str, int]] = None
 
-    matches = relationship("Match", back_populates="tournament", cascade="all, delete-orphan")
+    matches = relationship(
+        "Match", back_populates="tournament", cascade="all, delete-orphan", lazy="raise", passive_deletes=True
+    )
 
 class TournamentStanding(Base):
     __tablename__ = "tournament_standings"
@@ -66,8 +98,8 @@ class TournamentStanding(Base):
     player_id = Column(Integer, ForeignKey("players.id"), nullable=False)
     position = Column(Integer, nullable=False)  # 1 = 1st, 2 = 2nd, etc.
 
-    tournament = relationship("Tournament", back_populates="standings")
-    player = relationship("Player")
+    tournament = relationship("Tournament", back_populates="standings", lazy="raise")
+    player = relationship("Player", lazy="raise")
 
 class TournamentPlayer(Base):
     __tablename__ = "tournament_players"
@@ -77,15 +109,71 @@ class TournamentPlayer(Base):
     player_id = Column(Integer, ForeignKey("players.id"), nullable=False)
     group_number = Column(Integer, nullable=False)
     seed = Column(Integer, nullable=True)  # based on Elo
-    tournament = relationship("Tournament", back_populates="players")
+    tournament = relationship("Tournament", back_populates="players", lazy="raise")
 
 class SetScore(Base):
     __tablename__ = "set_scores"
 
     id = Column(Integer, primary_key=True, index=True)
-    match_id = Column(Integer, ForeignKey("matches.id"))
+    match_id = Column(Integer, ForeignKey("matches.id"), index=True)
     set_number = Column(Integer)
     player1_score = Column(Integer)
     player2_score = Column(Integer)
 
-    match = relationship("Match", back_populates="set_scores")
+    match = relationship("Match", back_populates="set_scores", lazy="raise")
+
+class RatingHistory(Base):
+    __tablename__ = "rating_history"
+
+    id = Column(Integer, primary_key=True)
+    player_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), nullable=False)
+    match_id = Column(Integer, ForeignKey("matches.id", ondelete="CASCADE"), nullable=False)
+    match_timestamp = Column(DateTime, nullable=False)
+    rating_before = Column(Integer, nullable=False)
+    rating_after = Column(Integer, nullable=False)
+    k_factor = Column(SmallInteger, nullable=True)  # NULL for Glicko-2 updates
+
+    # ✅ Covering index: /players/{id}/rating-history is served from the index alone
+    __table_args__ = (
+        Index(
+            "ix_rating_history_player_timestamp",
+            "player_id", "match_timestamp", "match_id", "rating_before", "rating_after", "k_factor",
+        ),
+    )
+
+class HeadToHead(Base):
+    __tablename__ = "head_to_head"
+
+    # ✅ One row per pair, keyed (lower player id, higher player id)
+    player_low_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), primary_key=True)
+    player_high_id = Column(Integer, ForeignKey("players.id", ondelete="CASCADE"), primary_key=True)
+    matches_played = Column(Integer, nullable=False, default=0)
+    low_wins = Column(Integer, nullable=False, default=0)
+    high_wins = Column(Integer, nullable=False, default=0)
+    low_sets = Column(Integer, nullable=False, default=0)
+    high_sets = Column(Integer, nullable=False, default=0)
+    low_points = Column(Integer, nullable=False, default=0)
+    high_points = Column(Integer, nullable=False, default=0)
+    last_match_at = Column(DateTime, nullable=True)
+    last_winner_id = Column(Integer, nullable=True)
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    # ✅ sha256 of (endpoint, Idempotency-Key header); raw client keys are never stored
+    key_hash = Column(String(64), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(SmallInteger, nullable=True)  # NULL while the first request is still running
+    response_body = Column(Text, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class TournamentProgress(Base):
+    __tablename__ = "tournament_progress"
+
+    # ✅ Per-tournament match counters, updated with each result so completion checks are a primary-key read
+    tournament_id = Column(Integer, ForeignKey("tournaments.id", ondelete="CASCADE"), primary_key=True)
+    group_total = Column(Integer, nullable=False, default=0)
+    group_completed = Column(Integer, nullable=False, default=0)
+    knockout_total = Column(Integer, nullable=False, default=0)
+    knockout_completed = Column(Integer, nullable=False, default=0)
+    knockout_generated = Column(Boolean, nullable=False, default=False)
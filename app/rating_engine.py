@@ -0,0 +1,76 @@
+import os
+from typing import NamedTuple, Optional
+
+from app.elo import calculate_elo, k_factor
+
+ELO = "elo"
+GLICKO2 = "glicko2"
+ENGINES = (ELO, GLICKO2)
+
+# ✅ Which engine rates new results (and /matches/recompute-ratings); "elo" keeps the classic behaviour
+RATING_ENGINE = os.getenv("RATING_ENGINE", ELO).lower()
+if RATING_ENGINE not in ENGINES:
+    raise RuntimeError(f"Unknown RATING_ENGINE: {RATING_ENGINE}")
+
+
+class RatingChange(NamedTuple):
+    player_id: int
+    rating_before: int
+    rating_after: int
+    k_factor: Optional[int]  # None for Glicko-2
+
+
+def idle_periods(rated_at, timestamp) -> int:
+    """Whole rating periods a player sat out between their last rated result and this one."""
+    if rated_at is None or timestamp is None:
+        return 0
+    from app import glicko2
+
+    return max(glicko2.period_index(timestamp) - glicko2.period_index(rated_at) - 1, 0)
+
+
+def _rate_elo(player1, player2, outcome1):
+    k1, k2 = k_factor(player1.matches or 0), k_factor(player2.matches or 0)
+    new_rating1 = int(calculate_elo(player1.rating, player2.rating, outcome1, player1.matches or 0))
+    new_rating2 = int(calculate_elo(player2.rating, player1.rating, 1 - outcome1, player2.matches or 0))
+    return (new_rating1, k1), (new_rating2, k2)
+
+
+def _rate_glicko2(player1, player2, outcome1, timestamp):
+    # Imported here so Elo deployments never load numpy
+    from app import glicko2
+
+    side1, side2 = glicko2.rate_match(
+        player1.rating, player1.rating_deviation or glicko2.DEFAULT_RD,
+        player1.volatility or glicko2.DEFAULT_VOLATILITY, idle_periods(player1.rated_at, timestamp),
+        player2.rating, player2.rating_deviation or glicko2.DEFAULT_RD,
+        player2.volatility or glicko2.DEFAULT_VOLATILITY, idle_periods(player2.rated_at, timestamp),
+        outcome1,
+    )
+    for player, (rating, rd, volatility) in ((player1, side1), (player2, side2)):
+        player.rating_deviation = rd
+        player.volatility = volatility
+    return (round(side1[0]), None), (round(side2[0]), None)
+
+
+def rate_match(player1, player2, winner_id, timestamp, engine=None):
+    """Apply one result to two Player rows in place and return their RatingChange entries."""
+    engine = engine or RATING_ENGINE
+    outcome1 = 1 if winner_id == player1.id else 0
+    before1, before2 = player1.rating, player2.rating
+
+    if engine == GLICKO2:
+        (after1, k1), (after2, k2) = _rate_glicko2(player1, player2, outcome1, timestamp)
+    else:
+        (after1, k1), (after2, k2) = _rate_elo(player1, player2, outcome1)
+
+    player1.rating, player2.rating = after1, after2
+    player1.matches = (player1.matches or 0) + 1
+    player2.matches = (player2.matches or 0) + 1
+    if timestamp is not None:
+        player1.rated_at = player2.rated_at = timestamp.replace(tzinfo=None)
+
+    return (
+        RatingChange(player1.id, before1, after1, k1),
+        RatingChange(player2.id, before2, after2, k2),
+    )
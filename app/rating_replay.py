@@ -0,0 +1,195 @@
+import logging
+import numpy as np
+from sqlalchemy import update, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Player, Match, RatingHistory
+from app.elo import K_THRESHOLDS, K_VALUES
+from app import glicko2, rating_engine
+
+logger = logging.getLogger(__name__)
+
+INITIAL_RATING = 1500
+REPLAY_BATCH_SIZE = 10_000
+
+
+def dependency_levels(player1_ids, player2_ids):
+    # A match only depends on earlier matches of its own two players, so its level is
+    # one past the latest level either player has reached. Matches sharing a level have
+    # no player in common and can be rated together.
+    last_level = {}
+    levels = np.empty(len(player1_ids), dtype=np.int64)
+    for i, (a, b) in enumerate(zip(player1_ids.tolist(), player2_ids.tolist())):
+        level = max(last_level.get(a, -1), last_level.get(b, -1)) + 1
+        last_level[a] = level
+        last_level[b] = level
+        levels[i] = level
+    return levels
+
+
+def replay_elo(player1_ids, player2_ids, winner_ids, num_slots,
+               initial_rating=INITIAL_RATING, k_thresholds=K_THRESHOLDS, k_values=K_VALUES,
+               return_history=False, levels=None):
+    """Replay matches (already in chronological order) and return (ratings, games) arrays indexed by player id.
+
+    With return_history=True a third value is returned: a dict of (n_matches, 2) arrays
+    "before", "after" and "k" holding each side's rating change per match. Pass levels
+    from dependency_levels() when replaying the same history many times.
+    """
+    player1_ids = np.asarray(player1_ids, dtype=np.int64)
+    player2_ids = np.asarray(player2_ids, dtype=np.int64)
+    winner_ids = np.asarray(winner_ids, dtype=np.int64)
+
+    ratings = np.full(num_slots, float(initial_rating))
+    games = np.zeros(num_slots, dtype=np.int64)
+    history = {
+        "before": np.empty((len(player1_ids), 2)),
+        "after": np.empty((len(player1_ids), 2)),
+        "k": np.empty((len(player1_ids), 2)),
+    }
+    if len(player1_ids) == 0:
+        return (ratings, games, history) if return_history else (ratings, games)
+
+    thresholds = np.asarray(k_thresholds, dtype=np.int64)
+    ks = np.asarray(k_values, dtype=np.float64)
+    outcome1 = (winner_ids == player1_ids).astype(np.float64)
+
+    if levels is None:
+        levels = dependency_levels(player1_ids, player2_ids)
+    order = np.argsort(levels, kind="stable")
+    bounds = np.flatnonzero(np.diff(levels[order])) + 1
+
+    for idx in np.split(order, bounds):
+        a, b = player1_ids[idx], player2_ids[idx]
+        r1, r2 = ratings[a], ratings[b]
+        k1 = ks[np.searchsorted(thresholds, games[a], side="left")]
+        k2 = ks[np.searchsorted(thresholds, games[b], side="left")]
+        expected1 = 1 / (1 + np.power(10.0, (r2 - r1) / 400))
+        expected2 = 1 / (1 + np.power(10.0, (r1 - r2) / 400))
+        o1 = outcome1[idx]
+        # ✅ Same int() truncation as the live submit paths
+        ratings[a] = np.trunc(r1 + k1 * (o1 - expected1))
+        ratings[b] = np.trunc(r2 + k2 * ((1 - o1) - expected2))
+        games[a] += 1
+        games[b] += 1
+
+        if return_history:
+            history["before"][idx, 0], history["before"][idx, 1] = r1, r2
+            history["after"][idx, 0], history["after"][idx, 1] = ratings[a], ratings[b]
+            history["k"][idx, 0], history["k"][idx, 1] = k1, k2
+
+    return (ratings, games, history) if return_history else (ratings, games)
+
+
+def prediction_scores(before, player1_ids, winner_ids, skip=0, eps=1e-12):
+    """Log-loss and Brier score of the pre-match Elo expectation for player 1, from replay_elo's history["before"]."""
+    before = np.asarray(before)[skip:]
+    outcome1 = (np.asarray(winner_ids) == np.asarray(player1_ids)).astype(np.float64)[skip:]
+    if len(outcome1) == 0:
+        return float("nan"), float("nan")
+    expected1 = 1 / (1 + np.power(10.0, (before[:, 1] - before[:, 0]) / 400))
+    clipped = np.clip(expected1, eps, 1 - eps)
+    log_loss = -np.mean(outcome1 * np.log(clipped) + (1 - outcome1) * np.log(1 - clipped))
+    brier = np.mean((expected1 - outcome1) ** 2)
+    return float(log_loss), float(brier)
+
+
+async def load_match_history(db: AsyncSession):
+    """Return (rows, timestamps): an (n, 4) array of match_id, player1_id, player2_id, winner_id in rating order."""
+    stmt = (
+        select(Match.id, Match.player1_id, Match.player2_id, Match.winner_id, Match.timestamp)
+        .where(Match.player2_id.isnot(None), Match.winner_id.isnot(None))
+        .order_by(Match.timestamp, Match.id)
+        .execution_options(yield_per=REPLAY_BATCH_SIZE)
+    )
+    chunks, timestamps = [], []
+    result = await db.stream(stmt)
+    async for partition in result.partitions():
+        chunks.append(np.asarray([tuple(row[:4]) for row in partition], dtype=np.int64))
+        timestamps.extend(row[4] for row in partition)
+
+    if not chunks:
+        return np.empty((0, 4), dtype=np.int64), []
+
+    history = np.concatenate(chunks)
+    # Ignore rows whose winner isn't one of the two players
+    valid = (history[:, 3] == history[:, 1]) | (history[:, 3] == history[:, 2])
+    return history[valid], [ts for ts, ok in zip(timestamps, valid.tolist()) if ok]
+
+
+def _periods(timestamps):
+    # Rating period of every match; rows without a timestamp stay in the period before them
+    periods, current = [], 0
+    for ts in timestamps:
+        if ts is not None:
+            current = glicko2.period_index(ts)
+        periods.append(current)
+    return np.asarray(periods, dtype=np.int64)
+
+
+async def recompute_ratings(db: AsyncSession, initial_rating=INITIAL_RATING, engine=None):
+    """Rebuild every player's rating, match count and rating history from the full match history."""
+    engine = engine or rating_engine.RATING_ENGINE
+    player_ids = np.asarray((await db.execute(select(Player.id))).scalars().all(), dtype=np.int64)
+    if len(player_ids) == 0:
+        return 0
+
+    history, timestamps = await load_match_history(db)
+    num_slots = int(max(player_ids.max(), history[:, 1:].max() if len(history) else 0)) + 1
+
+    # Last rated match per player, for rated_at
+    last_match = np.full(num_slots, -1, dtype=np.int64)
+    for column in (1, 2):
+        np.maximum.at(last_match, history[:, column], np.arange(len(history)))
+
+    extra = {}
+    if engine == rating_engine.GLICKO2:
+        ratings, rds, vols, games, _, changes = glicko2.replay_glicko2(
+            history[:, 1], history[:, 2], history[:, 3], _periods(timestamps), num_slots,
+        )
+        ratings = np.round(ratings)
+        after = np.round(changes["after"]).astype(np.int64).tolist()
+        before = np.round(changes["before"]).astype(np.int64).tolist()
+        ks = [[None, None]] * len(history)
+        extra = {"rating_deviation": rds, "volatility": vols}
+    else:
+        ratings, games, changes = replay_elo(
+            history[:, 1], history[:, 2], history[:, 3], num_slots,
+            initial_rating=initial_rating, return_history=True,
+        )
+        before = changes["before"].astype(np.int64).tolist()
+        after = changes["after"].astype(np.int64).tolist()
+        ks = changes["k"].astype(np.int64).tolist()
+    logger.info("Replayed %d matches for %d players with %s", len(history), len(player_ids), engine)
+
+    rows = []
+    for pid in player_ids.tolist():
+        row = {"id": pid, "rating": int(ratings[pid]), "matches": int(games[pid])}
+        for column, values in extra.items():
+            row[column] = float(values[pid])
+        last = last_match[pid]
+        row["rated_at"] = timestamps[last] if last >= 0 else None
+        rows.append(row)
+    await db.execute(update(Player), rows)
+
+    # ✅ Rating history is derived data, so rewrite it from the same replay
+    await db.execute(delete(RatingHistory))
+    rows = []
+    for i, (match_id, p1, p2, _) in enumerate(history.tolist()):
+        if timestamps[i] is None:
+            continue
+        for side, pid in enumerate((p1, p2)):
+            rows.append({
+                "player_id": pid,
+                "match_id": match_id,
+                "match_timestamp": timestamps[i],
+                "rating_before": before[i][side],
+                "rating_after": after[i][side],
+                "k_factor": ks[i][side],
+            })
+    for start in range(0, len(rows), REPLAY_BATCH_SIZE):
+        await db.execute(insert(RatingHistory), rows[start:start + REPLAY_BATCH_SIZE])
+
+    await db.commit()
+    return len(history)
@@ -0,0 +1,94 @@
+from pytz import timezone as dt_timezone
+
+from fastapi import HTTPException
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Player, RatingHistory
+from app.rating_engine import rate_match
+from app.cache import rankings_cache
+
+
+sgt = dt_timezone("Asia/Singapore")
+
+
+def _sort_key(result):
+    # Results without a timestamp are stamped "now" by the routers, so they go last
+    ts = result.timestamp
+    if ts is None:
+        return (1, None)
+    # Naive timestamps are SGT wall clock like the stored ones; bring aware ones onto the same clock
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(sgt).replace(tzinfo=None)
+    return (0, ts)
+
+
+def sorted_by_timestamp(results):
+    """Chronological order for rating; ties keep their submitted order."""
+    return sorted(results, key=_sort_key)
+
+
+class RatingBatch:
+    """Rates a batch of results inside one transaction.
+
+    lock() takes SELECT ... FOR UPDATE on every affected player in id order, so two scorers
+    submitting at once serialize on the rows instead of overwriting each other's ratings
+    (and can't deadlock). rate() applies results in the order given; commit() commits once
+    and patches the rankings snapshot.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.players = {}
+        self.changes = []
+
+    async def lock(self, player_ids):
+        ids = sorted({pid for pid in player_ids if pid is not None} - self.players.keys())
+        if not ids:
+            return self.players
+        result = await self.db.execute(
+            select(Player)
+            .where(Player.id.in_(ids))
+            .order_by(Player.id)
+            .with_for_update()
+            # Rows already in the session may be stale; the locked read must win
+            .execution_options(populate_existing=True)
+        )
+        for player in result.scalars().all():
+            self.players[player.id] = player
+        return self.players
+
+    def check(self, player1_id, player2_id, winner_id):
+        if player1_id == player2_id or player1_id not in self.players or player2_id not in self.players:
+            raise HTTPException(status_code=400, detail="Both players must exist.")
+        if winner_id not in (player1_id, player2_id):
+            raise HTTPException(status_code=400, detail="Winner must be one of the players.")
+
+    async def forget(self, match_id):
+        """Drop a match's history rows before it is rated again, so it never has two sets of them."""
+        await self.db.execute(delete(RatingHistory).where(RatingHistory.match_id == match_id))
+
+    def rate(self, match_id, player1_id, player2_id, winner_id, timestamp):
+        """Update both (locked) players and queue their rating history rows."""
+        self.check(player1_id, player2_id, winner_id)
+        changes = rate_match(self.players[player1_id], self.players[player2_id], winner_id, timestamp)
+        self.db.add_all([
+            RatingHistory(player_id=c.player_id, match_id=match_id, match_timestamp=timestamp,
+                          rating_before=c.rating_before, rating_after=c.rating_after, k_factor=c.k_factor)
+            for c in changes
+        ])
+        self.changes.extend(changes)
+        return changes
+
+    def ranking_rows(self):
+        touched = {c.player_id for c in self.changes}
+        return [(p.id, p.name, p.rating, p.matches) for pid, p in self.players.items() if pid in touched]
+
+    async def commit(self):
+        # Read everything we need before commit expires the ORM objects
+        rows = self.ranking_rows()
+        await self.db.commit()
+        if rows:
+            rankings_cache.patch(rows)
+        return rows
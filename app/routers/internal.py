@@ -0,0 +1,81 @@
+import hmac
+import os
+
+from fastapi import APIRouter, Header, HTTPException, Response
+
+from app.auth import token_cache
+from app.database import engine, pool_stats, InstrumentedPool
+from app.metrics import PrometheusWriter
+from app.startup import cold_start
+from app.timing import request_metrics
+
+router = APIRouter()
+
+# Scrapers can't log in, so /internal is guarded by a shared token; without one it stays off,
+# since the service is deployed publicly
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+def check_metrics_token(token):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(token or "", METRICS_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid metrics token")
+
+
+@router.get("/metrics")
+async def get_metrics(x_metrics_token: str = Header(None)):
+    check_metrics_token(x_metrics_token)
+    routes = {
+        f"{method} {path}": {
+            "requests": sum(metrics.statuses.values()),
+            "statuses": dict(metrics.statuses),
+            "latency_seconds": metrics.latency.snapshot(),
+            "db_seconds": metrics.db_time.snapshot(),
+            "queries": metrics.queries.snapshot(),
+        }
+        for (method, path), metrics in sorted(request_metrics.routes.items(), key=lambda item: (item[0][1], item[0][0]))
+    }
+    return {
+        "db_pool": pool_stats(),
+        "token_cache": token_cache.stats(),
+        "cold_start": cold_start.snapshot(),
+        "routes": routes,
+    }
+
+
+@router.get("/metrics/prometheus")
+async def get_prometheus_metrics(x_metrics_token: str = Header(None)):
+    check_metrics_token(x_metrics_token)
+    out = PrometheusWriter()
+    routes = sorted(request_metrics.routes.items(), key=lambda item: (item[0][1], item[0][0]))
+
+    for (method, path), metrics in routes:
+        for status, count in sorted(metrics.statuses.items()):
+            out.sample("http_requests_total", "counter", "Requests handled, by route and status.", count,
+                       {"method": method, "route": path, "status": status})
+    # Each family's samples have to stay together, so loop over the routes once per histogram
+    families = (
+        ("http_request_duration_seconds", "Total request latency.", "latency"),
+        ("http_request_db_seconds", "Time spent executing SQL per request.", "db_time"),
+        ("http_request_python_seconds", "Request latency outside SQL execution.", "python_time"),
+        ("http_request_queries", "SQL statements executed per request.", "queries"),
+    )
+    for name, help_text, attr in families:
+        for (method, path), metrics in routes:
+            out.histogram(name, help_text, getattr(metrics, attr), {"method": method, "route": path})
+
+    pool = engine.pool
+    if isinstance(pool, InstrumentedPool):
+        out.sample("db_pool_size", "gauge", "Configured persistent connections.", pool.size())
+        out.sample("db_pool_checked_out", "gauge", "Connections currently in use.", pool.checkedout())
+        out.sample("db_pool_overflow", "gauge", "Connections open beyond pool_size (negative while the pool fills).", pool.overflow())
+        out.sample("db_pool_timeouts_total", "counter", "Checkouts that gave up after pool_timeout.", pool.timeouts.value)
+        out.histogram("db_pool_checkout_seconds", "Time to check a connection out of the pool.", pool.checkout_latency)
+        out.histogram("db_pool_wait_seconds", "Checkout time for requests that found the pool exhausted.", pool.wait_latency)
+
+    out.sample("auth_token_cache_hits_total", "counter", "Admin token checks answered from the cache.", token_cache.hits.value)
+    out.sample("auth_token_cache_misses_total", "counter", "Admin token checks that ran jwt.decode.", token_cache.misses.value)
+    out.sample("auth_token_cache_expired_total", "counter", "Cached tokens dropped because they expired.", token_cache.expired.value)
+
+    return Response(content=out.render(), media_type=PrometheusWriter.CONTENT_TYPE)
@@ -1,148 +1,386 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import and_, or_, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import aliased
 from sqlalchemy.inspection import inspect
+from collections import defaultdict
 from datetime import datetime
+from typing import Optional
+import base64
+import csv
+import io
 import logging
 from pytz import timezone as dt_timezone
-from app.models import Player, Match, SetScore
-from app.schemas import MatchResult, HeadToHeadResponse
+from app.models import Player, Match, SetScore, HeadToHead, Tournament, RatingHistory
+from app.schemas import MatchResult, MatchResultBatch, HeadToHeadResponse
 from app.database import get_db
 from app.auth import is_admin
+from app.idempotency import begin as begin_idempotent, idempotency_key_header
+from app.rating_service import RatingBatch, sorted_by_timestamp
+from app.cache import rankings_cache, encode_json, FastJSONResponse
+from app.invalidation import bus, TOURNAMENTS, tournament_topic
+from app import head_to_head as h2h
+from app import tournament_progress
+from app.head_to_head import pair_key, pair_filter
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 sgt = dt_timezone("Asia/Singapore")
+MAX_PAGE_SIZE = 1000
 
-def calculate_elo(old_rating, opponent_rating, outcome, games_played):
-    if games_played <= 10:
-        K = 40
-    elif games_played <= 200:
-        K = 24
-    else:
-        K = 16
-
-    expected_score = 1 / (1 + 10 ** ((opponent_rating - old_rating) / 400))
-    return old_rating + K * (outcome - expected_score)
-
-@router.post("/")
-async def submit_match(result: MatchResult, db: AsyncSession = Depends(get_db), admin=Depends(is_admin)):
-    logger.info("Received match submission: %s", result.dict())
-
-    stmt = select(Player).where(Player.id.in_([result.player1_id, result.player2_id]))
-    players = (await db.execute(stmt)).scalars().all()
-
-    if len(players) < 2:
-        raise HTTPException(status_code=400, detail="Both players must exist.")
-
-    player1, player2 = players if players[0].id == result.player1_id else players[::-1]
-
-    if result.winner_id not in [player1.id, player2.id]:
-        raise HTTPException(status_code=400, detail="Winner must be one of the players.")
-
-    # ✅ Determine outcome
-    outcome1 = 1 if result.winner_id == player1.id else 0
-    outcome2 = 1 - outcome1
-
-    # ✅ Calculate new ratings
-    new_rating1 = int(calculate_elo(player1.rating, player2.rating, outcome1, player1.matches or 0))
-    new_rating2 = int(calculate_elo(player2.rating, player1.rating, outcome2, player2.matches or 0))
-
-    # ✅ Update player stats
-    player1.rating = new_rating1
-    player2.rating = new_rating2
-    player1.matches = (player1.matches or 0) + 1
-    player2.matches = (player2.matches or 0) + 1
-
-    # ✅ Create match record (with new fields)
-    timestamp = result.timestamp or datetime.now(sgt)
+def new_match_row(result: MatchResult, timestamp):
     # Calculate total sets won
     p1_total = sum(1 for s in result.sets if s.player1_score > s.player2_score)
     p2_total = sum(1 for s in result.sets if s.player2_score > s.player1_score)
-
-    new_match = Match(
-        player1_id=player1.id,
-        player2_id=player2.id,
+    return Match(
+        player1_id=result.player1_id,
+        player2_id=result.player2_id,
         player1_score=p1_total,
         player2_score=p2_total,
         winner_id=result.winner_id,
         timestamp=timestamp,
     )
 
-    db.add(new_match)
+async def record_matches(db: AsyncSession, batch: RatingBatch, results):
+    """Insert matches, set scores and head-to-head updates and rate them, in the order given."""
+    stamped = [(r, r.timestamp or datetime.now(sgt)) for r in results]
+    new_matches = [new_match_row(r, timestamp) for r, timestamp in stamped]
+    db.add_all(new_matches)
+    await db.flush()  # Ensure match ids are available
 
     # ✅ Add set scores
-    await db.flush()  # Ensure match.id is available
-    for s in result.sets:
-        db.add(SetScore(
-            match_id=new_match.id,
-            set_number=s.set_number,
-            player1_score=s.player1_score,
-            player2_score=s.player2_score,
-        ))
+    for (r, _), match in zip(stamped, new_matches):
+        for s in r.sets:
+            db.add(SetScore(
+                match_id=match.id,
+                set_number=s.set_number,
+                player1_score=s.player1_score,
+                player2_score=s.player2_score,
+            ))
+
+    for (r, timestamp), match in zip(stamped, new_matches):
+        # ✅ Keep the head-to-head aggregate in step with the new match
+        await h2h.apply_result(
+            db, r.player1_id, r.player2_id, r.winner_id,
+            [(s.player1_score, s.player2_score) for s in r.sets], timestamp,
+        )
+        # ✅ Rate with the configured engine; rating history goes in the same transaction
+        batch.rate(match.id, r.player1_id, r.player2_id, r.winner_id, timestamp)
+    return new_matches
 
+async def commit_batch(db: AsyncSession, batch: RatingBatch):
     try:
-        await db.commit()
-        await db.refresh(player1)
-        await db.refresh(player2)
+        return await batch.commit()
     except Exception as e:
         await db.rollback()
         logger.error("Error committing match: %s", e)
         raise HTTPException(status_code=500, detail="Database commit error")
 
-    return {
+@router.post("/")
+async def submit_match(
+    result: MatchResult,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(is_admin),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
+):
+    logger.debug("Received match submission: %s", result)
+
+    # ✅ A retried submission gets the original response back instead of a second rating update
+    idempotency, replay = await begin_idempotent(db, "POST /matches", idempotency_key, result)
+    if replay:
+        return replay
+
+    # ✅ Lock both players before touching anything, so concurrent scorers can't lose updates
+    batch = RatingBatch(db)
+    await batch.lock([result.player1_id, result.player2_id])
+    batch.check(result.player1_id, result.player2_id, result.winner_id)
+
+    await record_matches(db, batch, [result])
+
+    by_id = {pid: (name, rating) for pid, name, rating, _ in batch.ranking_rows()}
+    response = {
         "message": "Match successfully recorded",
-        "player1": player1.name,
-        "player1_new_rating": player1.rating,
-        "player2": player2.name,
-        "player2_new_rating": player2.rating
+        "player1": by_id[result.player1_id][0],
+        "player1_new_rating": by_id[result.player1_id][1],
+        "player2": by_id[result.player2_id][0],
+        "player2_new_rating": by_id[result.player2_id][1]
+    }
+    if idempotency:
+        await idempotency.complete(response)
+    await commit_batch(db, batch)
+    return response
+
+@router.post("/batch")
+async def submit_matches(
+    payload: MatchResultBatch,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(is_admin),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
+):
+    # ✅ A whole score sheet in one transaction: players locked once, rated in play order, one commit
+    if not payload.results:
+        raise HTTPException(status_code=400, detail="No results submitted.")
+
+    idempotency, replay = await begin_idempotent(db, "POST /matches/batch", idempotency_key, payload)
+    if replay:
+        return replay
+
+    batch = RatingBatch(db)
+    await batch.lock([pid for r in payload.results for pid in (r.player1_id, r.player2_id)])
+    for r in payload.results:
+        batch.check(r.player1_id, r.player2_id, r.winner_id)
+
+    new_matches = await record_matches(db, batch, sorted_by_timestamp(payload.results))
+    match_ids = [m.id for m in new_matches]
+
+    response = {
+        "message": f"{len(match_ids)} matches successfully recorded",
+        "match_ids": match_ids,
+        "ratings": {pid: rating for pid, _, rating, _ in batch.ranking_rows()},
     }
+    if idempotency:
+        await idempotency.complete(response)
+    await commit_batch(db, batch)
+    return response
+
+def encode_cursor(timestamp: datetime, match_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{match_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, match_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(match_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+def filter_matches(stmt, player_id, tournament_id, stage, date_from, date_to):
+    if player_id is not None:
+        stmt = stmt.where(or_(Match.player1_id == player_id, Match.player2_id == player_id))
+    if tournament_id is not None:
+        stmt = stmt.where(Match.tournament_id == tournament_id)
+    if stage is not None:
+        stmt = stmt.where(Match.stage == stage)
+    if date_from is not None:
+        stmt = stmt.where(Match.timestamp >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Match.timestamp < date_to)
+    return stmt
 
 @router.get("/")
-async def get_matches(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Match)
-        .options(
-            joinedload(Match.player1),
-            joinedload(Match.player2),
-            joinedload(Match.match_winner),
-            joinedload(Match.set_scores),
+async def get_matches(
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    player_id: Optional[int] = None,
+    tournament_id: Optional[int] = None,
+    stage: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    Player1 = aliased(Player)
+    Player2 = aliased(Player)
+
+    # ✅ Inner joins drop bye matches (no player2) in SQL
+    stmt = (
+        select(
+            Match.id,
+            Match.player1_id,
+            Player1.name.label("player1_name"),
+            Match.player2_id,
+            Player2.name.label("player2_name"),
+            Match.player1_score,
+            Match.player2_score,
+            Match.winner_id,
+            Match.round,
+            Match.stage,
+            Match.timestamp,
         )
+        .join(Player1, Match.player1_id == Player1.id)
+        .join(Player2, Match.player2_id == Player2.id)
+        .where(Match.timestamp.isnot(None))
     )
-    matches = result.unique().scalars().all()
 
-    # Filter out bye matches (i.e. player1 or player2 is None)
-    valid_matches = [m for m in matches if m.player1 and m.player2]
+    stmt = filter_matches(stmt, player_id, tournament_id, stage, date_from, date_to)
 
-    # Sort by timestamp (earliest first)
-    valid_matches.sort(key=lambda m: m.timestamp or 0)
+    # ✅ Keyset pagination on (timestamp, id), served by ix_matches_timestamp_id
+    if cursor:
+        last_ts, last_id = decode_cursor(cursor)
+        if descending:
+            stmt = stmt.where(or_(Match.timestamp < last_ts, and_(Match.timestamp == last_ts, Match.id < last_id)))
+        else:
+            stmt = stmt.where(or_(Match.timestamp > last_ts, and_(Match.timestamp == last_ts, Match.id > last_id)))
 
-    return [
+    if descending:
+        stmt = stmt.order_by(Match.timestamp.desc(), Match.id.desc())
+    else:
+        stmt = stmt.order_by(Match.timestamp, Match.id)
+
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    set_scores_by_match = defaultdict(list)
+    if rows:
+        score_result = await db.execute(
+            select(SetScore.match_id, SetScore.set_number, SetScore.player1_score, SetScore.player2_score)
+            .where(SetScore.match_id.in_([m.id for m in rows]))
+            .order_by(SetScore.match_id, SetScore.set_number)
+        )
+        for s in score_result.all():
+            set_scores_by_match[s.match_id].append({
+                "set_number": s.set_number,
+                "player1_score": s.player1_score,
+                "player2_score": s.player2_score
+            })
+
+    headers = {}
+    if has_more:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+    # ✅ Rows are plain JSON types already; encode once with orjson instead of jsonable_encoder + json
+    return FastJSONResponse([
         {
             "id": m.id,
-            "player1_id": m.player1.id,
-            "player1": m.player1.name,
-            "player2_id": m.player2.id,
-            "player2": m.player2.name,
+            "player1_id": m.player1_id,
+            "player1": m.player1_name,
+            "player2_id": m.player2_id,
+            "player2": m.player2_name,
             "player1_score": m.player1_score,
             "player2_score": m.player2_score,
             "winner_id": m.winner_id,
             "round": m.round,
             "stage": m.stage,
-            "timestamp": m.timestamp.astimezone(sgt).strftime("%-d %b %Y, %H:%M") if m.timestamp else None,
-            "set_scores": [
-                {
-                    "set_number": s.set_number,
-                    "player1_score": s.player1_score,
-                    "player2_score": s.player2_score
-                }
-                for s in m.set_scores
-            ]
+            "timestamp": m.timestamp.astimezone(sgt).strftime("%-d %b %Y, %H:%M"),
+            "set_scores": set_scores_by_match.get(m.id, [])
         }
-        for m in valid_matches
-    ]
+        for m in rows
+    ], headers=headers)
+
+EXPORT_BATCH_SIZE = 1000  # rows fetched per server-side cursor round trip
+EXPORT_CHUNK_SIZE = 64 * 1024  # bytes handed to the server per send
+EXPORT_COLUMNS = (
+    "id", "timestamp", "tournament_id", "round", "stage", "player1_id", "player1", "player2_id", "player2",
+    "player1_score", "player2_score", "winner_id", "set_scores",
+)
+
+async def grouped_match_rows(db: AsyncSession, stmt):
+    """(row, [(p1, p2), ...]) per match from a match x set score join ordered by match."""
+    # yield_per streams from a server-side cursor, so memory stays at one batch however long the history is
+    result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    try:
+        current, sets = None, []
+        async for row in result:
+            if current is None or row.id != current.id:
+                if current is not None:
+                    yield current, sets
+                current, sets = row, []
+            if row.set_player1_score is not None:
+                sets.append((row.set_player1_score, row.set_player2_score))
+        if current is not None:
+            yield current, sets
+    finally:
+        await result.close()
+
+async def ndjson_chunks(matches):
+    chunk = bytearray()
+    async for m, sets in matches:
+        chunk += encode_json({
+            "id": m.id,
+            "timestamp": m.timestamp.isoformat(),
+            "tournament_id": m.tournament_id,
+            "round": m.round,
+            "stage": m.stage,
+            "player1_id": m.player1_id,
+            "player1": m.player1_name,
+            "player2_id": m.player2_id,
+            "player2": m.player2_name,
+            "player1_score": m.player1_score,
+            "player2_score": m.player2_score,
+            "winner_id": m.winner_id,
+            "set_scores": sets,
+        })
+        chunk += b"\n"
+        if len(chunk) >= EXPORT_CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+async def csv_chunks(matches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for m, sets in matches:
+        writer.writerow((
+            m.id, m.timestamp.isoformat(), m.tournament_id, m.round, m.stage,
+            m.player1_id, m.player1_name, m.player2_id, m.player2_name,
+            m.player1_score, m.player2_score, m.winner_id,
+            " ".join(f"{p1}-{p2}" for p1, p2 in sets),
+        ))
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+@router.get("/export")
+async def export_matches(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    player_id: Optional[int] = None,
+    tournament_id: Optional[int] = None,
+    stage: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    """Full match history, oldest first, streamed as NDJSON (one match per line) or CSV."""
+    Player1 = aliased(Player)
+    Player2 = aliased(Player)
+
+    # ✅ One ordered join for matches and their set scores; same rows as /matches/ (byes left out)
+    stmt = (
+        select(
+            Match.id,
+            Match.timestamp,
+            Match.tournament_id,
+            Match.round,
+            Match.stage,
+            Match.player1_id,
+            Player1.name.label("player1_name"),
+            Match.player2_id,
+            Player2.name.label("player2_name"),
+            Match.player1_score,
+            Match.player2_score,
+            Match.winner_id,
+            SetScore.player1_score.label("set_player1_score"),
+            SetScore.player2_score.label("set_player2_score"),
+        )
+        .join(Player1, Match.player1_id == Player1.id)
+        .join(Player2, Match.player2_id == Player2.id)
+        .outerjoin(SetScore, SetScore.match_id == Match.id)
+        .where(Match.timestamp.isnot(None))
+    )
+    stmt = filter_matches(stmt, player_id, tournament_id, stage, date_from, date_to)
+    stmt = stmt.order_by(Match.timestamp, Match.id, SetScore.set_number, SetScore.id)
+
+    # The generator pulls the next batch only once the previous chunk has been sent, so a slow
+    # client slows the cursor down instead of the rows piling up in memory. get_db is request
+    # scoped: the session stays open until the last chunk is out.
+    matches = grouped_match_rows(db, stmt)
+    if export_format == "csv":
+        body, media_type = csv_chunks(matches), "text/csv; charset=utf-8"
+    else:
+        body, media_type = ndjson_chunks(matches), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="matches.{export_format}"'},
+    )
 
 @router.delete("/{match_id}")
 async def delete_match(match_id: int, db: AsyncSession = Depends(get_db), admin=Depends(is_admin)):
@@ -151,14 +389,26 @@ async def delete_match(match_id: int, db: AsyncSession = Depends(get_db), admin=
     match = result.scalars().first()
 
     if not match:
-        logger.warning(f"Delete failed: Match {match_id} not found.")
+        logger.warning("Delete failed: Match %s not found.", match_id)
         raise HTTPException(status_code=404, detail=f"Match {match_id} not found.")
 
-    # ✅ Delete the match
+    tournament_id = match.tournament_id
+    old_result = (match.player1_id, match.player2_id, match.winner_id, await h2h.match_sets(db, match_id), match.timestamp)
+
+    # ✅ Delete the match (set scores and rating history first, Match.set_scores is never loaded)
+    await db.execute(delete(SetScore).where(SetScore.match_id == match_id))
+    await db.execute(delete(RatingHistory).where(RatingHistory.match_id == match_id))
     await db.delete(match)
+    await db.flush()
+    await h2h.apply_result(db, *old_result, sign=-1)
+    if tournament_id:
+        await tournament_progress.recount(db, tournament_id)
     await db.commit()
-    
-    logger.info(f"Match {match_id} deleted successfully.")
+
+    if tournament_id:
+        bus.publish(TOURNAMENTS, tournament_topic(tournament_id))
+
+    logger.info("Match %s deleted successfully.", match_id)
     return {"message": f"Match {match_id} deleted successfully."}
 
 @router.patch("/{match_id}")
@@ -169,6 +419,9 @@ async def update_match(match_id: int, update_data: dict, db: AsyncSession = Depe
     if not match:
         raise HTTPException(status_code=404, detail="Match not found.")
 
+    tournament_ids = {match.tournament_id}
+    old_result = (match.player1_id, match.player2_id, match.winner_id, await h2h.match_sets(db, match_id), match.timestamp)
+
     # ✅ Update match columns
     column_keys = {column.key for column in inspect(Match).mapper.column_attrs}
     for key, value in update_data.items():
@@ -189,96 +442,119 @@ async def update_match(match_id: int, update_data: dict, db: AsyncSession = Depe
                 player2_score=s["player2_score"],
             ))
 
-    await db.commit()
+    await db.flush()
     await db.refresh(match)
+    tournament_ids.add(match.tournament_id)
 
-    return {
-        "message": f"Match {match_id} updated successfully.",
-        "updated_data": update_data,
-    }
-
-@router.get("/head-to-head", response_model=HeadToHeadResponse)
-async def head_to_head(player1_id: int, player2_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Match)
-        .options(joinedload(Match.set_scores), joinedload(Match.tournament))  # ✅ add this
-        .where(
-            or_(
-                and_(Match.player1_id == player1_id, Match.player2_id == player2_id),
-                and_(Match.player1_id == player2_id, Match.player2_id == player1_id),
-            )
-        )
+    # ✅ Swap the old result for the new one in the head-to-head aggregate
+    await h2h.apply_result(db, *old_result, sign=-1)
+    await h2h.apply_result(
+        db, match.player1_id, match.player2_id, match.winner_id,
+        await h2h.match_sets(db, match_id), match.timestamp,
     )
-    matches = result.unique().scalars().all()
-
-    if not matches:
-        raise HTTPException(status_code=404, detail="No matches found between these players.")
-
-    valid_matches = [m for m in matches if m.winner_id and m.timestamp and m.player1_id and m.player2_id]
+    for tournament_id in tournament_ids - {None}:
+        await tournament_progress.recount(db, tournament_id)
 
-    if not valid_matches:
-        raise HTTPException(status_code=404, detail="No valid matches with results.")
+    await db.commit()
 
-    valid_matches.sort(key=lambda m: m.timestamp, reverse=True)
+    for tournament_id in tournament_ids - {None}:
+        bus.publish(TOURNAMENTS, tournament_topic(tournament_id))
 
-    stats = {
-        "player1_id": player1_id,
-        "player2_id": player2_id,
-        "matches_played": 0,
-        "player1_wins": 0,
-        "player2_wins": 0,
-        "player1_sets": 0,
-        "player2_sets": 0,
-        "player1_points": 0,
-        "player2_points": 0,
-        "match_history": [],
-        "most_recent_winner": None,
+    return {
+        "message": f"Match {match_id} updated successfully.",
+        "updated_data": update_data,
     }
 
-    for match in valid_matches:
-        stats["matches_played"] += 1
-
-        sets = [
-            {"player1_score": s.player1_score, "player2_score": s.player2_score}
-            for s in match.set_scores
-        ]
+@router.post("/recompute-ratings")
+async def recompute_all_ratings(db: AsyncSession = Depends(get_db), admin=Depends(is_admin)):
+    # numpy comes in with the replay, keep it off the boot path
+    from app.rating_replay import recompute_ratings
 
-        p1_set_wins = sum(1 for s in sets if s["player1_score"] > s["player2_score"])
-        p2_set_wins = sum(1 for s in sets if s["player2_score"] > s["player1_score"])
-        p1_points = sum(s["player1_score"] for s in sets)
-        p2_points = sum(s["player2_score"] for s in sets)
+    replayed = await recompute_ratings(db)
+    rankings_cache.invalidate()
+    logger.info("Ratings recomputed from %d matches", replayed)
+    return {"message": "Ratings recomputed from match history", "matches_replayed": replayed}
 
-        if match.player1_id == player1_id:
-            stats["player1_sets"] += p1_set_wins
-            stats["player2_sets"] += p2_set_wins
-            stats["player1_points"] += p1_points
-            stats["player2_points"] += p2_points
-        else:
-            stats["player1_sets"] += p2_set_wins
-            stats["player2_sets"] += p1_set_wins
-            stats["player1_points"] += p2_points
-            stats["player2_points"] += p1_points
+@router.get("/head-to-head", response_model=HeadToHeadResponse)
+async def head_to_head(
+    player1_id: int,
+    player2_id: int,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    # ✅ Summary is a primary-key lookup on the maintained aggregate
+    low, high = pair_key(player1_id, player2_id)
+    summary = await db.get(HeadToHead, (low, high))
+
+    if not summary:
+        raise HTTPException(status_code=404, detail="No matches found between these players.")
 
-        if match.winner_id == player1_id:
-            stats["player1_wins"] += 1
-        elif match.winner_id == player2_id:
-            stats["player2_wins"] += 1
+    p1_is_low = player1_id == low
+    player1_wins = summary.low_wins if p1_is_low else summary.high_wins
+    player2_wins = summary.high_wins if p1_is_low else summary.low_wins
+    total = summary.matches_played
+
+    # ✅ History is paginated newest first
+    stmt = (
+        select(
+            Match.id,
+            Match.player1_id,
+            Match.player2_id,
+            Match.winner_id,
+            Match.timestamp,
+            Match.tournament_id,
+            Tournament.name.label("tournament_name"),
+        )
+        .outerjoin(Tournament, Match.tournament_id == Tournament.id)
+        .where(pair_filter(player1_id, player2_id))
+        .where(Match.winner_id.isnot(None), Match.timestamp.isnot(None))
+    )
+    if cursor:
+        last_ts, last_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(Match.timestamp < last_ts, and_(Match.timestamp == last_ts, Match.id < last_id)))
+    rows = (await db.execute(stmt.order_by(Match.timestamp.desc(), Match.id.desc()).limit(limit + 1))).all()
+    next_cursor = encode_cursor(rows[limit - 1].timestamp, rows[limit - 1].id) if len(rows) > limit else None
+    rows = rows[:limit]
+
+    sets_by_match = defaultdict(list)
+    if rows:
+        score_result = await db.execute(
+            select(SetScore.match_id, SetScore.player1_score, SetScore.player2_score)
+            .where(SetScore.match_id.in_([m.id for m in rows]))
+            .order_by(SetScore.match_id, SetScore.set_number)
+        )
+        for s in score_result.all():
+            sets_by_match[s.match_id].append({"player1_score": s.player1_score, "player2_score": s.player2_score})
 
-        stats["match_history"].append({
+    match_history = []
+    for match in rows:
+        sets = sets_by_match.get(match.id, [])
+        match_history.append({
             "date": match.timestamp,
             "tournament": bool(match.tournament_id),
-            "tournament_name": match.tournament.name if match.tournament else None,  # ✅ FIX
+            "tournament_name": match.tournament_name,
             "winner_id": match.winner_id,
             "player1_id": match.player1_id,
             "player2_id": match.player2_id,
-            "player1_score": p1_set_wins,
-            "player2_score": p2_set_wins,
+            "player1_score": sum(1 for s in sets if s["player1_score"] > s["player2_score"]),
+            "player2_score": sum(1 for s in sets if s["player2_score"] > s["player1_score"]),
             "set_scores": sets
         })
 
-    total = stats["matches_played"]
-    stats["player1_win_percentage"] = round((stats["player1_wins"] / total) * 100, 2)
-    stats["player2_win_percentage"] = round((stats["player2_wins"] / total) * 100, 2)
-    stats["most_recent_winner"] = stats["match_history"][0]["winner_id"]
-
-    return stats
+    return {
+        "player1_id": player1_id,
+        "player2_id": player2_id,
+        "matches_played": total,
+        "player1_wins": player1_wins,
+        "player2_wins": player2_wins,
+        "player1_win_percentage": round((player1_wins / total) * 100, 2),
+        "player2_win_percentage": round((player2_wins / total) * 100, 2),
+        "player1_sets": summary.low_sets if p1_is_low else summary.high_sets,
+        "player2_sets": summary.high_sets if p1_is_low else summary.low_sets,
+        "player1_points": summary.low_points if p1_is_low else summary.high_points,
+        "player2_points": summary.high_points if p1_is_low else summary.low_points,
+        "most_recent_winner": summary.last_winner_id,
+        "match_history": match_history,
+        "next_cursor": next_cursor,
+    }
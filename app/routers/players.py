@@ -5,10 +5,14 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy import delete
 import logging
 
-from app.models import Player, Match, TournamentPlayer
-from app.schemas import PlayerCreate
+from typing import List
+
+from app.models import Player, Match, TournamentPlayer, RatingHistory, HeadToHead
+from app.schemas import PlayerCreate, RatingHistoryEntry
 from app.database import get_db
 from app.auth import is_admin
+from app.cache import rankings_cache, FastJSONResponse
+from app.invalidation import bus, PLAYERS
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -29,39 +33,41 @@ async def add_player(player: PlayerCreate, db: AsyncSession = Depends(get_db), a
     )
     db.add(new_player)
     await db.commit()
-    
+    await db.refresh(new_player)
+    rankings_cache.patch([(new_player.id, new_player.name, new_player.rating, new_player.matches)])
+
     return {"message": f"Player {player.name} added successfully!", "rating": 1500, "matches": 0}
 
 @router.get("/")
 async def get_players(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Player))
-    players = result.scalars().all()
-    return [{"id": p.id, "name": p.name, "rating": p.rating, "matches": p.matches} for p in players]
+    # ✅ Four columns straight to JSON; no Player entities or identity map for a read-only list
+    result = await db.execute(select(Player.id, Player.name, Player.rating, Player.matches))
+    return FastJSONResponse([row._asdict() for row in result])
 
 @router.get("/{player_id}")
 async def get_player(player_id: int, db: AsyncSession = Depends(get_db)):
-    logger.info(f"Fetching player with ID: {player_id}")
-    print(f"Fetching player with ID: {player_id}")
+    logger.debug("Fetching player with ID: %s", player_id)
 
     try:
         result = await db.execute(select(Player).where(Player.id == player_id))
         player = result.scalars().first()
 
         if not player:
-            logger.warning(f"Player {player_id} not found.")
+            logger.warning("Player %s not found.", player_id)
             raise HTTPException(status_code=404, detail="Player not found.")
 
         # Debugging: Check if 'handedness' exists
         if not hasattr(player, "handedness"):
-            print("DEBUG: 'handedness' attribute is missing from the Player model!")
+            logger.error("'handedness' attribute is missing from the Player model!")
             raise HTTPException(status_code=500, detail="Player model does not match database schema")
 
-        logger.info(f"Player found: {player.name} (ID: {player.id})")
+        logger.debug("Player found: %s (ID: %s)", player.name, player.id)
 
         return {
             "id": player.id,
             "name": player.name,
             "rating": player.rating,
+            "rating_deviation": round(player.rating_deviation, 1) if player.rating_deviation is not None else None,
             "matches": player.matches if player.matches is not None else 0,
             "handedness": player.handedness if player.handedness is not None else "Unknown",
             "forehand_rubber": player.forehand_rubber or "Unknown",
@@ -72,9 +78,34 @@ async def get_player(player_id: int, db: AsyncSession = Depends(get_db)):
         }
 
     except Exception as e:
-        logger.error(f"Error fetching player {player_id}: {e}", exc_info=True)
+        logger.error("Error fetching player %s: %s", player_id, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
     
+@router.get("/{player_id}/rating-history", response_model=List[RatingHistoryEntry])
+async def get_rating_history(player_id: int, db: AsyncSession = Depends(get_db)):
+    # ✅ Only columns in ix_rating_history_player_timestamp, so this is an index-only scan
+    result = await db.execute(
+        select(
+            RatingHistory.match_id,
+            RatingHistory.match_timestamp,
+            RatingHistory.rating_before,
+            RatingHistory.rating_after,
+            RatingHistory.k_factor,
+        )
+        .where(RatingHistory.player_id == player_id)
+        .order_by(RatingHistory.match_timestamp, RatingHistory.match_id)
+    )
+    return [
+        {
+            "match_id": row.match_id,
+            "timestamp": row.match_timestamp,
+            "rating_before": row.rating_before,
+            "rating_after": row.rating_after,
+            "k_factor": row.k_factor,
+        }
+        for row in result.all()
+    ]
+
 @router.delete("/{player_id}")
 async def delete_player(player_id: int, db: AsyncSession = Depends(get_db), admin=Depends(is_admin)):
     result = await db.execute(select(Player).where(Player.id == player_id))
@@ -93,6 +124,9 @@ async def delete_player(player_id: int, db: AsyncSession = Depends(get_db), admi
 
     # ✅ Delete all matches where the player was involved
     await db.execute(delete(Match).where((Match.player1_id == player_id) | (Match.player2_id == player_id)))
+    await db.execute(delete(HeadToHead).where(
+        (HeadToHead.player_low_id == player_id) | (HeadToHead.player_high_id == player_id)
+    ))
 
     # ✅ Delete the player after removing matches
     await db.delete(player)
@@ -106,6 +140,8 @@ async def delete_player(player_id: int, db: AsyncSession = Depends(get_db), admi
             detail="Cannot delete player due to existing tournament or match links."
         )
 
+    rankings_cache.remove(player_id)
+    bus.publish(PLAYERS)
     return {"message": f"Player {player.name} and their matches deleted successfully."}
 
 @router.patch("/{player_id}")
@@ -123,5 +159,7 @@ async def update_player(player_id: int, player_update: dict, db: AsyncSession =
 
     await db.commit()
     await db.refresh(player)
+    rankings_cache.patch([(player.id, player.name, player.rating, player.matches)])
+    bus.publish(PLAYERS)
     return player
 
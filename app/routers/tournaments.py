@@ -1,19 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from datetime import datetime, timezone
-from app.models import Tournament, TournamentPlayer, Player, SetScore, TournamentStanding, Match
-from app.schemas import TournamentCreate, TournamentResponse, TournamentDetailsResponse, MatchResponse, MatchResult, CustomizedTournamentCreate, CustomTournamentSetup
-from sqlalchemy.orm import selectinload, aliased
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from app.models import Tournament, TournamentPlayer, Player, SetScore, TournamentStanding, Match, TournamentProgress
+from app.schemas import TournamentCreate, TournamentResponse, TournamentDetailsResponse, MatchResponse, MatchResult, CustomizedTournamentCreate, CustomTournamentSetup, TournamentResultBatch
+from sqlalchemy.orm import joinedload, aliased
 from app.database import get_db
-from sqlalchemy import delete, update
-from typing import List
+from sqlalchemy import delete, update, insert
+from typing import List, Optional
 from collections import defaultdict
-from math import ceil, log2
-from app.elo import calculate_elo
+import hashlib
+import logging
+from pytz import timezone as dt_timezone
+from app.rating_service import RatingBatch, sorted_by_timestamp
 from app.auth import is_admin
+from app.idempotency import begin as begin_idempotent, idempotency_key_header
+from app.cache import tournament_details_cache, encode_json, etag_matches, FastJSONResponse
+from app.invalidation import bus, TOURNAMENTS, PLAYERS, tournament_topic
+from app import head_to_head as h2h
+from app import tournament_progress
+from app import bracket, seeding
 
 router = APIRouter(tags=["Tournaments"])
+logger = logging.getLogger(__name__)
+sgt = dt_timezone("Asia/Singapore")
+
+def publish_tournament_change(tournament_id: int):
+    bus.publish(TOURNAMENTS, tournament_topic(tournament_id))
+
+async def played_pairs(tournament_id: int, db: AsyncSession):
+    # Pairs whose head-to-head rows must be rebuilt when this tournament's matches go away
+    result = await db.execute(
+        select(Match.player1_id, Match.player2_id).where(
+            Match.tournament_id == tournament_id,
+            Match.winner_id.isnot(None),
+            Match.player2_id.isnot(None)
+        )
+    )
+    return result.all()
 
 @router.post("/", response_model=dict)
 async def create_tournament(tournament: TournamentCreate, db: AsyncSession = Depends(get_db), admin=Depends(is_admin)):
@@ -44,34 +70,29 @@ async def create_tournament(tournament: TournamentCreate, db: AsyncSession = Dep
     await db.flush()
 
     players = tournament.player_ids[:]
+    tournament_id = new_tournament.id
 
     group_map = {}
     if tournament.num_groups > 0:
         for i, pid in enumerate(players):
-            group_number = i % tournament.num_groups
-            db.add(TournamentPlayer(
-                tournament_id=new_tournament.id,
-                player_id=pid,
-                group_number=group_number
-            ))
-            group_map.setdefault(group_number, []).append(pid)
+            group_map.setdefault(i % tournament.num_groups, []).append(pid)
     else:
-        for pid in players:
-            db.add(TournamentPlayer(
-                tournament_id=new_tournament.id,
-                player_id=pid,
-                group_number=0  # ✅ Use 0 to mean "no group"
-            ))
+        group_map[0] = players  # ✅ Use 0 to mean "no group"
 
-    await db.flush()
-    tournament_id = new_tournament.id
+    # ✅ One executemany for all tournament players
+    await db.execute(insert(TournamentPlayer), [
+        {"tournament_id": tournament_id, "player_id": pid, "group_number": group_number}
+        for group_number, pids in group_map.items()
+        for pid in pids
+    ])
 
     if tournament.num_groups > 0:
-        await generate_group_stage_matches(tournament_id, db)
+        await generate_group_stage_matches(tournament_id, db, groups=group_map)
     else:
         await generate_knockout_stage_matches(new_tournament, db)
 
     await db.commit()
+    publish_tournament_change(tournament_id)
     return {"message": "Tournament created and matches generated", "tournament_id": tournament_id}
 
 @router.post("/custom", response_model=dict)
@@ -102,296 +123,126 @@ async def create_customized_tournament(
 
     tournament_id = new_tournament.id  # cache now
 
-    # Add players to tournament groups
-    for group in data.customized_groups:
-        for pid in group.player_ids:
-            db.add(TournamentPlayer(
-                tournament_id=tournament_id,
-                player_id=pid,
-                group_number=group.group_number
-            ))
-
-    await db.flush()
-
-    # Generate group matches
-    for group in data.customized_groups:
-        players = group.player_ids
-        for i in range(len(players)):
-            for j in range(i + 1, len(players)):
-                db.add(Match(
-                    tournament_id=tournament_id,
-                    player1_id=players[i],
-                    player2_id=players[j],
-                    round=f"Group {group.group_number + 1}",
-                    stage="group"
-                ))
+    groups = {group.group_number: group.player_ids for group in data.customized_groups}
 
-    # Add knockout matches
-    for m in data.customized_knockout:
-        if m.player1_id and m.player2_id:
-            db.add(Match(
-                tournament_id=tournament_id,
-                player1_id=m.player1_id,
-                player2_id=m.player2_id,
-                round=f"Round of {knockout_size}",
-                stage="knockout"
-            ))
-        elif m.player1_id:
-            db.add(Match(
-                tournament_id=tournament_id,
-                player1_id=m.player1_id,
-                player2_id=None,
-                winner_id=m.player1_id,
-                player1_score=1,
-                player2_score=0,
-                round=f"Round of {knockout_size}",
-                stage="knockout"
-            ))
-        elif m.player2_id:
-            db.add(Match(
-                tournament_id=tournament_id,
-                player1_id=m.player2_id,
-                player2_id=None,
-                winner_id=m.player2_id,
-                player1_score=1,
-                player2_score=0,
-                round=f"Round of {knockout_size}",
-                stage="knockout"
-            ))
-        else:
-            # Skip empty match
-            continue
+    # Add players to tournament groups
+    tournament_players = [
+        {"tournament_id": tournament_id, "player_id": pid, "group_number": group_number}
+        for group_number, pids in groups.items()
+        for pid in pids
+    ]
+    if tournament_players:
+        await db.execute(insert(TournamentPlayer), tournament_players)
+
+    # Group matches in one executemany, then the linked knockout bracket
+    first_round = [(m.player1_id, m.player2_id) for m in data.customized_knockout]
+    if len(first_round) > knockout_size // 2:
+        raise HTTPException(status_code=400, detail="Too many knockout matches for the knockout size.")
+    first_round += [(None, None)] * (knockout_size // 2 - len(first_round))
+
+    match_rows = round_robin_rows(tournament_id, groups)
+    if match_rows:
+        await db.execute(insert(Match), match_rows)
+    if any(p1 or p2 for p1, p2 in first_round):
+        db.add_all(bracket.build(tournament_id, first_round))
+    await tournament_progress.recount(db, tournament_id)
 
     await db.commit()
+    publish_tournament_change(tournament_id)
 
     return {
         "message": "Customized tournament created",
         "tournament_id": tournament_id
     }
 
-@router.get("/", response_model=List[TournamentResponse])
-async def get_all_tournaments(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Tournament)
-        .options(
-            selectinload(Tournament.players),
-            selectinload(Tournament.standings)
-        )
-        .order_by(Tournament.date.desc())
+@dataclass(slots=True)
+class TournamentSummary:
+    """One TournamentResponse, filled from column rows instead of Tournament entities."""
+    id: int
+    name: str
+    date: date
+    num_players: int
+    num_groups: int
+    players_advance_per_group: Optional[int]
+    created_at: date
+    knockout_size: Optional[int]
+    is_customized: Optional[int]
+    player_ids: list = field(default_factory=list)
+    final_standings: dict = field(default_factory=dict)
+
+    def as_json(self):
+        # TournamentResponse field order, so the payload matches what response_model produced
+        return {
+            "id": self.id,
+            "name": self.name,
+            "date": self.date.isoformat(),
+            "num_players": self.num_players,
+            "num_groups": self.num_groups,
+            "players_advance_per_group": self.players_advance_per_group,
+            "created_at": self.created_at.isoformat(),
+            "player_ids": self.player_ids,
+            "knockout_size": self.knockout_size,
+            "final_standings": self.final_standings,
+            "is_customized": self.is_customized or 0,
+        }
+
+
+async def load_tournament_summaries(db: AsyncSession, tournament_id: Optional[int] = None):
+    # Three column queries (tournaments, entrants, standings); rows are plain tuples, nothing is tracked
+    query = select(
+        Tournament.id, Tournament.name, Tournament.date, Tournament.num_players, Tournament.num_groups,
+        Tournament.players_advance_per_group, Tournament.created_at, Tournament.knockout_size,
+        Tournament.is_customized,
     )
-    tournaments = result.scalars().all()
-
-    response = []
-    for t in tournaments:
-        player_ids = [tp.player_id for tp in t.players]
-        standings_dict = {str(s.position): s.player_id for s in t.standings}
-
-        response.append(TournamentResponse(
-            id=t.id,
-            name=t.name,
-            date=t.date,
-            num_players=t.num_players,
-            num_groups=t.num_groups,
-            knockout_size=t.knockout_size,
-            players_advance_per_group=t.players_advance_per_group,
-            created_at=t.created_at,
-            player_ids=player_ids,
-            final_standings=standings_dict
-        ))
+    players = select(TournamentPlayer.tournament_id, TournamentPlayer.player_id).order_by(TournamentPlayer.id)
+    standings = (
+        select(TournamentStanding.tournament_id, TournamentStanding.position, TournamentStanding.player_id)
+        .order_by(TournamentStanding.position)
+    )
+    if tournament_id is None:
+        query = query.order_by(Tournament.date.desc())
+    else:
+        query = query.where(Tournament.id == tournament_id)
+        players = players.where(TournamentPlayer.tournament_id == tournament_id)
+        standings = standings.where(TournamentStanding.tournament_id == tournament_id)
+
+    summaries = {row[0]: TournamentSummary(*row) for row in await db.execute(query)}
+    if not summaries:
+        return []
+    for tid, player_id in await db.execute(players):
+        if tid in summaries:
+            summaries[tid].player_ids.append(player_id)
+    for tid, position, player_id in await db.execute(standings):
+        if tid in summaries:
+            summaries[tid].final_standings[str(position)] = player_id
+    return list(summaries.values())
 
-    return response
+
+@router.get("/", response_model=List[TournamentResponse])
+async def get_all_tournaments(db: AsyncSession = Depends(get_db)):
+    summaries = await load_tournament_summaries(db)
+    return FastJSONResponse([t.as_json() for t in summaries])
 
 @router.get("/{tournament_id}", response_model=TournamentResponse)
 async def get_tournament(tournament_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
-        select(Tournament)
-        .options(
-            selectinload(Tournament.players),
-            selectinload(Tournament.standings)
-        )
-        .where(Tournament.id == tournament_id)
-    )
-    tournament = result.scalars().first()
-    if not tournament:
+    summaries = await load_tournament_summaries(db, tournament_id)
+    if not summaries:
         raise HTTPException(status_code=404, detail="Tournament not found.")
-    
-    player_ids = [tp.player_id for tp in tournament.players]
-    standings_dict = {str(s.position): s.player_id for s in tournament.standings}
-
-    return TournamentResponse(
-        id=tournament.id,
-        name=tournament.name,
-        date=tournament.date,
-        num_players=tournament.num_players,
-        num_groups=tournament.num_groups,
-        knockout_size=tournament.knockout_size,
-        created_at=tournament.created_at,
-        player_ids=player_ids,
-        players_advance_per_group=tournament.players_advance_per_group,
-        final_standings=standings_dict
-    )
+    return FastJSONResponse(summaries[0].as_json())
 
-@router.get("/{tournament_id}/details", response_model=TournamentDetailsResponse)
-async def get_tournament_details(tournament_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Tournament).where(Tournament.id == tournament_id))
-    tournament = result.scalars().first()
-    if not tournament:
-        raise HTTPException(status_code=404, detail="Tournament not found.")
-    
-    # ✅ Custom tournament fast path
-    '''
-    if tournament.is_customized:
-        Player1 = aliased(Player)
-        Player2 = aliased(Player)
-
-        match_query = (
-            select(
-                Match.id,
-                Match.tournament_id,
-                Match.player1_id,
-                Match.player2_id,
-                Player1.name.label("player1_name"),
-                Player2.name.label("player2_name"),
-                Match.player1_score,
-                Match.player2_score,
-                Match.winner_id,
-                Match.round,
-                Match.stage,
-            )
-            .outerjoin(Player1, Match.player1_id == Player1.id)
-            .outerjoin(Player2, Match.player2_id == Player2.id)
-            .where(Match.tournament_id == tournament_id)
-        )
-        result = await db.execute(match_query)
-        matches = result.all()
-
-        match_ids = [m.id for m in matches]
-        score_results = await db.execute(
-            select(SetScore).where(SetScore.match_id.in_(match_ids))
-        )
-        set_scores_by_match = {}
-        for s in score_results.scalars().all():
-            set_scores_by_match.setdefault(s.match_id, []).append([s.player1_score, s.player2_score])
-
-        group_matches, knockout_matches = [], []
-        bracket_by_round = defaultdict(list)
-
-        for match in matches:
-            match_obj = MatchResponse(
-                id=match.id,
-                player1_id=match.player1_id,
-                player2_id=match.player2_id,
-                player1_name=match.player1_name,
-                player2_name=match.player2_name,
-                player1_score=match.player1_score,
-                player2_score=match.player2_score,
-                winner_id=match.winner_id,
-                round=match.round,
-                stage=match.stage,
-                set_scores=set_scores_by_match.get(match.id, [])
-            )
-
-            if match.stage == "group":
-                group_matches.append(match_obj)
-            elif match.stage == "knockout":
-                bracket_by_round[match.round].append(match_obj)
-                knockout_matches.append(match_obj)
-
-        # ✅ Final standings
-        standings_result = await db.execute(
-            select(TournamentStanding).where(TournamentStanding.tournament_id == tournament_id)
-        )
-        standings_entries = standings_result.scalars().all()
-        final_standings = {f"{s.position}": s.player_id for s in standings_entries}
-
-        return TournamentDetailsResponse(
-            id=tournament.id,
-            name=tournament.name,
-            date=tournament.date,
-            num_players=tournament.num_players,
-            num_groups=tournament.num_groups,
-            knockout_size=tournament.knockout_size,
-            created_at=tournament.created_at,
-            group_matches=group_matches,
-            knockout_matches=knockout_matches,
-            individual_matches=[],  # You can leave this out if unused
-            final_standings=final_standings,
-            group_matrix={"players": [], "results": {}, "rankings": {}},
-            knockout_bracket=dict(bracket_by_round)
-        )
-    '''
-
-    Player1 = aliased(Player)
-    Player2 = aliased(Player)
-
-    bracket_by_round = defaultdict(list)
-
-    # 🏓 Fetch matches
-    match_query = (
-        select(
-            Match.id,
-            Match.tournament_id,
-            Match.player1_id,
-            Match.player2_id,
-            Player1.name.label("player1_name"),
-            Player2.name.label("player2_name"),
-            Match.player1_score,
-            Match.player2_score,
-            Match.winner_id,
-            Match.round,
-            Match.stage,
-        )
-        .outerjoin(Player1, Match.player1_id == Player1.id)
-        .outerjoin(Player2, Match.player2_id == Player2.id)
-        .where(Match.tournament_id == tournament_id)
-    )
-    result = await db.execute(match_query)
-    matches = result.all()
-
-    match_ids = [m.id for m in matches]
-    score_results = await db.execute(
-        select(SetScore).where(SetScore.match_id.in_(match_ids))
-    )
-    set_scores_by_match = {}
-    for s in score_results.scalars().all():
-        set_scores_by_match.setdefault(s.match_id, []).append([s.player1_score, s.player2_score])
-
-    group_matches, knockout_matches, individual_matches = [], [], []
-    group_matrix = { "players": [], "results": {} }
+def build_group_matrix(group_matches, players_by_group):
+    group_matrix = {"players": [], "results": {}}
     group_player_set = set()
 
-    for match in matches:
-        match_obj = MatchResponse(
-            id=match.id,
-            player1_id=match.player1_id,
-            player2_id=match.player2_id,
-            player1_name=match.player1_name,
-            player2_name=match.player2_name,
-            player1_score=match.player1_score,
-            player2_score=match.player2_score,
-            winner_id=match.winner_id,
-            round=match.round,
-            stage=match.stage,
-            set_scores=set_scores_by_match.get(match.id, [])
-        )
-
-        if match.stage == "group":
-            group_matches.append(match_obj)
-            group_player_set.add(match.player1_id)
-            group_player_set.add(match.player2_id)
-            key = f"{match.player1_id}-{match.player2_id}"
-            group_matrix["results"][key] = {
-                "winner": match.winner_id,
-                "score": f"{match.player1_score}-{match.player2_score}",
-                "set_scores": " ".join(f"({s[0]}-{s[1]})" for s in match_obj.set_scores)
-            }
-
-        elif match.stage == "knockout":
-            knockout_matches.append(match_obj)
-            round_label = match.round
-            bracket_by_round[round_label].append(match_obj)
-        else:
-            individual_matches.append(match_obj)
+    for match in group_matches:
+        group_player_set.add(match.player1_id)
+        group_player_set.add(match.player2_id)
+        key = f"{match.player1_id}-{match.player2_id}"
+        group_matrix["results"][key] = {
+            "winner": match.winner_id,
+            "score": f"{match.player1_score}-{match.player2_score}",
+            "set_scores": " ".join(f"({s[0]}-{s[1]})" for s in match.set_scores)
+        }
 
     group_matrix["players"] = sorted(list(group_player_set))
 
@@ -425,16 +276,6 @@ async def get_tournament_details(tournament_id: int, db: AsyncSession = Depends(
             player_stats[p2]["points_won"] += s[1]
             player_stats[p2]["points_lost"] += s[0]
 
-    # ✅ Load groupings
-    result = await db.execute(
-        select(Tournament).options(selectinload(Tournament.players)).where(Tournament.id == tournament_id)
-    )
-    tournament = result.scalars().first()
-
-    players_by_group = defaultdict(list)
-    for tp in tournament.players:
-        players_by_group[tp.group_number].append(tp.player_id)
-
     def sort_key(pid):
         stats = player_stats[pid]
         return (
@@ -457,18 +298,105 @@ async def get_tournament_details(tournament_id: int, db: AsyncSession = Depends(
         group_rankings[group_num] = ranked
 
     group_matrix["rankings"] = group_rankings
+    return group_matrix
 
-    # ✅ Final standings from TournamentStanding table
-    standings_result = await db.execute(
-        select(TournamentStanding).where(TournamentStanding.tournament_id == tournament_id)
+@router.get("/{tournament_id}/details", response_model=TournamentDetailsResponse)
+async def get_tournament_details(tournament_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    # ✅ Cached payload stays valid until this tournament or any player name changes
+    topics = (tournament_topic(tournament_id), PLAYERS)
+    cached = tournament_details_cache.get(tournament_id, topics)
+    if cached is None:
+        versions = tournament_details_cache.versions(topics)
+        details = await load_tournament_details(tournament_id, db)
+        payload = encode_json(jsonable_encoder(details))
+        cached = (payload, f'"{tournament_id}-{hashlib.blake2b(payload, digest_size=12).hexdigest()}"')
+        tournament_details_cache.put(tournament_id, versions, cached)
+
+    payload, etag = cached
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return FastJSONResponse(payload, headers={"ETag": etag})
+
+async def load_tournament_details(tournament_id: int, db: AsyncSession):
+    # 1️⃣ Tournament with its players and standings in one statement
+    result = await db.execute(
+        select(Tournament)
+        .options(joinedload(Tournament.players), joinedload(Tournament.standings))
+        .where(Tournament.id == tournament_id)
+    )
+    tournament = result.unique().scalars().first()
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournament not found.")
+
+    Player1 = aliased(Player)
+    Player2 = aliased(Player)
+
+    # 2️⃣ Matches, player names and set scores in one ordered join
+    match_query = (
+        select(
+            Match.id,
+            Match.player1_id,
+            Match.player2_id,
+            Player1.name.label("player1_name"),
+            Player2.name.label("player2_name"),
+            Match.player1_score,
+            Match.player2_score,
+            Match.winner_id,
+            Match.round,
+            Match.stage,
+            SetScore.player1_score.label("set_player1_score"),
+            SetScore.player2_score.label("set_player2_score"),
+        )
+        .outerjoin(Player1, Match.player1_id == Player1.id)
+        .outerjoin(Player2, Match.player2_id == Player2.id)
+        .outerjoin(SetScore, SetScore.match_id == Match.id)
+        .where(Match.tournament_id == tournament_id)
+        .order_by(Match.id, SetScore.set_number, SetScore.id)
     )
-    standings_entries = standings_result.scalars().all()
+    rows = (await db.execute(match_query)).all()
+
+    matches = {}
+    for row in rows:
+        match_obj = matches.get(row.id)
+        if match_obj is None:
+            match_obj = matches[row.id] = MatchResponse(
+                id=row.id,
+                player1_id=row.player1_id,
+                player2_id=row.player2_id,
+                player1_name=row.player1_name,
+                player2_name=row.player2_name,
+                player1_score=row.player1_score,
+                player2_score=row.player2_score,
+                winner_id=row.winner_id,
+                round=row.round,
+                stage=row.stage,
+                set_scores=[]
+            )
+        if row.set_player1_score is not None:
+            match_obj.set_scores.append([row.set_player1_score, row.set_player2_score])
+
+    group_matches, knockout_matches, individual_matches = [], [], []
+    bracket_by_round = defaultdict(list)
+    for match_obj in matches.values():
+        if match_obj.stage == "group":
+            group_matches.append(match_obj)
+        elif match_obj.stage == "knockout":
+            knockout_matches.append(match_obj)
+            bracket_by_round[match_obj.round].append(match_obj)
+        else:
+            individual_matches.append(match_obj)
+
+    players_by_group = defaultdict(list)
+    for tp in tournament.players:
+        players_by_group[tp.group_number].append(tp.player_id)
+
+    group_matrix = build_group_matrix(group_matches, players_by_group)
+
+    # ✅ Final standings from TournamentStanding table
     final_standings = {}
-    for s in standings_entries:
+    for s in tournament.standings:
         final_standings[f"{s.position}"] = s.player_id
 
-    print("🏁 Final standings in details endpoint:", final_standings)
-
     return TournamentDetailsResponse(
         id=tournament.id,
         name=tournament.name,
@@ -485,25 +413,38 @@ async def get_tournament_details(tournament_id: int, db: AsyncSession = Depends(
         knockout_bracket=dict(bracket_by_round)
     )
 
-@router.post("/matches/{match_id}/result")
-async def submit_tournament_match_result(match_id: int, result: MatchResult, db: AsyncSession = Depends(get_db), admin=Depends(is_admin)):
+async def load_match_info(db: AsyncSession, match_ids):
     # Select tournament_id, stage, round without triggering lazy load
-    match_query = await db.execute(
+    result = await db.execute(
         select(
             Match.id,
             Match.tournament_id,
             Match.stage,
             Match.round,
             Match.player1_id,
-            Match.player2_id
-        ).where(Match.id == match_id)
+            Match.player2_id,
+            Match.winner_id,
+            Match.timestamp
+        ).where(Match.id.in_(match_ids))
     )
-    match_info = match_query.first()
-
-    if not match_info:
-        raise HTTPException(status_code=404, detail="Match not found")
-
-    tournament_id = match_info.tournament_id
+    return {row.id: row for row in result.all()}
+
+async def apply_tournament_result(db: AsyncSession, batch: RatingBatch, match_info, result: MatchResult):
+    """Write one result (scores, sets, head-to-head, rating) inside the caller's transaction."""
+    match_id = match_info.id
+    # ✅ Stamped like friendly matches (SGT wall clock) so the match row, head-to-head and rating
+    # history agree, and a full replay orders them the same way
+    timestamp = result.timestamp or datetime.now(sgt)
+    if match_info.stage == "knockout" and (match_info.player1_id is None or match_info.player2_id is None):
+        raise HTTPException(status_code=400, detail=f"Match {match_id} is a bye or still waiting for its players.")
+
+    # ✅ A resubmitted result replaces the previous one in the head-to-head aggregate and rating history
+    if match_info.winner_id is not None:
+        await h2h.apply_result(
+            db, match_info.player1_id, match_info.player2_id, match_info.winner_id,
+            await h2h.match_sets(db, match_id), match_info.timestamp, sign=-1,
+        )
+        await batch.forget(match_id)
 
     # Update match scores and winner
     await db.execute(
@@ -514,7 +455,8 @@ async def submit_tournament_match_result(match_id: int, result: MatchResult, db:
             player2_id=result.player2_id,
             winner_id=result.winner_id,
             player1_score=result.player1_score,
-            player2_score=result.player2_score
+            player2_score=result.player2_score,
+            timestamp=timestamp,
         )
     )
 
@@ -532,70 +474,113 @@ async def submit_tournament_match_result(match_id: int, result: MatchResult, db:
             player2_score=s.player2_score
         ))
 
-    await db.commit()
-
-        # 🧠 Update Elo ratings and store in global Match table
-    stmt = select(Player).where(Player.id.in_([result.player1_id, result.player2_id]))
-    players = (await db.execute(stmt)).scalars().all()
-
-    if len(players) < 2:
-        raise HTTPException(status_code=400, detail="Both players must exist.")
-
-    player1, player2 = players if players[0].id == result.player1_id else players[::-1]
-
-    if result.winner_id not in [player1.id, player2.id]:
-        raise HTTPException(status_code=400, detail="Winner must be one of the players.")
-
-    # ✅ Determine outcome
-    outcome1 = 1 if result.winner_id == player1.id else 0
-    outcome2 = 1 - outcome1
+    await db.flush()
+    await h2h.apply_result(
+        db, result.player1_id, result.player2_id, result.winner_id,
+        [(s.player1_score, s.player2_score) for s in result.sets], timestamp,
+    )
+    await tournament_progress.record_result(db, match_info.tournament_id, match_info.stage, match_info.winner_id is not None)
+    if match_info.stage == "knockout":
+        # ✅ Winner (and a semifinal loser) move straight into their linked slots
+        await bracket.advance(db, match_id)
+
+    # 🧠 Rate with the configured engine; rating history goes in the same transaction
+    batch.rate(match_id, result.player1_id, result.player2_id, result.winner_id, timestamp)
+
+async def progress_tournament(tournament_id: int, db: AsyncSession):
+    """Start the KO stage once the groups are done, inside the caller's transaction."""
+    # ✅ Counters instead of scanning the stage; the row lock makes one request start the KO stage
+    progress = await tournament_progress.load(db, tournament_id)
+    logger.debug(
+        "Tournament %s: %d/%d group matches complete",
+        tournament_id, progress.group_completed, progress.group_total,
+    )
 
-    # ✅ Calculate new ratings
-    new_rating1 = int(calculate_elo(player1.rating, player2.rating, outcome1, player1.matches or 0))
-    new_rating2 = int(calculate_elo(player2.rating, player1.rating, outcome2, player2.matches or 0))
+    if tournament_progress.groups_complete(progress) and not progress.knockout_generated:
+        tournament = await db.get(Tournament, tournament_id)
+        logger.info("Tournament %s: all group matches complete, generating KO bracket", tournament_id)
+        await generate_knockout_stage_matches(tournament, db)
+    # KO results already moved their players on in apply_tournament_result
 
-    # ✅ Update player stats
-    player1.rating = new_rating1
-    player2.rating = new_rating2
-    player1.matches = (player1.matches or 0) + 1
-    player2.matches = (player2.matches or 0) + 1
+@router.post("/matches/{match_id}/result")
+async def submit_tournament_match_result(
+    match_id: int,
+    result: MatchResult,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(is_admin),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
+):
+    idempotency, replay = await begin_idempotent(db, f"POST /tournaments/matches/{match_id}/result", idempotency_key, result)
+    if replay:
+        return replay
 
-    await db.commit()
+    match_info = (await load_match_info(db, [match_id])).get(match_id)
 
+    if not match_info:
+        raise HTTPException(status_code=404, detail="Match not found")
 
-    # Check if all group matches are done and KO hasn't started
-    group_match_result = await db.execute(
-        select(Match)
-        .where(Match.tournament_id == tournament_id)
-        .where(Match.stage == "group")
-    )
-    group_matches = group_match_result.scalars().all()
-    all_group_complete = all(m.winner_id is not None for m in group_matches)
-    print("Checking if group matches are complete and knockout can start...")
-    print("Group matches found:", len(group_matches))
-    print("Matches with results:", sum(m.winner_id is not None for m in group_matches))
-
-    # Check if knockout matches already exist
-    knockout_result = await db.execute(
-        select(Match)
-        .where(Match.tournament_id == tournament_id)
-        .where(Match.stage == "knockout")
-    )
-    knockout_exists = len(knockout_result.scalars().all()) > 0
+    tournament_id = match_info.tournament_id
 
-    if all_group_complete and not knockout_exists:
-        tournament = await db.get(Tournament, tournament_id)
-        print("✅ All group matches complete. Generating KO bracket.")
-        await generate_knockout_stage_matches(tournament, db)
+    # ✅ Lock the players first (same order as every other rating write) and validate
+    batch = RatingBatch(db)
+    await batch.lock([result.player1_id, result.player2_id])
+    batch.check(result.player1_id, result.player2_id, result.winner_id)
 
-        # 🚫 Don't advance KO immediately after generating it
-        print("🛑 Skipping KO advancement: KO just generated.")
-    else:
-        # ✅ Only advance if we're already in KO stage
-        await advance_knockout_rounds(tournament_id, db)
+    await apply_tournament_result(db, batch, match_info, result)
+    # ✅ The result and any KO stage it completes commit together
+    await progress_tournament(tournament_id, db)
+    response = {"message": "Tournament match result recorded"}
+    if idempotency:
+        await idempotency.complete(response)
+    await batch.commit()
 
+    publish_tournament_change(tournament_id)
+    return response
 
-    return {"message": "Tournament match result recorded"}
+@router.post("/{tournament_id}/results")
+async def submit_tournament_results(
+    tournament_id: int,
+    payload: TournamentResultBatch,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(is_admin),
+    idempotency_key: Optional[str] = Depends(idempotency_key_header),
+):
+    # ✅ A whole score sheet in one transaction: one lock pass, one commit, one advancement check
+    if not payload.results:
+        raise HTTPException(status_code=400, detail="No results submitted.")
+    if len({r.match_id for r in payload.results}) != len(payload.results):
+        raise HTTPException(status_code=400, detail="Each match may only appear once per batch.")
+
+    idempotency, replay = await begin_idempotent(db, f"POST /tournaments/{tournament_id}/results", idempotency_key, payload)
+    if replay:
+        return replay
+
+    matches = await load_match_info(db, [r.match_id for r in payload.results])
+    for r in payload.results:
+        info = matches.get(r.match_id)
+        if info is None or info.tournament_id != tournament_id:
+            raise HTTPException(status_code=404, detail=f"Match {r.match_id} not found in tournament {tournament_id}")
+
+    batch = RatingBatch(db)
+    await batch.lock([pid for r in payload.results for pid in (r.player1_id, r.player2_id)])
+    for r in payload.results:
+        batch.check(r.player1_id, r.player2_id, r.winner_id)
+
+    # ✅ Rate in the order the matches were played
+    for r in sorted_by_timestamp(payload.results):
+        info = matches[r.match_id]
+        if info.stage == "knockout":
+            # An earlier result in this batch may have moved its winner into this match's slots
+            info = (await load_match_info(db, [r.match_id]))[r.match_id]
+        await apply_tournament_result(db, batch, info, r)
+    await progress_tournament(tournament_id, db)
+    response = {"message": f"{len(payload.results)} tournament match results recorded"}
+    if idempotency:
+        await idempotency.complete(response)
+    await batch.commit()
+
+    publish_tournament_change(tournament_id)
+    return response
 
 @router.post("/{tournament_id}/reset")
 async def reset_tournament(tournament_id: int, db: AsyncSession = Depends(get_db), admin=Depends(is_admin)):
@@ -604,7 +589,8 @@ async def reset_tournament(tournament_id: int, db: AsyncSession = Depends(get_db
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
 
-    print(f"♻️ Resetting tournament ID: {tournament_id}")
+    logger.info("Resetting tournament %s", tournament_id)
+    pairs = await played_pairs(tournament_id, db)
 
     # Delete all set scores
     await db.execute(
@@ -619,6 +605,7 @@ async def reset_tournament(tournament_id: int, db: AsyncSession = Depends(get_db
     await db.execute(
         delete(Match).where(Match.tournament_id == tournament_id)
     )
+    await h2h.rebuild(db, pairs)
 
     # Delete all final standings
     await db.execute(
@@ -632,6 +619,7 @@ async def reset_tournament(tournament_id: int, db: AsyncSession = Depends(get_db
         await generate_knockout_stage_matches(tournament, db)
 
     await db.commit()
+    publish_tournament_change(tournament_id)
     return {"message": f"Tournament {tournament_id} reset and matches regenerated"}
 
 @router.delete("/{tournament_id}")
@@ -644,24 +632,28 @@ async def delete_tournament(tournament_id: int, db: AsyncSession = Depends(get_d
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
 
-    # Step 1: Get all matches for this tournament
-    matches_result = await db.execute(select(Match).where(Match.tournament_id == tournament_id))
-    matches = matches_result.scalars().all()
+    # Step 1: Get all match ids for this tournament
+    matches_result = await db.execute(select(Match.id).where(Match.tournament_id == tournament_id))
+    match_ids = matches_result.scalars().all()
+    pairs = await played_pairs(tournament_id, db)
 
-    match_ids = [match.id for match in matches]
-    
     # Step 2: Delete set scores first (if any)
     if match_ids:
         await db.execute(delete(SetScore).where(SetScore.match_id.in_(match_ids)))
 
     # Step 3: Delete the matches
     await db.execute(delete(Match).where(Match.tournament_id == tournament_id))
+    await h2h.rebuild(db, pairs)
+    await db.execute(delete(TournamentProgress).where(TournamentProgress.tournament_id == tournament_id))
+    await db.execute(delete(TournamentStanding).where(TournamentStanding.tournament_id == tournament_id))
+    await db.execute(delete(TournamentPlayer).where(TournamentPlayer.tournament_id == tournament_id))
 
-    # Step 4: Delete the tournament
+    # Step 4: Delete the tournament (its relationships are passive_deletes, nothing left to load)
     await db.delete(tournament)
 
     # Commit the changes
     await db.commit()
+    publish_tournament_change(tournament_id)
 
     return {"message": f"Tournament {tournament_id} and its matches were deleted successfully."}
 
@@ -707,8 +699,10 @@ async def setup_custom_tournament(
                 round=m.round,
                 stage=m.stage
             ))
+    await tournament_progress.recount(db, tournament_id)
 
     await db.commit()
+    publish_tournament_change(tournament_id)
     return {"message": "Custom tournament setup complete"}
 
 @router.post("/{tournament_id}/generate-ko")
@@ -718,40 +712,55 @@ async def force_generate_ko(tournament_id: int, db: AsyncSession = Depends(get_d
         raise HTTPException(status_code=404, detail="Tournament not found")
 
     await generate_knockout_stage_matches(tournament, db)
+    await db.commit()
+    publish_tournament_change(tournament_id)
     return {"message": f"KO generated for tournament {tournament_id}"}
 
 @router.post("/{tournament_id}/advance-knockout")
 async def trigger_knockout_advancement(tournament_id: int, db: AsyncSession = Depends(get_db), admin=Depends(is_admin)):
-    await advance_knockout_rounds(tournament_id, db)
+    # ✅ Repair: re-run slot filling for every decided KO match
+    await bracket.replay(db, tournament_id)
+    await tournament_progress.recount(db, tournament_id)
+    await db.commit()
+    publish_tournament_change(tournament_id)
     return {"message": "Knockout advancement executed"}
 
-async def generate_group_stage_matches(tournament_id: int, db: AsyncSession):
-    result = await db.execute(
-        select(TournamentPlayer)
-        .where(TournamentPlayer.tournament_id == tournament_id)
-        .order_by(TournamentPlayer.group_number)
-    )
-    players = result.scalars().all()
-
-    groups = {}
-    for player in players:
-        groups.setdefault(player.group_number, []).append(player.player_id)
+def round_robin_rows(tournament_id: int, groups):
+    # Plain insert rows for every pairing inside each group
+    return [
+        {
+            "tournament_id": tournament_id,
+            "player1_id": player_ids[i],
+            "player2_id": player_ids[j],
+            "round": f"Group {group_number + 1}",
+            "stage": "group",
+        }
+        for group_number, player_ids in groups.items()
+        for i in range(len(player_ids))
+        for j in range(i + 1, len(player_ids))
+    ]
+
+async def generate_group_stage_matches(tournament_id: int, db: AsyncSession, groups=None):
+    # Adds the group matches to the caller's transaction; the caller commits
+    if groups is None:
+        result = await db.execute(
+            select(TournamentPlayer.player_id, TournamentPlayer.group_number)
+            .where(TournamentPlayer.tournament_id == tournament_id)
+            .order_by(TournamentPlayer.group_number, TournamentPlayer.id)
+        )
+        groups = {}
+        for player_id, group_number in result.all():
+            groups.setdefault(group_number, []).append(player_id)
 
-    for group_number, player_ids in groups.items():
-        for i in range(len(player_ids)):
-            for j in range(i + 1, len(player_ids)):
-                db.add(Match(
-                    tournament_id=tournament_id,
-                    player1_id=player_ids[i],
-                    player2_id=player_ids[j],
-                    round=f"Group {group_number + 1}",
-                    stage="group"
-                ))
-    await db.commit()
+    rows = round_robin_rows(tournament_id, groups)
+    if rows:
+        await db.execute(insert(Match), rows)
+    await tournament_progress.recount(db, tournament_id)
 
 async def generate_knockout_stage_matches(tournament: Tournament, db):
+    # Adds the bracket to the caller's transaction; the caller commits
     if tournament.num_groups == 0:
-        print(f"⚡️ Delegating to KO generation without group stage for tournament {tournament.id}")
+        logger.debug("Delegating to KO generation without group stage for tournament %s", tournament.id)
         return await generate_knockout_stage_matches_without_grp_stage(tournament, db)
 
     players_advancing = []
@@ -770,6 +779,8 @@ async def generate_knockout_stage_matches(tournament: Tournament, db):
         select(Match)
         .where(Match.tournament_id == tournament.id)
         .where(Match.stage == "group")
+        # Results in this transaction were written with Core UPDATEs
+        .execution_options(populate_existing=True)
     )
     group_matches = result.scalars().all()
 
@@ -828,10 +839,8 @@ async def generate_knockout_stage_matches(tournament: Tournament, db):
         players_advancing.extend(top_n)
 
     num_players = len(players_advancing)
-    ko_size = 2 ** ceil(log2(num_players))
-    num_byes = ko_size - num_players
-
-    print(f"🔣 {num_players} players advancing → KO size: {ko_size}, byes: {num_byes}")
+    ko_size = seeding.bracket_size(num_players)
+    logger.debug("%d players advancing -> KO size: %d, byes: %d", num_players, ko_size, ko_size - num_players)
 
     advance_count = tournament.players_advance_per_group
     rank_buckets = defaultdict(list)
@@ -845,88 +854,16 @@ async def generate_knockout_stage_matches(tournament: Tournament, db):
         tier = sorted(rank_buckets[i], key=sort_key)
         players_advancing.extend(tier)
 
-    total_slots = ko_size
-    seeding_to_player = {}
-
-    bye_positions = []  # positions to assign byes
-
-    # Generate bracket seeds: [1, 8, 4, 5, 2, 7, 3, 6] for 8 players
-    seeds = generate_bracket_seeds(ko_size)
-
-    # Determine bye positions: opponent slots of top N seeds
-    for i in range(num_byes):
-        top_seed = seeds[i]  # take the i-th best seed
-        idx = top_seed - 1
-        opponent_idx = idx + 1 if idx % 2 == 0 else idx - 1  # pair index
-        if 0 <= opponent_idx < len(seeds):
-            bye_positions.append(opponent_idx) # change to opponent_idx
-
-    # Fill players and assign byes to correct opponent seeds
-    seeding_to_player = {}
-    pi = 0
-    for seed in seeds:
-        position = seed - 1
-        if position in bye_positions:
-            seeding_to_player[position] = None
-        else:
-            seeding_to_player[position] = players_advancing[pi]
-            pi += 1
-
-
-    def same_group(p1, p2):
-        return p1 in player_to_group and p2 in player_to_group and player_to_group[p1] == player_to_group[p2]
-
-    for i in range(0, total_slots, 2):
-        p1 = seeding_to_player.get(i)
-        p2 = seeding_to_player.get(i + 1)
-
-        if p1 and p2 and same_group(p1, p2):
-            for j in range(i + 2, total_slots):
-                pj = seeding_to_player.get(j)
-                if pj and not same_group(p1, pj):
-                    seeding_to_player[i + 1], seeding_to_player[j] = pj, p2
-                    p2 = pj
-                    break
-
-        if p1 and p2:
-            match = Match(
-                tournament_id=tournament.id,
-                player1_id=p1,
-                player2_id=p2,
-                round=f"Round of {ko_size}",
-                stage="knockout"
-            )
-        elif p1:
-            match = Match(
-                tournament_id=tournament.id,
-                player1_id=p1,
-                player2_id=None,
-                winner_id=p1,
-                player1_score=1,
-                player2_score=0,
-                round=f"Round of {ko_size}",
-                stage="knockout"
-            )
-        elif p2:
-            match = Match(
-                tournament_id=tournament.id,
-                player1_id=p2,
-                player2_id=None,
-                winner_id=p2,
-                player1_score=1,
-                player2_score=0,
-                round=f"Round of {ko_size}",
-                stage="knockout"
-            )
-        else: 
-            continue
+    # ✅ Seeded draw with byes for the top seeds, then re-pair any first-round clash between group mates
+    seed_of = {pid: seed for seed, pid in enumerate(players_advancing)}
+    first_round = seeding.avoid_same_group(seeding.first_round(players_advancing, ko_size), player_to_group, seed_of)
 
-        db.add(match)
-
-    await db.commit()
+    # ✅ The whole bracket up front, each match linked to the slot its winner moves into
+    db.add_all(bracket.build(tournament.id, first_round))
+    await tournament_progress.recount(db, tournament.id)
 
 async def generate_knockout_stage_matches_without_grp_stage(tournament, db):
-    print("🎯 Generating KO bracket without group stage for tournament:", tournament.id)
+    logger.debug("Generating KO bracket without group stage for tournament %s", tournament.id)
 
     result = await db.execute(
         select(TournamentPlayer.player_id).where(TournamentPlayer.tournament_id == tournament.id)
@@ -940,330 +877,11 @@ async def generate_knockout_stage_matches_without_grp_stage(tournament, db):
     players_advancing = sorted(player_ids, key=lambda pid: -ratings.get(pid, 0))
 
     num_players = len(players_advancing)
-    ko_size = 2 ** ceil(log2(num_players))
-    num_byes = ko_size - num_players
-
-    print(f"🏁 {num_players} players → KO size: {ko_size}, byes: {num_byes}")
-
-    seeds = generate_bracket_seeds(ko_size)
-    bye_positions = []
-
-    for i in range(num_byes):
-        top_seed = seeds[i]
-        idx = top_seed - 1
-        opponent_idx = idx + 1 if idx % 2 == 0 else idx - 1
-        if 0 <= opponent_idx < len(seeds):
-            bye_positions.append(opponent_idx)
-
-    seeding_to_player = {}
-    pi = 0
-    for seed in seeds:
-        position = seed - 1
-        if position in bye_positions:
-            seeding_to_player[position] = None
-        else:
-            if pi < len(players_advancing):
-                seeding_to_player[position] = players_advancing[pi]
-                pi += 1
-
-    for i in range(0, ko_size, 2):
-        p1 = seeding_to_player.get(i)
-        p2 = seeding_to_player.get(i + 1)
-
-        if p1 and p2:
-            match = Match(
-                tournament_id=tournament.id,
-                player1_id=p1,
-                player2_id=p2,
-                round=f"Round of {ko_size}",
-                stage="knockout"
-            )
-        elif p1:
-            match = Match(
-                tournament_id=tournament.id,
-                player1_id=p1,
-                player2_id=None,
-                winner_id=p1,
-                player1_score=1,
-                player2_score=0,
-                round=f"Round of {ko_size}",
-                stage="knockout"
-            )
-        elif p2:
-            match = Match(
-                tournament_id=tournament.id,
-                player1_id=p2,
-                player2_id=None,
-                winner_id=p2,
-                player1_score=1,
-                player2_score=0,
-                round=f"Round of {ko_size}",
-                stage="knockout"
-            )
-        else:
-            continue
-
-        db.add(match)
-
-    await db.commit()
-    print("✅ KO bracket created for tournament without group stage.")
-
-async def advance_knockout_rounds(tournament_id: int, db: AsyncSession):
-    tournament = await db.get(Tournament, tournament_id)
+    ko_size = seeding.bracket_size(num_players)
+    logger.debug("%d players -> KO size: %d, byes: %d", num_players, ko_size, ko_size - num_players)
 
-    # ✅ Already finalized?
-    existing = await db.execute(
-        select(TournamentStanding).where(TournamentStanding.tournament_id == tournament_id)
-    )
-    if existing.scalars().first():
-        print("🏁 Tournament is already complete.")
-        return
-
-    # 🏓 Fetch all KO matches
-    result = await db.execute(
-        select(
-            Match.id,
-            Match.player1_id,
-            Match.player2_id,
-            Match.winner_id,
-            Match.round,
-            Match.stage
-        ).where(
-            Match.tournament_id == tournament_id,
-            Match.stage == "knockout"
-        ).order_by(Match.round)
-    )
-    matches = result.all()
-
-    if not matches:
-        return
-
-    # 📦 Group by round
-    rounds = defaultdict(list)
-    for m in matches:
-        if m.round != "3rd Place Match":
-            rounds[m.round].append(m)
-
-    def round_sort_key(name):
-        if name == "Final":
-            return 1
-        if name == "3rd Place Match":
-            return 0
-        try:
-            return int(name.split()[-1])
-        except:
-            return -1
-
-    round_names = sorted(rounds.keys(), key=round_sort_key, reverse=True)
-
-    if not round_names:
-        return
-
-    current_round_name = round_names[-1]
-    current_round_matches = rounds[current_round_name]
-    
-    # ✅ Skip advancing if not all matches in the current round are complete
-    if any(m.winner_id is None for m in current_round_matches):
-        print(f"⏳ Skipping advancement. Not all matches in {current_round_name} are complete.")
-        return
-
-    if len(round_names) > 1:
-        last_round_name = round_names[-2]
-        last_round_matches = rounds[last_round_name]
-    else:
-        last_round_name = None
-        last_round_matches = []
-
-    if any(m.winner_id is None for m in last_round_matches):
-        return
-
-    # 🎖️ Try 3rd place creation
-    if current_round_name == "Round of 4":
-        completed = [m for m in current_round_matches if m.winner_id is not None]
-
-        if len(completed) == 2:
-            semi_losers = [
-                m.player1_id if m.winner_id != m.player1_id else m.player2_id
-                for m in completed
-            ]
-            if any(pid is None for pid in semi_losers):
-                print("⚠️ Skipping 3rd place match: missing semifinal loser.")
-            else:
-                existing_3rd_match = await db.execute(
-                    select(Match).where(
-                        Match.tournament_id == tournament_id,
-                        Match.round == "3rd Place Match"
-                    )
-                )
-                if not existing_3rd_match.scalars().first():
-                    db.add(Match(
-                        tournament_id=tournament_id,
-                        player1_id=semi_losers[0],
-                        player2_id=semi_losers[1],
-                        round="3rd Place Match",
-                        stage="knockout"
-                    ))
-                    await db.commit()
-                    print("🎖️ 3rd Place Match created")
-        elif len(completed) == 1:
-            semi = completed[0]
-            if semi.winner_id:
-                third_place_id = semi.player1_id if semi.winner_id != semi.player1_id else semi.player2_id
-                if third_place_id:
-                    db.add(TournamentStanding(
-                        tournament_id=tournament_id,
-                        player_id=third_place_id,
-                        position=3
-                    ))
-                    await db.commit()
-                    print(f"🥉 Assigned 3rd place to Player {third_place_id}")
-
-    # 🎯 Final round? Save standings
-    winners = [m.winner_id for m in current_round_matches if m.winner_id]
-
-    if len(winners) == 1 and current_round_name == "Final":
-        final_match = current_round_matches[0]
-        first = winners[0]
-        second = final_match.player1_id if final_match.winner_id != final_match.player1_id else final_match.player2_id
-
-        # 3rd/4th logic
-        third_place_result = await db.execute(
-            select(
-                Match.player1_id,
-                Match.player2_id,
-                Match.winner_id
-            ).where(
-                Match.tournament_id == tournament_id,
-                Match.round == "3rd Place Match"
-            )
-        )
-        third_match = third_place_result.first()
-
-        third = None
-        fourth = None
-
-        if third_match:
-            if third_match.winner_id is None:
-                print("⏳ Waiting for 3rd place match to finish before saving final standings.")
-                return
-            third = third_match.winner_id
-            fourth = (
-                third_match.player1_id if third_match.winner_id != third_match.player1_id
-                else third_match.player2_id
-            )
-        else:
-            semi_with_two_players = next(
-                (m for m in last_round_matches if m.player1_id is not None and m.player2_id is not None), None
-            )
-            if semi_with_two_players and semi_with_two_players.winner_id:
-                third = (
-                    semi_with_two_players.player1_id if semi_with_two_players.winner_id != semi_with_two_players.player1_id
-                    else semi_with_two_players.player2_id
-                )
-                print(f"🥉 Auto-assigned 3rd place to semi-final loser: Player {third}")
-
-        db.add_all([
-            TournamentStanding(tournament_id=tournament_id, player_id=first, position=1),
-            TournamentStanding(tournament_id=tournament_id, player_id=second, position=2)
-        ])
-        if third:
-            db.add(TournamentStanding(tournament_id=tournament_id, player_id=third, position=3))
-        if fourth:
-            db.add(TournamentStanding(tournament_id=tournament_id, player_id=fourth, position=4))
-
-        await db.commit()
-        print(f"✅ Final standings saved: 1st={first}, 2nd={second}, 3rd={third}, 4th={fourth}")
-        return
-
-    if len(winners) == 1 and current_round_name == "3rd Place Match":
-        third_place_result = await db.execute(
-            select(
-                Match.player1_id,
-                Match.player2_id,
-                Match.winner_id
-            ).where(
-                Match.tournament_id == tournament_id,
-                Match.round == "3rd Place Match"
-            )
-        )
-        third_match = third_place_result.first()
-
-        third = None
-        fourth = None
-
-        if third_match:
-            if third_match.winner_id is None:
-                print("⏳ Waiting for 3rd place match to finish before saving final standings.")
-                return
-            third = third_match.winner_id
-            fourth = (
-                third_match.player1_id if third_match.winner_id != third_match.player1_id
-                else third_match.player2_id
-            )
-        else:
-            semi_with_two_players = next(
-                (m for m in last_round_matches if m.player1_id is not None and m.player2_id is not None), None
-            )
-            if semi_with_two_players and semi_with_two_players.winner_id:
-                third = (
-                    semi_with_two_players.player1_id if semi_with_two_players.winner_id != semi_with_two_players.player1_id
-                    else semi_with_two_players.player2_id
-                )
-                print(f"🥉 Auto-assigned 3rd place to semi-final loser: Player {third}")
-                
-        db.add_all([
-            TournamentStanding(tournament_id=tournament_id, player_id=first, position=1),
-            TournamentStanding(tournament_id=tournament_id, player_id=second, position=2)
-        ])
-        if third:
-            db.add(TournamentStanding(tournament_id=tournament_id, player_id=third, position=3))
-        if fourth:
-            db.add(TournamentStanding(tournament_id=tournament_id, player_id=fourth, position=4))
-
-        await db.commit()
-        print(f"✅ Final standings saved: 1st={first}, 2nd={second}, 3rd={third}, 4th={fourth}")
-        return
-
-    # 🔁 Advance to next round
-    next_round_size = len(winners)
-    if next_round_size < 2:
-        print("⚠️ Not enough winners to create next round.")
-        return
-
-    next_round_name = "Final" if next_round_size == 2 and current_round_name == "Round of 4" else f"Round of {next_round_size}"
-
-    existing_next_round = await db.execute(
-        select(Match).where(
-            Match.tournament_id == tournament_id,
-            Match.round == next_round_name,
-            Match.stage == "knockout"
-        )
-    )
-    if existing_next_round.scalars().first():
-        print(f"⚠️ {next_round_name} already exists. Skipping.")
-        return
-
-    for i in range(0, len(winners), 2):
-        p1 = winners[i]
-        p2 = winners[i + 1] if i + 1 < len(winners) else None
-
-        match = Match(
-            tournament_id=tournament_id,
-            player1_id=p1,
-            player2_id=p2,
-            round=next_round_name,
-            stage="knockout",
-            winner_id=p1 if p2 is None else None,
-            player1_score=1 if p2 is None else None,
-            player2_score=0 if p2 is None else None,
-        )
-        db.add(match)
-
-    await db.commit()
-    print(f"✅ Created {next_round_name} with {len(winners)} players")
+    first_round = seeding.first_round(players_advancing, ko_size)
+    db.add_all(bracket.build(tournament.id, first_round))
 
-def generate_bracket_seeds(n):
-    if n == 1:
-        return [1]
-    prev = generate_bracket_seeds(n // 2)
-    return [x for pair in zip(prev, [n + 1 - x for x in prev]) for x in pair]
+    logger.info("KO bracket created for tournament %s without group stage", tournament.id)
+    await tournament_progress.recount(db, tournament.id)
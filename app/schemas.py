@@ -34,11 +34,23 @@ class MatchResult(BaseModel):
     class Config:
         from_attributes = True
 
+# ✅ Upper bound for one batch submission (an evening's worth of score sheets)
+MAX_BATCH_RESULTS = 500
+
+class MatchResultBatch(BaseModel):
+    results: List[MatchResult] = Field(..., max_length=MAX_BATCH_RESULTS)
+
+class TournamentResultEntry(MatchResult):
+    match_id: int
+
+class TournamentResultBatch(BaseModel):
+    results: List[TournamentResultEntry] = Field(..., max_length=MAX_BATCH_RESULTS)
+
 class MatchResponse(BaseModel):
     id: int
-    player1_id: int
+    player1_id: Optional[int]  # None for a knockout slot still waiting on an earlier result
     player2_id: Optional[int]
-    player1_name: str
+    player1_name: Optional[str]
     player2_name: Optional[str]
     player1_score: Optional[int]
     player2_score: Optional[int]
@@ -51,6 +63,13 @@ class MatchResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class RatingHistoryEntry(BaseModel):
+    match_id: int
+    timestamp: datetime
+    rating_before: int
+    rating_after: int
+    k_factor: Optional[int] = None
+
 class GroupingMode(str, Enum):
     ranked = "ranked"
     random = "random"
@@ -138,6 +157,7 @@ class HeadToHeadResponse(BaseModel):
     player2_points: int
     most_recent_winner: Optional[int]
     match_history: List[MatchHistoryEntry]
+    next_cursor: Optional[str] = None
 
 class CustomizedGroup(BaseModel):
     group_number: int
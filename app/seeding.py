@@ -0,0 +1,113 @@
+MAX_BRACKET_SIZE = 1024
+
+
+def _build_seed_orders(max_size):
+    # orders[n][k] = 1-based bracket position of the k-th ranked player, e.g. [1, 8, 4, 5, 2, 7, 3, 6] for 8
+    orders = {1: (1,)}
+    size = 1
+    while size < max_size:
+        prev = orders[size]
+        size *= 2
+        orders[size] = tuple(x for seed in prev for x in (seed, size + 1 - seed))
+    return orders
+
+
+# ✅ Precomputed once for every bracket size a tournament can have
+_SEED_ORDERS = _build_seed_orders(MAX_BRACKET_SIZE)
+
+
+def bracket_size(num_players: int) -> int:
+    """Smallest power of two that fits num_players."""
+    return 1 << max(num_players - 1, 0).bit_length()
+
+
+def seed_order(size: int):
+    order = _SEED_ORDERS.get(size)
+    if order is None:
+        # Only sizes past MAX_BRACKET_SIZE get here
+        order = _build_seed_orders(size)[size]
+    return order
+
+
+def first_round(ranked_players, size=None):
+    """Seeded first-round pairs [(player1, player2), ...] for players ranked best first.
+
+    The top seeds get the byes: the slot paired with each of the first size - n seeds stays empty.
+    """
+    size = size or bracket_size(len(ranked_players))
+    order = seed_order(size)
+
+    bye = bytearray(size)
+    for seed in order[:size - len(ranked_players)]:
+        bye[(seed - 1) ^ 1] = 1
+
+    slots = [None] * size
+    players = iter(ranked_players)
+    for seed in order:
+        if not bye[seed - 1]:
+            slots[seed - 1] = next(players, None)
+    return list(zip(slots[::2], slots[1::2]))
+
+
+def avoid_same_group(pairs, group_of, seed_of=None):
+    """Re-pair first-round opponents so no two players from the same group meet, where that's possible.
+
+    The better seed of every match (by seed_of, player 1 without it) keeps their slot and byes are
+    left alone; the other players are assigned to matches as a bipartite matching (augmenting
+    paths), starting from the seeded draw so only the clashing matches move. Each phase is O(matches + clashes * groups) and one phase is
+    usually enough.
+    """
+    playable = [i for i, (a, b) in enumerate(pairs) if a is not None and b is not None]
+    # anchor_first[k]: the anchor sits in slot 1 of its match
+    anchor_first = [seed_of is None or seed_of[pairs[i][0]] <= seed_of[pairs[i][1]] for i in playable]
+    anchors = [pairs[i][0] if first else pairs[i][1] for i, first in zip(playable, anchor_first)]
+    opponents = [pairs[i][1] if first else pairs[i][0] for i, first in zip(playable, anchor_first)]
+
+    def clash(left, right):
+        group = group_of.get(anchors[left])
+        return group is not None and group == group_of.get(opponents[right])
+
+    opponent_of = [None] * len(playable)  # left -> right
+    anchor_of = [None] * len(playable)    # right -> left
+    clashes = []
+    for i in range(len(playable)):
+        if clash(i, i):
+            clashes.append(i)
+        else:
+            opponent_of[i] = anchor_of[i] = i
+    if not clashes:
+        return list(pairs)
+
+    def augment(left, unseen):
+        group = group_of.get(anchors[left])
+        for right_group, stack in unseen.items():
+            if group is not None and right_group == group:
+                continue
+            while stack:
+                right = stack.pop()
+                if anchor_of[right] is None or augment(anchor_of[right], unseen):
+                    opponent_of[left], anchor_of[right] = right, left
+                    return True
+        return False
+
+    # Phases share one visited set, so their augmenting paths are disjoint (Hopcroft-Karp style);
+    # a phase that places nobody means the remaining clashes can't be separated
+    while clashes:
+        unseen = {}
+        for right in reversed(range(len(playable))):
+            unseen.setdefault(group_of.get(opponents[right]), []).append(right)
+        remaining = [left for left in clashes if not augment(left, unseen)]
+        if len(remaining) == len(clashes):
+            break
+        clashes = remaining
+
+    # Whatever couldn't be separated keeps one of the leftover opponents
+    leftovers = iter(r for r in range(len(playable)) if anchor_of[r] is None)
+    result = list(pairs)
+    for left, index in enumerate(playable):
+        right = opponent_of[left]
+        if right is None:
+            right = next(leftovers)
+        pair = (anchors[left], opponents[right])
+        result[index] = pair if anchor_first[left] else pair[::-1]
+    return result
@@ -0,0 +1,64 @@
+import logging
+import os
+import time
+
+# Kept free of heavy imports: main.py imports this first so the clock starts before FastAPI/SQLAlchemy load
+
+logger = logging.getLogger(__name__)
+
+# ✅ Alembic head this build expects; bump it together with every new migration
+SCHEMA_REVISION = "0008"
+
+CREATE, VERIFY, SKIP = "create", "verify", "skip"
+SCHEMA_CHECK_MODES = (CREATE, VERIFY, SKIP)
+
+# create = Base.metadata.create_all on boot (local dev), verify = one query against alembic_version,
+# skip = trust the deploy pipeline
+SCHEMA_CHECK = os.getenv("DB_SCHEMA_CHECK", CREATE).lower()
+if SCHEMA_CHECK not in SCHEMA_CHECK_MODES:
+    raise RuntimeError(f"Unknown DB_SCHEMA_CHECK: {SCHEMA_CHECK}")
+
+
+class ColdStart:
+    """Wall-clock time of each boot phase, from the first app import until startup finishes."""
+
+    def __init__(self):
+        self.started = self._last = time.perf_counter()
+        self.phases = {}
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases[phase] = now - self._last
+        self._last = now
+
+    def total(self) -> float:
+        return self._last - self.started
+
+    def snapshot(self):
+        return {"phases_seconds": dict(self.phases), "total_seconds": self.total()}
+
+    def log(self):
+        phases = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.phases.items())
+        logger.info("Cold start %.0fms (%s)", self.total() * 1000, phases)
+
+
+cold_start = ColdStart()
+
+
+async def prepare_schema(engine, metadata, mode: str = None):
+    mode = mode or SCHEMA_CHECK
+    if mode == SKIP:
+        return
+    if mode == CREATE:
+        # Reflects every table on each worker boot; fine locally, slow against Cloud SQL
+        async with engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+        return
+
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql("SELECT version_num FROM alembic_version")
+        revision = result.scalar()
+    if revision != SCHEMA_REVISION:
+        raise RuntimeError(
+            f"Database schema is at revision {revision}, this build expects {SCHEMA_REVISION}; run alembic upgrade head"
+        )
@@ -0,0 +1,142 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+
+from app.metrics import Histogram, DEFAULT_BUCKETS
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# ✅ Requests issuing more statements than this get a warning, that's usually an N+1 loop
+QUERY_COUNT_WARNING = int(os.getenv("QUERY_COUNT_WARNING", "50"))
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "_started")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self._started = []
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.latency = Histogram(DEFAULT_BUCKETS)
+        self.db_time = Histogram(DEFAULT_BUCKETS)
+        self.python_time = Histogram(DEFAULT_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.statuses = defaultdict(int)
+
+
+class RequestMetrics:
+    """Per-route latency, DB time and query count histograms, keyed by (method, route template)."""
+
+    def __init__(self):
+        self.routes = {}
+        self._lock = threading.Lock()
+
+    def route(self, method, path) -> RouteMetrics:
+        key = (method, path)
+        metrics = self.routes.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self.routes.setdefault(key, RouteMetrics())
+        return metrics
+
+    def record(self, method, path, status, elapsed, stats: RequestStats):
+        metrics = self.route(method, path)
+        metrics.latency.observe(elapsed)
+        metrics.db_time.observe(stats.db_time)
+        metrics.python_time.observe(max(elapsed - stats.db_time, 0.0))
+        metrics.queries.observe(stats.queries)
+        with self._lock:
+            metrics.statuses[status] += 1
+
+
+request_metrics = RequestMetrics()
+
+
+def instrument_engine(engine):
+    """Attribute statement count and time to whichever request is running them."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None:
+            stats._started.append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        if stats is not None and stats._started:
+            stats.db_time += time.perf_counter() - stats._started.pop()
+            stats.queries += 1
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        stats = _current.get()
+        if stats is not None and stats._started:
+            stats._started.pop()
+
+
+def route_template(scope) -> str:
+    # Label by the route pattern, never the raw path, so /players/1 and /players/2 share a series
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    regex = getattr(route, "path_regex", None)
+    path = scope["path"]
+    if regex is None or regex.match(path):
+        return template
+    # Newer FastAPI keeps included routes relative to their router; recover the prefix
+    # from the part of the real path the route pattern didn't consume
+    for index, char in enumerate(path):
+        if char == "/" and index and regex.match(path[index:]):
+            return path[:index] + template
+    return template
+
+
+class TimingMiddleware:
+    """Pure ASGI middleware, so streaming responses are timed until their last byte."""
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            path = route_template(scope)
+            self.metrics.record(scope["method"], path, status, elapsed, stats)
+            if stats.queries > QUERY_COUNT_WARNING:
+                logger.warning("%s %s ran %d queries (%.1f ms in DB)", scope["method"], path, stats.queries, stats.db_time * 1000)
@@ -0,0 +1,52 @@
+from sqlalchemy import func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Match, TournamentProgress
+
+STAGES = ("group", "knockout")
+
+
+async def recount(db: AsyncSession, tournament_id: int):
+    """Rebuild the counters from the matches table, for paths that add or remove tournament matches."""
+    await db.flush()
+    rows = await db.execute(
+        select(Match.stage, func.count(), func.count(Match.winner_id))
+        .where(Match.tournament_id == tournament_id, Match.stage.in_(STAGES))
+        .group_by(Match.stage)
+    )
+    counts = {stage: (total, completed) for stage, total, completed in rows.all()}
+
+    progress = await db.get(TournamentProgress, tournament_id, with_for_update=True, populate_existing=True)
+    if progress is None:
+        progress = TournamentProgress(tournament_id=tournament_id)
+        db.add(progress)
+    progress.group_total, progress.group_completed = counts.get("group", (0, 0))
+    progress.knockout_total, progress.knockout_completed = counts.get("knockout", (0, 0))
+    progress.knockout_generated = progress.knockout_total > 0
+    return progress
+
+
+async def record_result(db: AsyncSession, tournament_id: int, stage, was_completed: bool):
+    """Count a match that just got its first result, inside the caller's transaction."""
+    if was_completed or stage not in STAGES:
+        return
+    column = getattr(TournamentProgress, f"{stage}_completed")
+    await db.execute(
+        update(TournamentProgress)
+        .where(TournamentProgress.tournament_id == tournament_id)
+        .values({column: column + 1})
+    )
+
+
+async def load(db: AsyncSession, tournament_id: int):
+    """Counters for the completion checks, locked so only one request starts the next stage."""
+    progress = await db.get(TournamentProgress, tournament_id, with_for_update=True, populate_existing=True)
+    if progress is None:
+        # Tournaments created before the counters existed
+        progress = await recount(db, tournament_id)
+    return progress
+
+
+def groups_complete(progress) -> bool:
+    return progress.group_completed >= progress.group_total
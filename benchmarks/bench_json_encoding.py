@@ -0,0 +1,71 @@
+"""Compare FastAPI's default response encoding with FastJSONResponse for a /matches/ page.
+
+The default path runs jsonable_encoder over the returned list and then json.dumps; FastJSONResponse
+hands the same rows to orjson once:
+
+    python -m benchmarks.bench_json_encoding
+"""
+import json
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from fastapi.encoders import jsonable_encoder
+
+from app.cache import FastJSONResponse
+
+PAGE_SIZES = (100, 1000)
+REPEATS = 50
+
+
+def match_rows(count):
+    return [
+        {
+            "id": i,
+            "player1_id": i % 97 + 1,
+            "player1": f"Player {i % 97 + 1}",
+            "player2_id": i % 89 + 2,
+            "player2": f"Player {i % 89 + 2}",
+            "player1_score": 3,
+            "player2_score": i % 3,
+            "winner_id": i % 97 + 1,
+            "round": "Group A",
+            "stage": "group",
+            "timestamp": "4 Jan 2025, 19:30",
+            "set_scores": [
+                {"set_number": n, "player1_score": 11, "player2_score": 5 + n} for n in range(1, 4)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def default_encoding(rows):
+    # What FastAPI does with a plain list return value (starlette's JSONResponse.render)
+    return json.dumps(jsonable_encoder(rows), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def fast_encoding(rows):
+    return FastJSONResponse(rows).body
+
+
+def timed(encode, rows):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        payload = encode(rows)
+    return (time.perf_counter() - start) / REPEATS, payload
+
+
+def main():
+    print(f"{'rows':>6} {'default':>10} {'orjson':>10} {'speedup':>8}")
+    for size in PAGE_SIZES:
+        rows = match_rows(size)
+        default, default_payload = timed(default_encoding, rows)
+        fast, fast_payload = timed(fast_encoding, rows)
+        assert default_payload == fast_payload
+        print(f"{size:>6} {default * 1000:>8.2f}ms {fast * 1000:>8.2f}ms {default / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Compare entity-loading reads with the column-projected ones behind /players/ and /tournaments/.
+
+Time and peak traced memory per request, building the JSON payload too, against an in-memory
+SQLite database with 10k players (and 500 tournaments of 16 entrants each):
+
+    python -m benchmarks.bench_read_paths
+"""
+import asyncio
+import os
+import time
+import tracemalloc
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+
+from app.cache import encode_json
+from app.database import Base
+from app.models import Player, Tournament, TournamentPlayer, TournamentStanding
+from app.routers.tournaments import load_tournament_summaries
+from app.schemas import TournamentResponse
+
+NUM_PLAYERS = 10_000
+NUM_TOURNAMENTS = 500
+ENTRANTS = 16
+REPEATS = 10
+
+
+async def players_entities(db: AsyncSession):
+    # What get_players did: whole Player rows (equipment columns included) through the identity map
+    players = (await db.execute(select(Player))).scalars().all()
+    return encode_json([{"id": p.id, "name": p.name, "rating": p.rating, "matches": p.matches} for p in players])
+
+
+async def players_columns(db: AsyncSession):
+    result = await db.execute(select(Player.id, Player.name, Player.rating, Player.matches))
+    return encode_json([row._asdict() for row in result])
+
+
+async def tournaments_entities(db: AsyncSession):
+    # What get_all_tournaments did: selectinload both collections, then a response model per tournament
+    result = await db.execute(
+        select(Tournament)
+        .options(selectinload(Tournament.players), selectinload(Tournament.standings))
+        .order_by(Tournament.date.desc())
+    )
+    response = [
+        TournamentResponse(
+            id=t.id, name=t.name, date=t.date, num_players=t.num_players, num_groups=t.num_groups,
+            knockout_size=t.knockout_size, players_advance_per_group=t.players_advance_per_group,
+            created_at=t.created_at, player_ids=[tp.player_id for tp in t.players],
+            final_standings={str(s.position): s.player_id for s in t.standings},
+        )
+        for t in result.scalars().all()
+    ]
+    return encode_json(jsonable_encoder(response))
+
+
+async def tournaments_columns(db: AsyncSession):
+    return encode_json([t.as_json() for t in await load_tournament_summaries(db)])
+
+
+async def seed(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as db:
+        await db.execute(insert(Player), [
+            {"name": f"Player {i}", "rating": 1500 + i % 400, "matches": i % 50, "handedness": "Right",
+             "forehand_rubber": "Tenergy 05", "backhand_rubber": "Dignics 09C", "blade": "Viscaria"}
+            for i in range(NUM_PLAYERS)
+        ])
+        await db.execute(insert(Tournament), [
+            {"name": f"Open {t}", "date": date(2025, 1, 1), "created_at": date(2025, 1, 1),
+             "num_players": ENTRANTS, "num_groups": 4, "knockout_size": 8, "players_advance_per_group": 2}
+            for t in range(NUM_TOURNAMENTS)
+        ])
+        await db.execute(insert(TournamentPlayer), [
+            {"tournament_id": t + 1, "player_id": (t * ENTRANTS + k) % NUM_PLAYERS + 1, "group_number": k % 4}
+            for t in range(NUM_TOURNAMENTS) for k in range(ENTRANTS)
+        ])
+        await db.execute(insert(TournamentStanding), [
+            {"tournament_id": t + 1, "player_id": (t * ENTRANTS + k) % NUM_PLAYERS + 1, "position": k + 1}
+            for t in range(NUM_TOURNAMENTS) for k in range(4)
+        ])
+        await db.commit()
+
+
+async def measure(engine, read):
+    # A fresh session per request, like get_db
+    async with AsyncSession(engine) as db:
+        payload = await read(db)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        async with AsyncSession(engine) as db:
+            await read(db)
+    elapsed = (time.perf_counter() - start) / REPEATS
+
+    tracemalloc.start()
+    async with AsyncSession(engine) as db:
+        await read(db)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, payload
+
+
+async def main():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    await seed(engine)
+    print(f"{'endpoint':<14} {'entities':>10} {'columns':>10} {'speedup':>8} {'peak MiB':>16}")
+    for name, old, new in (
+        ("/players/", players_entities, players_columns),
+        ("/tournaments/", tournaments_entities, tournaments_columns),
+    ):
+        old_time, old_peak, old_payload = await measure(engine, old)
+        new_time, new_peak, new_payload = await measure(engine, new)
+        assert old_payload == new_payload, name
+        print(
+            f"{name:<14} {old_time * 1000:>8.1f}ms {new_time * 1000:>8.1f}ms {old_time / new_time:>7.1f}x "
+            f"{old_peak / 2**20:>7.1f} -> {new_peak / 2**20:<6.1f}"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
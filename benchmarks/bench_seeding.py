@@ -0,0 +1,94 @@
+"""Compare the old list-scan bracket seeding with app.seeding for 8 to 1024-player brackets.
+
+Players come from four large groups in shuffled order, so about a quarter of the seeded
+first-round matches pair group mates and have to be re-paired:
+
+    python -m benchmarks.bench_seeding
+"""
+import random
+import time
+
+from app import seeding
+
+SIZES = (8, 32, 128, 512, 1024)
+NUM_GROUPS = 4
+REPEATS = 20
+
+
+def legacy_seeds(n):
+    if n == 1:
+        return [1]
+    prev = legacy_seeds(n // 2)
+    return [x for pair in zip(prev, [n + 1 - x for x in prev]) for x in pair]
+
+
+def legacy_draw(players, group_of):
+    # What generate_knockout_stage_matches did before: recursive seeds, list-membership
+    # bye lookup and a forward scan for every same-group pairing
+    size = seeding.bracket_size(len(players))
+    seeds = legacy_seeds(size)
+    bye_positions = []
+    for i in range(size - len(players)):
+        idx = seeds[i] - 1
+        bye_positions.append(idx + 1 if idx % 2 == 0 else idx - 1)
+    slots, pi = {}, 0
+    for seed in seeds:
+        position = seed - 1
+        if position in bye_positions:
+            slots[position] = None
+        else:
+            slots[position] = players[pi]
+            pi += 1
+
+    def same_group(a, b):
+        return a in group_of and b in group_of and group_of[a] == group_of[b]
+
+    pairs = []
+    for i in range(0, size, 2):
+        p1, p2 = slots.get(i), slots.get(i + 1)
+        if p1 and p2 and same_group(p1, p2):
+            for j in range(i + 2, size):
+                pj = slots.get(j)
+                if pj and not same_group(p1, pj):
+                    slots[i + 1], slots[j] = pj, p2
+                    p2 = pj
+                    break
+        pairs.append((p1, p2))
+    return pairs
+
+
+def new_draw(players, group_of):
+    seed_of = {pid: seed for seed, pid in enumerate(players)}
+    return seeding.avoid_same_group(seeding.first_round(players), group_of, seed_of)
+
+
+def clashes(pairs, group_of):
+    return sum(1 for a, b in pairs if a and b and group_of[a] == group_of[b])
+
+
+def timed(draw, players, group_of):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        pairs = draw(players, group_of)
+    return (time.perf_counter() - start) / REPEATS, pairs
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'players':>8} {'legacy':>10} {'seeding':>10} {'speedup':>8} {'clashes':>14}")
+    for size in SIZES:
+        # A few byes, like a real knockout stage
+        players = list(range(1, size - size // 8 + 1))
+        group_of = {pid: pid % NUM_GROUPS for pid in players}
+        rng.shuffle(players)
+
+        legacy, legacy_pairs = timed(legacy_draw, players, group_of)
+        new, new_pairs = timed(new_draw, players, group_of)
+        print(
+            f"{size:>8} {legacy * 1000:>8.2f}ms {new * 1000:>8.2f}ms {legacy / new:>7.1f}x "
+            f"{clashes(legacy_pairs, group_of):>6} -> {clashes(new_pairs, group_of):<4}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Compare per-object ORM inserts with the bulk executemany path used by tournament creation.
+
+Runs against an in-memory SQLite database:
+
+    python -m benchmarks.bench_tournament_creation
+"""
+import asyncio
+import os
+import time
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+
+from app.database import Base
+from app.models import Player, Tournament, TournamentPlayer, Match
+from app.routers.tournaments import generate_group_stage_matches
+
+SIZES = (16, 64, 256)
+
+
+async def legacy_create(db: AsyncSession, tournament_id: int, player_ids):
+    # The old path: one ORM object per row, flushed through the unit of work
+    for pid in player_ids:
+        db.add(TournamentPlayer(tournament_id=tournament_id, player_id=pid, group_number=0))
+    await db.flush()
+    for i in range(len(player_ids)):
+        for j in range(i + 1, len(player_ids)):
+            db.add(Match(
+                tournament_id=tournament_id,
+                player1_id=player_ids[i],
+                player2_id=player_ids[j],
+                round="Group 1",
+                stage="group"
+            ))
+    await db.commit()
+
+
+async def bulk_create(db: AsyncSession, tournament_id: int, player_ids):
+    await db.execute(insert(TournamentPlayer), [
+        {"tournament_id": tournament_id, "player_id": pid, "group_number": 0} for pid in player_ids
+    ])
+    await generate_group_stage_matches(tournament_id, db, groups={0: list(player_ids)})
+    await db.commit()
+
+
+async def run(create, num_players):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSession(engine) as db:
+        await db.execute(insert(Player), [{"name": f"Player {i}"} for i in range(num_players)])
+        tournament = Tournament(name="Bench", date=date.today(), num_players=num_players, num_groups=1, created_at=date.today())
+        db.add(tournament)
+        await db.flush()
+        tournament_id = tournament.id
+        await db.commit()
+
+        start = time.perf_counter()
+        await create(db, tournament_id, list(range(1, num_players + 1)))
+        elapsed = time.perf_counter() - start
+    await engine.dispose()
+    return elapsed
+
+
+async def main():
+    print(f"{'players':>8} {'matches':>8} {'orm add':>10} {'bulk':>10} {'speedup':>8}")
+    for n in SIZES:
+        legacy = await run(legacy_create, n)
+        bulk = await run(bulk_create, n)
+        print(f"{n:>8} {n * (n - 1) // 2:>8} {legacy * 1000:>8.1f}ms {bulk * 1000:>8.1f}ms {legacy / bulk:>7.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
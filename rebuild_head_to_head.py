@@ -0,0 +1,13 @@
+import asyncio
+from app.database import async_session
+from app.head_to_head import rebuild
+
+async def main():
+    async with async_session() as session:
+        print("🔁 Rebuilding head-to-head aggregates...")
+        await rebuild(session)
+        await session.commit()
+        print("✅ Head-to-head aggregates rebuilt.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,12 @@
+import asyncio
+from app.database import async_session
+from app.rating_replay import recompute_ratings
+
+async def main():
+    async with async_session() as session:
+        print("🔁 Replaying match history...")
+        replayed = await recompute_ratings(session)
+        print(f"✅ Ratings rebuilt from {replayed} matches.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+# Unit tests run without a MySQL instance; fall back to an in-memory SQLite URL
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+# Keep the module-level bus in-process instead of creating segments in the host's /dev/shm
+os.environ.setdefault("INVALIDATION_BUS", "local")
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    # A file, not :memory:, so the TestClient's event loop can open its own connections
+    return create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.db'}")
+
+
+@pytest_asyncio.fixture
+async def empty_engine(db_engine):
+    """db_engine for async tests, disposed afterwards; no tables."""
+    yield db_engine
+    await db_engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def engine(empty_engine):
+    from app.database import Base
+
+    async with empty_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return empty_engine
+
+
+@pytest_asyncio.fixture
+async def session(engine):
+    """AsyncSession on a fresh database with every table created; modules add their rows on top."""
+    async with AsyncSession(engine) as db:
+        yield db
+
+
+@pytest.fixture
+def api(db_engine):
+    """TestClient for the whole app on a fresh database, with the admin checks bypassed."""
+    from fastapi.testclient import TestClient
+    from app.auth import is_admin, verify_admin
+    from app.cache import rankings_cache
+    from app.database import Base, get_db
+    from app.main import app
+
+    Session = sessionmaker(bind=db_engine, class_=AsyncSession, autoflush=False)
+
+    async def get_test_db():
+        async with Session() as session:
+            yield session
+
+    async def create_tables():
+        async with db_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    app.dependency_overrides.update({get_db: get_test_db, is_admin: lambda: {"role": "admin"}, verify_admin: lambda: "admin"})
+    rankings_cache.invalidate()
+    try:
+        with TestClient(app) as client:
+            client.portal.call(create_tables)
+            yield client
+            client.portal.call(db_engine.dispose)
+    finally:
+        app.dependency_overrides.clear()
+        rankings_cache.invalidate()
+
+
+@pytest.fixture
+def query_budget(db_engine):
+    """with query_budget(n): ... fails when the block runs more than n SQL statements (N+1 guard)."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+
+    @contextmanager
+    def budget(limit):
+        start = len(statements)
+        yield
+        ran = statements[start:]
+        assert len(ran) <= limit, f"{len(ran)} queries, budget is {limit}:\n" + "\n".join(ran)
+
+    yield budget
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
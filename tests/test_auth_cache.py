@@ -0,0 +1,58 @@
+import pytest
+from datetime import timedelta
+from app import auth
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = auth.TokenCache(maxsize=2)
+    monkeypatch.setattr(auth, "token_cache", cache)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_admin_checks_share_the_cache(cache):
+    token = auth.create_access_token({"sub": auth.ADMIN_USERNAME, "role": "admin"}, timedelta(minutes=5))
+
+    assert (await auth.is_admin(token))["role"] == "admin"
+    assert auth.verify_admin(token) == auth.ADMIN_USERNAME
+    assert (await auth.is_admin(token))["sub"] == auth.ADMIN_USERNAME
+    assert cache.stats() == {"size": 1, "hits": 2, "misses": 1, "expired": 0}
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_evicted(cache, monkeypatch):
+    token = auth.create_access_token({"sub": auth.ADMIN_USERNAME, "role": "admin"}, timedelta(minutes=5))
+    await auth.is_admin(token)
+
+    real_time = auth.time.time
+    monkeypatch.setattr(auth.time, "time", lambda: real_time() + 600)
+    assert cache.get(token) is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_invalid_token_is_rejected_and_not_cached(cache):
+    with pytest.raises(auth.InvalidToken):
+        auth.decode_token("garbage")
+    with pytest.raises(auth.InvalidToken):
+        auth.decode_token("garbage")
+    assert cache.stats() == {"size": 0, "hits": 0, "misses": 2, "expired": 0}
+
+
+def test_cache_is_bounded(cache):
+    for n in range(3):
+        cache.put(f"token-{n}", {"sub": n})
+    assert cache.get("token-0") is None
+    assert cache.get("token-2") == {"sub": 2}
+
+
+def test_bad_tokens_are_rejected_not_500(api, cache):
+    # The api fixture bypasses the admin checks; put the real ones back
+    api.app.dependency_overrides.pop(auth.is_admin)
+    api.app.dependency_overrides.pop(auth.verify_admin)
+    expired = auth.create_access_token({"sub": auth.ADMIN_USERNAME, "role": "admin"}, timedelta(minutes=-1))
+
+    for token in ("garbage", expired):
+        headers = {"Authorization": f"Bearer {token}"}
+        assert api.post("/matches/", json={}, headers=headers).status_code == 401
+        assert api.get("/admin-only", headers=headers).status_code == 403
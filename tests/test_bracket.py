@@ -0,0 +1,96 @@
+from datetime import date
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from sqlalchemy.future import select
+from app.models import Player, Tournament, Match, TournamentStanding
+from app import bracket, tournament_progress
+
+
+def by_round(matches):
+    rounds = {}
+    for m in matches:
+        rounds.setdefault(m.round, []).append(m)
+    return rounds
+
+
+def test_build_links_every_round_and_decides_byes():
+    rounds = by_round(bracket.build(1, [(1, None), (4, 5), (2, 3), (6, None)]))
+    assert sorted(rounds) == ["3rd Place Match", "Final", "Round of 4", "Round of 8"]
+
+    bye, played = rounds["Round of 8"][0], rounds["Round of 8"][1]
+    assert (bye.player1_id, bye.player2_id, bye.winner_id) == (1, None, 1)
+    semi = bye.next_match
+    assert (semi.round, bye.next_slot, played.next_match, played.next_slot) == ("Round of 4", 1, semi, 2)
+    assert semi.player1_id == 1 and semi.player2_id is None
+
+    semis = rounds["Round of 4"]
+    assert {s.next_match.round for s in semis} == {"Final"}
+    assert [(s.loser_next_match.round, s.loser_next_slot) for s in semis] == [("3rd Place Match", 1), ("3rd Place Match", 2)]
+
+
+def test_build_skips_unreachable_matches():
+    rounds = by_round(bracket.build(1, [(1, None), (None, None)]))
+    # One player: the semifinal bye goes straight through to a Final walkover, no 3rd place
+    assert sorted(rounds) == ["Final", "Round of 4"]
+    assert rounds["Final"][0].winner_id == 1
+
+
+@pytest_asyncio.fixture
+async def session(session):
+    session.add_all([Player(id=i, name=f"P{i}") for i in (1, 2, 3)])
+    session.add(Tournament(id=1, name="T", date=date(2025, 1, 1), created_at=date(2025, 1, 1), num_players=3, num_groups=0))
+    session.add_all(bracket.build(1, [(1, None), (2, 3)]))
+    await tournament_progress.recount(session, 1)
+    await session.commit()
+    return session
+
+
+async def decide(db, round_name, winner_id):
+    match = (await db.execute(select(Match).where(Match.round == round_name, Match.player2_id.isnot(None)))).scalars().first()
+    await db.execute(update(Match).where(Match.id == match.id).values(winner_id=winner_id))
+    await tournament_progress.record_result(db, 1, "knockout", False)
+    await bracket.advance(db, match.id)
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_results_fill_slots_and_finish_with_standings(session):
+    await decide(session, "Round of 4", 3)
+
+    matches = {m.round: m for m in (await session.execute(select(Match))).scalars().all()}
+    assert (matches["Final"].player1_id, matches["Final"].player2_id) == (1, 3)
+    # The other semifinal was a bye, so the lone semifinal loser takes 3rd place by walkover
+    assert (matches["3rd Place Match"].player1_id, matches["3rd Place Match"].winner_id) == (2, 2)
+
+    await decide(session, "Final", 3)
+    standings = (await session.execute(select(TournamentStanding.position, TournamentStanding.player_id))).all()
+    assert sorted(standings) == [(1, 3), (2, 1), (3, 2)]
+    progress = await tournament_progress.load(session, 1)
+    assert progress.knockout_completed == progress.knockout_total
+
+
+def test_semifinals_and_final_in_one_batch(api):
+    for name in "ABCD":
+        api.post("/players/", json={"name": name})
+    api.post("/tournaments/", json={
+        "name": "Cup", "date": "2025-01-01", "num_groups": 0, "players_per_group_advancing": 0,
+        "player_ids": [1, 2, 3, 4],
+    })
+    bracket_rounds = api.get("/tournaments/1/details").json()["knockout_bracket"]
+
+    def won_by_player1(match, player1_id, player2_id):
+        return {
+            "match_id": match["id"], "player1_id": player1_id, "player2_id": player2_id,
+            "player1_score": 2, "player2_score": 0, "winner_id": player1_id, "sets": [],
+        }
+
+    semis = bracket_rounds["Round of 4"]
+    results = [won_by_player1(m, m["player1_id"], m["player2_id"]) for m in semis]
+    final = bracket_rounds["Final"][0]
+    results.append(won_by_player1(final, semis[0]["player1_id"], semis[1]["player1_id"]))
+
+    response = api.post("/tournaments/1/results", json={"results": results})
+    assert response.status_code == 200, response.text
+    decided = api.get("/tournaments/1/details").json()["knockout_bracket"]["Final"][0]
+    assert decided["winner_id"] == semis[0]["player1_id"]
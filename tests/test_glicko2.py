@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import numpy as np
+from app import glicko2
+from app.rating_engine import rate_match, idle_periods, GLICKO2
+
+
+def test_rate_period_matches_glickman_example():
+    # Worked example from Glickman's "Example of the Glicko-2 system"
+    mu, phi = glicko2.to_glicko2([1500, 1400, 1550, 1700], [200, 30, 100, 300])
+    sigma = np.full(4, 0.06)
+    mu, phi, sigma = glicko2.rate_period(mu, phi, sigma, [0, 0, 0], [1, 2, 3], [1, 0, 0])
+    ratings, rds = glicko2.from_glicko2(mu, phi)
+
+    assert abs(ratings[0] - 1464.06) < 0.01
+    assert abs(rds[0] - 151.52) < 0.01
+    assert abs(sigma[0] - 0.05999) < 1e-5
+    # Only players with a result in the period move
+    assert ratings[1:].tolist() == [1400, 1550, 1700]
+
+
+def test_replay_rates_each_period_as_one_batch():
+    p1, p2, winner = [1, 3, 1], [2, 4, 3], [1, 4, 3]
+    ratings, rds, vols, games, last_period, history = glicko2.replay_glicko2(p1, p2, winner, [0, 0, 2], 5)
+
+    mu, phi = glicko2.to_glicko2(np.full(5, 1500.0), np.full(5, 350.0))
+    sigma = np.full(5, 0.06)
+    mu, phi, sigma = glicko2.rate_period(mu, phi, sigma, [1, 3, 2, 4], [2, 4, 1, 3], [1, 0, 0, 1])
+    phi[[1, 3]] = glicko2.inflate(phi[[1, 3]], sigma[[1, 3]], [1, 1])
+    mu, phi, sigma = glicko2.rate_period(mu, phi, sigma, [1, 3], [3, 1], [0, 1])
+
+    assert np.allclose(ratings, glicko2.from_glicko2(mu, phi)[0])
+    assert np.allclose(rds, glicko2.from_glicko2(mu, phi)[1])
+    assert games.tolist() == [0, 2, 1, 2, 1]
+    assert last_period.tolist() == [-1, 2, 0, 2, 0]
+    # Match 2 (players 1 and 3) starts from where their period-0 matches left them
+    assert history["before"][2].tolist() == [history["after"][0][0], history["after"][1][0]]
+
+
+def test_returning_player_moves_further_than_a_regular():
+    start = datetime(2025, 1, 6)
+
+    def player(pid, rated_at):
+        return SimpleNamespace(id=pid, rating=1500, matches=20, rating_deviation=60.0, volatility=0.06, rated_at=rated_at)
+
+    regular, returning = player(1, start - timedelta(days=7)), player(2, start - timedelta(days=180))
+    opponent_a, opponent_b = player(3, start), player(4, start)
+    assert idle_periods(returning.rated_at, start) > idle_periods(regular.rated_at, start) == 0
+
+    change_regular, _ = rate_match(regular, opponent_a, 1, start, engine=GLICKO2)
+    change_returning, _ = rate_match(returning, opponent_b, 2, start, engine=GLICKO2)
+
+    assert change_returning.rating_after - 1500 > change_regular.rating_after - 1500 > 0
+    assert change_regular.k_factor is None
+    assert regular.matches == 21 and regular.rated_at == start
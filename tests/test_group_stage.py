@@ -0,0 +1,39 @@
+from collections import Counter
+from itertools import combinations
+from app.routers.tournaments import round_robin_rows
+
+
+def test_round_robin_rows_pair_each_group_once():
+    rows = round_robin_rows(5, {0: [1, 2, 3], 1: [4, 5], 2: [6]})
+    assert [(r["player1_id"], r["player2_id"], r["round"]) for r in rows] == [
+        (1, 2, "Group 1"), (1, 3, "Group 1"), (2, 3, "Group 1"), (4, 5, "Group 2"),
+    ]
+    assert all(r["tournament_id"] == 5 and r["stage"] == "group" for r in rows)
+    assert round_robin_rows(5, {}) == []
+
+
+def test_grouped_tournament_generates_a_round_robin_per_group(api):
+    for name in "ABCDEFG":
+        api.post("/players/", json={"name": name})
+    response = api.post("/tournaments/", json={
+        "name": "Club Open", "date": "2025-01-01", "num_groups": 2,
+        "players_per_group_advancing": 2, "player_ids": [1, 2, 3, 4, 5, 6, 7],
+    })
+    assert response.status_code == 200, response.text
+    details = api.get(f"/tournaments/{response.json()['tournament_id']}/details").json()
+
+    # Players are dealt round the groups in the order given
+    groups = {"Group 1": {1, 3, 5, 7}, "Group 2": {2, 4, 6}}
+    matches = details["group_matches"]
+    assert len(matches) == 6 + 3
+    assert details["knockout_matches"] == []
+
+    pairs = Counter()
+    for match in matches:
+        assert match["stage"] == "group"
+        assert match["winner_id"] is None
+        assert {match["player1_id"], match["player2_id"]} <= groups[match["round"]]
+        pairs[frozenset((match["player1_id"], match["player2_id"]))] += 1
+    expected = {frozenset(pair) for players in groups.values() for pair in combinations(sorted(players), 2)}
+    assert set(pairs) == expected
+    assert set(pairs.values()) == {1}
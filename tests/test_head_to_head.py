@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import head_to_head as h2h
+from app.models import HeadToHead
+
+
+def post_match(api, winner_id, day, sets=((11, 5), (11, 7)), player1_id=1, player2_id=2):
+    response = api.post("/matches/", json={
+        "player1_id": player1_id, "player2_id": player2_id,
+        "player1_score": sum(a > b for a, b in sets), "player2_score": sum(b > a for a, b in sets),
+        "winner_id": winner_id, "timestamp": f"2025-01-0{day}T10:00:00",
+        "sets": [{"set_number": n, "player1_score": a, "player2_score": b} for n, (a, b) in enumerate(sets, 1)],
+    })
+    assert response.status_code == 200, response.text
+
+
+def summary(api, player1_id=1, player2_id=2):
+    return api.get("/matches/head-to-head", params={"player1_id": player1_id, "player2_id": player2_id})
+
+
+@pytest.fixture
+def players(api):
+    for name in "ABC":
+        api.post("/players/", json={"name": name})
+    return api
+
+
+def test_results_add_up_and_deletes_take_them_back_out(players):
+    post_match(players, 1, 1)
+    post_match(players, 2, 2, sets=((5, 11), (11, 9), (7, 11)))
+
+    both = summary(players).json()
+    assert (both["matches_played"], both["player1_wins"], both["player2_wins"]) == (2, 1, 1)
+    assert (both["player1_sets"], both["player2_sets"]) == (3, 2)
+    assert (both["player1_points"], both["player2_points"]) == (11 + 11 + 5 + 11 + 7, 5 + 7 + 11 + 9 + 11)
+    # Asking from the other side flips every counter
+    flipped = summary(players, 2, 1).json()
+    assert (flipped["player1_sets"], flipped["player2_sets"], flipped["player1_wins"]) == (2, 3, 1)
+
+    assert players.delete("/matches/2").status_code == 200
+    after = summary(players).json()
+    assert (after["matches_played"], after["player1_wins"], after["player2_wins"]) == (1, 1, 0)
+    assert (after["player1_sets"], after["player2_sets"]) == (2, 0)
+
+    assert players.delete("/matches/1").status_code == 200
+    assert summary(players).status_code == 404
+
+
+def test_update_swaps_the_winner(players):
+    post_match(players, 1, 1)
+    response = players.patch("/matches/1", json={
+        "winner_id": 2, "sets": [{"set_number": 1, "player1_score": 3, "player2_score": 11}],
+    })
+    assert response.status_code == 200, response.text
+
+    result = summary(players).json()
+    assert (result["matches_played"], result["player1_wins"], result["player2_wins"]) == (1, 0, 1)
+    assert (result["player1_points"], result["player2_points"]) == (3, 11)
+    assert result["most_recent_winner"] == 2
+
+
+def test_deleting_the_newest_match_falls_back_to_the_previous_one(players, db_engine):
+    post_match(players, 1, 1)
+    post_match(players, 2, 2)
+    assert summary(players).json()["most_recent_winner"] == 2
+
+    assert players.delete("/matches/2").status_code == 200
+    assert summary(players).json()["most_recent_winner"] == 1
+
+    async def last_match_at():
+        async with AsyncSession(db_engine) as db:
+            return (await db.get(HeadToHead, (1, 2))).last_match_at.isoformat()
+
+    assert players.portal.call(last_match_at) == "2025-01-01T10:00:00"
+
+
+def test_tournament_reset_and_delete_rebuild_the_pairs(players):
+    post_match(players, 1, 1)
+    response = players.post("/tournaments/", json={
+        "name": "Club Open", "date": "2025-01-05", "num_groups": 1,
+        "players_per_group_advancing": 2, "player_ids": [1, 2, 3],
+    })
+    tournament_id = response.json()["tournament_id"]
+    group_matches = players.get(f"/tournaments/{tournament_id}/details").json()["group_matches"]
+    for match in group_matches:
+        players.post(f"/tournaments/matches/{match['id']}/result", json={
+            "player1_id": match["player1_id"], "player2_id": match["player2_id"],
+            "player1_score": 1, "player2_score": 0, "winner_id": match["player2_id"],
+            "sets": [{"set_number": 1, "player1_score": 9, "player2_score": 11}],
+        })
+    assert summary(players).json()["matches_played"] == 2
+    assert summary(players, 2, 3).json()["matches_played"] == 1
+
+    # Reset drops the tournament's results but keeps the friendly
+    assert players.post(f"/tournaments/{tournament_id}/reset").status_code == 200
+    reset = summary(players).json()
+    assert (reset["matches_played"], reset["player1_wins"], reset["most_recent_winner"]) == (1, 1, 1)
+    assert summary(players, 2, 3).status_code == 404
+
+    for match in players.get(f"/tournaments/{tournament_id}/details").json()["group_matches"]:
+        players.post(f"/tournaments/matches/{match['id']}/result", json={
+            "player1_id": match["player1_id"], "player2_id": match["player2_id"],
+            "player1_score": 1, "player2_score": 0, "winner_id": match["player1_id"],
+            "sets": [{"set_number": 1, "player1_score": 11, "player2_score": 9}],
+        })
+    assert summary(players, 2, 3).json()["matches_played"] == 1
+
+    assert players.delete(f"/tournaments/{tournament_id}").status_code == 200
+    assert summary(players).json()["matches_played"] == 1
+    assert summary(players, 1, 3).status_code == 404
+    assert summary(players, 2, 3).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_first_result_for_a_pair_is_an_upsert(engine):
+    # Another transaction inserted the pair's row after this one found none; the upsert must not fail
+    async with AsyncSession(engine) as db:
+        await h2h.ensure_row(db, 1, 2)
+        row = await db.get(HeadToHead, (1, 2))
+        row.matches_played = 3
+        await db.commit()
+
+    async with AsyncSession(engine) as db:
+        await h2h.ensure_row(db, 1, 2)
+        await db.commit()
+        assert (await db.get(HeadToHead, (1, 2), populate_existing=True)).matches_played == 3
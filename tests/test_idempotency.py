@@ -0,0 +1,53 @@
+from datetime import timedelta
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import IdempotencyKey
+from app import idempotency
+
+
+@pytest.mark.asyncio
+async def test_completed_request_is_replayed(engine):
+    async with AsyncSession(engine) as db:
+        idem, replay = await idempotency.begin(db, "POST /matches", "abc", {"winner_id": 1})
+        assert replay is None
+        await idem.complete({"message": "ok"})
+        await db.commit()
+
+    async with AsyncSession(engine) as db:
+        idem, replay = await idempotency.begin(db, "POST /matches", "abc", {"winner_id": 1})
+        assert replay.status_code == 200
+        assert replay.body == b'{"message":"ok"}'
+        assert replay.headers["Idempotent-Replayed"] == "true"
+
+        with pytest.raises(HTTPException) as exc:
+            await idempotency.begin(db, "POST /matches", "abc", {"winner_id": 2})
+        assert exc.value.status_code == 422
+
+        # Same key on another endpoint is a different request
+        _, replay = await idempotency.begin(db, "POST /matches/batch", "abc", {"winner_id": 1})
+        assert replay is None
+
+
+@pytest.mark.asyncio
+async def test_failed_request_leaves_no_key_and_expired_keys_are_reused(engine, monkeypatch):
+    async with AsyncSession(engine) as db:
+        await idempotency.begin(db, "POST /matches", "abc", {})
+        await db.rollback()
+        assert await db.get(IdempotencyKey, idempotency._digest("POST /matches", "abc")) is None
+
+        idem, _ = await idempotency.begin(db, "POST /matches", "abc", {})
+        await idem.complete({"message": "ok"})
+        await db.commit()
+
+    later = idempotency._utcnow() + idempotency.TTL + timedelta(seconds=1)
+    monkeypatch.setattr(idempotency, "_utcnow", lambda: later)
+    async with AsyncSession(engine) as db:
+        _, replay = await idempotency.begin(db, "POST /matches", "abc", {"other": True})
+        assert replay is None
+
+
+@pytest.mark.asyncio
+async def test_no_key_means_no_bookkeeping(engine):
+    async with AsyncSession(engine) as db:
+        assert await idempotency.begin(db, "POST /matches", None, {}) == (None, None)
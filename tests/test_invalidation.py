@@ -0,0 +1,53 @@
+import json
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from app.models import Player
+from app.cache import RankingsCache
+from app.invalidation import InvalidationBus, SharedMemoryBus, LocalBus, RANKINGS
+
+
+def test_shared_memory_bus_is_visible_across_instances(tmp_path):
+    path = str(tmp_path / "bus")
+    worker_a, worker_b = SharedMemoryBus(path), SharedMemoryBus(path)
+
+    watch = worker_b.watch("tournament:7")
+    watch.mark()
+    assert not watch.changed()
+
+    assert worker_a.publish("tournament:7") == 1
+    assert worker_b.version("tournament:7") == 1
+    assert watch.changed()
+
+
+def test_backends_must_implement_publish_and_version():
+    class CountOnly(InvalidationBus):
+        def publish(self, *topics):
+            return 1
+
+    with pytest.raises(TypeError):
+        CountOnly()
+
+
+@pytest_asyncio.fixture
+async def session(session):
+    session.add_all([Player(id=1, name="Alpha", rating=1500), Player(id=2, name="Bravo", rating=1400)])
+    await session.commit()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_other_worker_reloads_after_publish(session):
+    bus = LocalBus()
+    writer, reader = RankingsCache(bus), RankingsCache(bus)
+    await writer.get(session)
+    await reader.get(session)
+
+    await session.execute(update(Player).where(Player.id == 2).values(rating=1600))
+    await session.commit()
+    writer.patch([(2, "Bravo", 1600, 1)])
+
+    payload, _ = await reader.get(session)
+    assert [r["name"] for r in json.loads(payload)] == ["Bravo", "Alpha"]
+    # The writer patched in place and does not need a reload
+    assert writer._watch.seen == (bus.version(RANKINGS),)
@@ -0,0 +1,32 @@
+import json
+import logging
+from app.logging_config import JsonFormatter, SamplingFilter, parse_pairs
+
+
+def make_record(name, level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_parse_pairs_ignores_malformed_items():
+    assert parse_pairs("app.routers=DEBUG, sqlalchemy.engine = WARNING,bogus,=x") == [
+        ("app.routers", "DEBUG"),
+        ("sqlalchemy.engine", "WARNING"),
+    ]
+
+
+def test_sampling_filter_keeps_one_in_n_and_all_warnings():
+    sampler = SamplingFilter({"app.routers": 3})
+    kept = [sampler.filter(make_record("app.routers.matches")) for _ in range(6)]
+    assert kept == [True, False, False, True, False, False]
+    assert sampler.filter(make_record("app.routers.matches", level=logging.WARNING))
+    assert all(sampler.filter(make_record("app.auth")) for _ in range(3))
+
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(make_record("app.auth", tournament_id=7))
+    entry = json.loads(line)
+    assert entry["severity"] == "INFO"
+    assert entry["message"] == "hello world"
+    assert entry["tournament_id"] == 7
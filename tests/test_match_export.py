@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+import pytest
+from app.routers import matches
+
+
+@pytest.fixture
+def history(api, monkeypatch):
+    # Tiny batches and chunks so a match's set scores straddle cursor batches and output is split
+    monkeypatch.setattr(matches, "EXPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(matches, "EXPORT_CHUNK_SIZE", 64)
+    for name in "ABC":
+        api.post("/players/", json={"name": name})
+    for day, (p1, p2) in enumerate(((1, 2), (2, 3), (1, 3)), 1):
+        response = api.post("/matches/", json={
+            "player1_id": p1, "player2_id": p2, "player1_score": 2, "player2_score": 1, "winner_id": p1,
+            "timestamp": f"2025-01-0{day}T10:00:00",
+            "sets": [{"set_number": n, "player1_score": 11, "player2_score": s} for n, s in enumerate((5, 13, 9), 1)],
+        })
+        assert response.status_code == 200, response.text
+    return api
+
+
+def test_ndjson_export_streams_every_match_with_its_sets(history):
+    response = history.get("/matches/export")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+
+    assert [row["id"] for row in rows] == [1, 2, 3]
+    assert rows[0]["timestamp"] == "2025-01-01T10:00:00"
+    assert (rows[0]["player1"], rows[0]["player2"], rows[0]["winner_id"]) == ("A", "B", 1)
+    assert all(row["set_scores"] == [[11, 5], [11, 13], [11, 9]] for row in rows)
+
+    only_c = history.get("/matches/export", params={"player_id": 3}).text.splitlines()
+    assert [json.loads(line)["id"] for line in only_c] == [2, 3]
+
+
+def test_csv_export_and_format_validation(history):
+    response = history.get("/matches/export", params={"format": "csv"})
+    assert response.headers["content-disposition"] == 'attachment; filename="matches.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == ["1", "2", "3"]
+    assert rows[1]["player2"] == "C"
+    assert rows[2]["set_scores"] == "11-5 11-13 11-9"
+
+    assert history.get("/matches/export", params={"format": "xml"}).status_code == 422
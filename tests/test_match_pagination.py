@@ -0,0 +1,53 @@
+import base64
+import pytest
+
+
+@pytest.fixture
+def matches(api):
+    for name in "ABC":
+        api.post("/players/", json={"name": name})
+    # Two matches share each timestamp, so pages have to break ties on id
+    for n, (p1, p2) in enumerate(((1, 2), (1, 3), (2, 3), (1, 2), (2, 3), (1, 3), (1, 2))):
+        response = api.post("/matches/", json={
+            "player1_id": p1, "player2_id": p2, "player1_score": 1, "player2_score": 0, "winner_id": p1,
+            "timestamp": f"2025-01-0{n // 2 + 1}T10:00:00",
+            "sets": [{"set_number": 1, "player1_score": 11, "player2_score": 5}],
+        })
+        assert response.status_code == 200, response.text
+    return api
+
+
+def walk(api, **params):
+    pages, cursor = [], None
+    while True:
+        response = api.get("/matches/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        pages.append([m["id"] for m in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_cursor_walks_every_match_once(matches):
+    assert walk(matches, limit=3) == [[1, 2, 3], [4, 5, 6], [7]]
+    assert walk(matches, limit=3, descending=True) == [[7, 6, 5], [4, 3, 2], [1]]
+    # A page that ends exactly on the last row has no cursor
+    assert walk(matches, limit=7) == [[1, 2, 3, 4, 5, 6, 7]]
+
+
+def test_cursor_keeps_the_player_filter(matches):
+    assert walk(matches, limit=2, player_id=3) == [[2, 3], [5, 6]]
+    assert walk(matches, limit=2, player_id=3, descending=True) == [[6, 5], [3, 2]]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"2025-01-01T10:00:00").decode(),
+    base64.urlsafe_b64encode(b"yesterday|3").decode(),
+    base64.urlsafe_b64encode(b"2025-01-01T10:00:00|three").decode(),
+    base64.urlsafe_b64encode(b"\xff\xfe|1").decode(),
+])
+def test_malformed_cursor_is_a_400(matches, cursor):
+    response = matches.get("/matches/", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
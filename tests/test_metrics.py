@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import InstrumentedPool
+from app.metrics import Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.05, 0.05, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(0.01, 1), (0.1, 3), (1.0, 4), (float("inf"), 5)]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.snapshot()["p99"] == "+Inf"
+
+
+@pytest.mark.asyncio
+async def test_pool_records_waits_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedPool, pool_size=1, max_overflow=0, pool_timeout=0.05,
+    )
+
+    async def hold(seconds):
+        async with engine.connect() as conn:
+            await conn.execute(text("select 1"))
+            await asyncio.sleep(seconds)
+
+    await hold(0)
+    results = await asyncio.gather(hold(0.2), hold(0), return_exceptions=True)
+    stats = engine.pool.stats()
+    await engine.dispose()
+
+    assert isinstance(results[1], PoolTimeout)
+    assert stats["timeouts"] == 1
+    assert stats["checkout_latency_seconds"]["count"] == 3
+    assert stats["wait_latency_seconds"]["count"] == 1
+    assert stats["checked_out"] == 0
+
+
+def test_timing_middleware_labels_routes_and_counts_queries(tmp_path):
+    from fastapi import APIRouter, FastAPI
+    from fastapi.testclient import TestClient
+    from app.timing import RequestMetrics, TimingMiddleware, instrument_engine
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'timing.db'}")
+    instrument_engine(engine)
+    router = APIRouter()
+
+    @router.get("/{item_id}")
+    async def read_item(item_id: int):
+        async with engine.connect() as conn:
+            for _ in range(item_id):
+                await conn.execute(text("select 1"))
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(router, prefix="/items")
+    metrics = RequestMetrics()
+    app.add_middleware(TimingMiddleware, metrics=metrics)
+
+    with TestClient(app) as client:
+        client.get("/items/3")
+        client.get("/items/5")
+        client.get("/missing")
+
+    route = metrics.routes[("GET", "/items/{item_id}")]
+    assert route.latency.count == 2
+    assert route.queries.sum == 8
+    assert route.db_time.sum > 0
+    assert dict(route.statuses) == {200: 2}
+    assert metrics.routes[("GET", "unmatched")].statuses[404] == 1
+
+
+def test_internal_metrics_are_off_without_a_token(api, monkeypatch):
+    from app.routers import internal
+
+    monkeypatch.setattr(internal, "METRICS_TOKEN", None)
+    assert api.get("/internal/metrics").status_code == 404
+    assert api.get("/internal/metrics/prometheus", headers={"X-Metrics-Token": ""}).status_code == 404
+
+    monkeypatch.setattr(internal, "METRICS_TOKEN", "s3cret")
+    assert api.get("/internal/metrics").status_code == 403
+    assert api.get("/internal/metrics", headers={"X-Metrics-Token": "wrong"}).status_code == 403
+    response = api.get("/internal/metrics", headers={"X-Metrics-Token": "s3cret"})
+    assert response.status_code == 200
+    assert "db_pool" in response.json()
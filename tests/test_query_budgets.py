@@ -0,0 +1,53 @@
+import pytest
+
+# Statement budgets for the busiest endpoints. They don't grow with the number of matches or players,
+# so a lazy load creeping back into a loop fails here long before production notices.
+
+
+@pytest.fixture
+def tournament(api):
+    for name in "ABCDEFGH":
+        assert api.post("/players/", json={"name": name}).status_code == 200
+    response = api.post("/tournaments/", json={
+        "name": "Club Open", "date": "2025-01-01", "num_groups": 2,
+        "players_per_group_advancing": 2, "player_ids": list(range(1, 9)),
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["tournament_id"]
+
+
+def play(api, match, sets=((11, 5), (11, 7))):
+    response = api.post(f"/tournaments/matches/{match['id']}/result", json={
+        "player1_id": match["player1_id"], "player2_id": match["player2_id"],
+        "player1_score": len(sets), "player2_score": 0, "winner_id": match["player1_id"],
+        "sets": [{"set_number": n, "player1_score": a, "player2_score": b} for n, (a, b) in enumerate(sets, 1)],
+    })
+    assert response.status_code == 200, response.text
+
+
+def test_read_endpoints_stay_within_budget(api, tournament, query_budget):
+    for match in api.get(f"/tournaments/{tournament}/details").json()["group_matches"]:
+        play(api, match)
+
+    with query_budget(3):
+        assert api.get("/tournaments/").status_code == 200
+    with query_budget(3):
+        assert api.get(f"/tournaments/{tournament}").status_code == 200
+    with query_budget(2):
+        assert api.get(f"/tournaments/{tournament}/details").status_code == 200
+    with query_budget(2):
+        assert api.get("/matches/", params={"limit": 50}).status_code == 200
+    with query_budget(1):
+        assert api.get("/players/1").status_code == 200
+
+
+def test_write_endpoints_stay_within_budget(api, tournament, query_budget):
+    group_matches = api.get(f"/tournaments/{tournament}/details").json()["group_matches"]
+    # Two sets: every set score and rating history row is its own INSERT on SQLite, and a pair's
+    # first result upserts its head-to-head row and re-reads it under lock
+    with query_budget(15):
+        play(api, group_matches[0])
+    with query_budget(10):
+        assert api.delete(f"/matches/{group_matches[0]['id']}").status_code == 200
+    with query_budget(9):
+        assert api.delete(f"/tournaments/{tournament}").status_code == 200
@@ -0,0 +1,43 @@
+import json
+import pytest
+import pytest_asyncio
+from app.models import Player
+from app.cache import RankingsCache, etag_matches
+
+
+@pytest_asyncio.fixture
+async def session(session):
+    session.add_all([
+        Player(id=1, name="Alpha", rating=1500, matches=0),
+        Player(id=2, name="Bravo", rating=1600, matches=3),
+        Player(id=3, name="Charlie", rating=1400, matches=1),
+    ])
+    await session.commit()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_snapshot_sorted_by_rating(session):
+    cache = RankingsCache()
+    payload, etag = await cache.get(session)
+    assert [r["name"] for r in json.loads(payload)] == ["Bravo", "Alpha", "Charlie"]
+    assert etag_matches(etag, etag)
+
+
+@pytest.mark.asyncio
+async def test_patch_and_remove_update_payload_and_etag(session):
+    cache = RankingsCache()
+    _, first_etag = await cache.get(session)
+
+    cache.patch([(3, "Charlie", 1700, 2), (2, "Bravo", 1550, 4)])
+    payload, patched_etag = await cache.get(session)
+    assert json.loads(payload) == [
+        {"name": "Charlie", "rating": 1700, "matches": 2},
+        {"name": "Bravo", "rating": 1550, "matches": 4},
+        {"name": "Alpha", "rating": 1500, "matches": 0},
+    ]
+    assert patched_etag != first_etag
+
+    cache.remove(1)
+    payload, _ = await cache.get(session)
+    assert [r["name"] for r in json.loads(payload)] == ["Charlie", "Bravo"]
@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.fixture
+def group_match(api):
+    for name in "AB":
+        api.post("/players/", json={"name": name})
+    tournament_id = api.post("/tournaments/", json={
+        "name": "Club Open", "date": "2025-01-01", "num_groups": 1,
+        "players_per_group_advancing": 1, "player_ids": [1, 2],
+    }).json()["tournament_id"]
+    return api.get(f"/tournaments/{tournament_id}/details").json()["group_matches"][0]
+
+
+def submit(api, match, winner_id, day):
+    response = api.post(f"/tournaments/matches/{match['id']}/result", json={
+        "player1_id": match["player1_id"], "player2_id": match["player2_id"],
+        "player1_score": int(winner_id == match["player1_id"]), "player2_score": int(winner_id == match["player2_id"]),
+        "winner_id": winner_id, "timestamp": f"2025-01-0{day}T10:00:00",
+        "sets": [{"set_number": 1, "player1_score": 11 if winner_id == match["player1_id"] else 5,
+                  "player2_score": 5 if winner_id == match["player1_id"] else 11}],
+    })
+    assert response.status_code == 200, response.text
+
+
+def history(api, player_id):
+    return api.get(f"/players/{player_id}/rating-history").json()
+
+
+def test_history_follows_submit_edit_and_delete(api, group_match):
+    match_id = group_match["id"]
+    submit(api, group_match, winner_id=1, day=1)
+    [won] = history(api, 1)
+    [lost] = history(api, 2)
+    assert (won["match_id"], won["timestamp"], won["rating_before"]) == (match_id, "2025-01-01T10:00:00", 1500)
+    assert won["rating_after"] == api.get("/players/1").json()["rating"] > 1500
+    assert lost["rating_after"] == api.get("/players/2").json()["rating"] < 1500
+
+    # A corrected result replaces the match's rows instead of adding a second pair
+    submit(api, group_match, winner_id=2, day=2)
+    for player_id in (1, 2):
+        [entry] = history(api, player_id)
+        assert (entry["match_id"], entry["timestamp"]) == (match_id, "2025-01-02T10:00:00")
+        assert entry["rating_after"] == api.get(f"/players/{player_id}").json()["rating"]
+    assert history(api, 2)[0]["rating_after"] > history(api, 2)[0]["rating_before"]
+
+    assert api.delete(f"/matches/{match_id}").status_code == 200
+    assert history(api, 1) == history(api, 2) == []
+
+
+def test_friendly_matches_append_in_play_order(api):
+    for name in "AB":
+        api.post("/players/", json={"name": name})
+    for day, winner in ((2, 1), (1, 2)):
+        api.post("/matches/", json={
+            "player1_id": 1, "player2_id": 2, "player1_score": 1, "player2_score": 0, "winner_id": winner,
+            "timestamp": f"2025-01-0{day}T10:00:00", "sets": [{"set_number": 1, "player1_score": 11, "player2_score": 5}],
+        })
+
+    entries = history(api, 1)
+    assert [e["timestamp"] for e in entries] == ["2025-01-01T10:00:00", "2025-01-02T10:00:00"]
+    assert [e["match_id"] for e in entries] == [2, 1]
+    assert history(api, 3) == []
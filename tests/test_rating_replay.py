@@ -0,0 +1,76 @@
+import json
+import random
+from datetime import datetime, timedelta
+import numpy as np
+from app.elo import calculate_elo
+from app.rating_replay import replay_elo, prediction_scores
+
+
+def sequential_replay(history, num_slots):
+    ratings = [1500] * num_slots
+    games = [0] * num_slots
+    for p1, p2, winner in history:
+        outcome1 = 1 if winner == p1 else 0
+        new1 = int(calculate_elo(ratings[p1], ratings[p2], outcome1, games[p1]))
+        new2 = int(calculate_elo(ratings[p2], ratings[p1], 1 - outcome1, games[p2]))
+        ratings[p1], ratings[p2] = new1, new2
+        games[p1] += 1
+        games[p2] += 1
+    return ratings, games
+
+
+def random_history(num_players, num_matches, seed=7):
+    rng = random.Random(seed)
+    history = []
+    for _ in range(num_matches):
+        p1, p2 = rng.sample(range(1, num_players + 1), 2)
+        history.append((p1, p2, rng.choice((p1, p2))))
+    return history
+
+
+def test_replay_matches_sequential_elo():
+    history = random_history(num_players=40, num_matches=3000)
+    expected_ratings, expected_games = sequential_replay(history, 41)
+
+    p1, p2, winner = np.array(history).T
+    ratings, games = replay_elo(p1, p2, winner, 41)
+
+    assert ratings.astype(int).tolist() == expected_ratings
+    assert games.tolist() == expected_games
+
+
+def test_replay_without_matches_keeps_initial_ratings():
+    ratings, games = replay_elo([], [], [], 5)
+    assert ratings.tolist() == [1500.0] * 5
+    assert games.tolist() == [0] * 5
+
+
+def test_prediction_scores_use_pre_match_ratings():
+    # Equal ratings predict 50%, so each match costs ln(2) and a Brier score of 0.25
+    before = np.array([[1500.0, 1500.0], [1900.0, 1500.0]])
+    log_loss, brier = prediction_scores(before, [1, 3], [2, 3])
+
+    expected_favourite = 1 / (1 + 10 ** (-400 / 400))
+    assert np.isclose(log_loss, (np.log(2) - np.log(expected_favourite)) / 2)
+    assert np.isclose(brier, (0.25 + (1 - expected_favourite) ** 2) / 2)
+    assert np.isclose(prediction_scores(before, [1, 3], [2, 3], skip=1)[1], (1 - expected_favourite) ** 2)
+
+
+def test_tournament_and_friendly_results_share_one_clock(api):
+    for name in "AB":
+        api.post("/players/", json={"name": name})
+    api.post("/tournaments/", json={
+        "name": "Cup", "date": "2025-01-01", "num_groups": 0, "players_per_group_advancing": 0, "player_ids": [1, 2],
+    })
+    final = api.get("/tournaments/1/details").json()["knockout_bracket"]["Final"][0]
+    result = {"player1_id": 1, "player2_id": 2, "player1_score": 2, "player2_score": 0, "winner_id": 1, "sets": []}
+    assert api.post(f"/tournaments/matches/{final['id']}/result", json=result).status_code == 200
+    assert api.post("/matches/", json=result).status_code == 200
+
+    # The tournament match row carries the same timestamp as its rating history entry
+    exported = {row["id"]: row["timestamp"] for row in map(json.loads, api.get("/matches/export").text.splitlines())}
+    history = {row["match_id"]: row["timestamp"] for row in api.get("/players/1/rating-history").json()}
+    assert exported == history
+    # ...and both are on the friendly matches' clock, seconds apart rather than hours
+    tournament_ts, friendly_ts = (datetime.fromisoformat(history[match_id]) for match_id in sorted(history))
+    assert abs(friendly_ts - tournament_ts) < timedelta(minutes=1)
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlalchemy.dialects import mysql
+from sqlalchemy.future import select
+from app.elo import calculate_elo
+from app.models import Player, Match, RatingHistory
+from app.rating_service import RatingBatch, sorted_by_timestamp
+
+
+@pytest_asyncio.fixture
+async def session(session):
+    session.add_all([Player(id=i, name=f"P{i}", rating=1500, matches=0) for i in (1, 2, 3)])
+    session.add_all([Match(id=i, player1_id=1, player2_id=2, winner_id=1) for i in (1, 2)])
+    await session.commit()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_lock_orders_rows_by_id_for_update(session, monkeypatch):
+    statements = []
+    execute = session.execute
+
+    async def capture(stmt, *args, **kwargs):
+        statements.append(str(stmt.compile(dialect=mysql.dialect())))
+        return await execute(stmt, *args, **kwargs)
+
+    monkeypatch.setattr(session, "execute", capture)
+    await RatingBatch(session).lock([3, 1, 2])
+    assert statements[0].endswith("ORDER BY players.id FOR UPDATE")
+
+
+@pytest.mark.asyncio
+async def test_batch_applies_results_in_order_and_commits_once(session):
+    # Another writer moved player 1 after it was loaded into this session
+    stale = await session.get(Player, 1)
+    await session.execute(update(Player).where(Player.id == 1).values(rating=1600))
+
+    batch = RatingBatch(session)
+    await batch.lock([1, 2])
+    assert stale.rating == 1600
+
+    when = datetime(2025, 1, 1)
+    batch.rate(1, 1, 2, 1, when)
+    batch.rate(2, 1, 2, 2, when)
+    rows = await batch.commit()
+
+    r1 = int(calculate_elo(1600, 1500, 1, 0))
+    r2 = int(calculate_elo(1500, 1600, 0, 0))
+    expected = (int(calculate_elo(r1, r2, 0, 1)), int(calculate_elo(r2, r1, 1, 1)))
+    assert sorted(rows) == [(1, "P1", expected[0], 2), (2, "P2", expected[1], 2)]
+    history = (await session.execute(select(RatingHistory.match_id))).scalars().all()
+    assert sorted(history) == [1, 1, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_check_rejects_unknown_players_and_winners(session):
+    batch = RatingBatch(session)
+    await batch.lock([1, 2, 99])
+    with pytest.raises(HTTPException, match="Both players"):
+        batch.check(1, 99, 1)
+    with pytest.raises(HTTPException, match="Both players"):
+        batch.check(1, 1, 1)
+    with pytest.raises(HTTPException, match="Winner"):
+        batch.check(1, 2, 3)
+
+
+def test_sorted_by_timestamp_mixes_naive_aware_and_missing():
+    # Naive timestamps are SGT wall clock, the way the routers store them
+    results = [
+        SimpleNamespace(name="unstamped", timestamp=None),
+        SimpleNamespace(name="late", timestamp=datetime(2025, 1, 1, 14, 0)),
+        SimpleNamespace(name="utc", timestamp=datetime(2025, 1, 1, 5, 0, tzinfo=timezone.utc)),  # 13:00 SGT
+        SimpleNamespace(name="early", timestamp=datetime(2025, 1, 1, 12, 0)),
+        SimpleNamespace(name="sgt", timestamp=datetime(2025, 1, 1, 14, 0, tzinfo=timezone(timedelta(hours=8)))),
+    ]
+    assert [r.name for r in sorted_by_timestamp(results)] == ["early", "utc", "late", "sgt", "unstamped"]
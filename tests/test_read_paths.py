@@ -0,0 +1,48 @@
+from app.cache import FastJSONResponse
+from app.schemas import TournamentResponse
+
+
+def test_column_projected_reads_keep_the_response_shape(api):
+    for name in "ABCD":
+        api.post("/players/", json={"name": name})
+    api.post("/tournaments/", json={
+        "name": "Club Open", "date": "2025-01-01", "num_groups": 1,
+        "players_per_group_advancing": 2, "player_ids": [4, 2, 3, 1],
+    })
+
+    players = api.get("/players/").json()
+    assert players[0] == {"id": 1, "name": "A", "rating": 1500, "matches": 0}
+    assert len(players) == 4
+
+    listed = api.get("/tournaments/").json()
+    single = api.get("/tournaments/1").json()
+    assert listed == [single]
+    tournament = TournamentResponse.model_validate(single)
+    assert (tournament.name, tournament.date.isoformat()) == ("Club Open", "2025-01-01")
+    assert sorted(tournament.player_ids) == [1, 2, 3, 4]
+    assert tournament.final_standings == {}
+    assert api.get("/tournaments/2").status_code == 404
+
+
+def test_match_list_is_encoded_once_and_keeps_the_cursor_header(api):
+    for name in "AB":
+        api.post("/players/", json={"name": name})
+    for day in (1, 2):
+        response = api.post("/matches/", json={
+            "player1_id": 1, "player2_id": 2, "player1_score": 2, "player2_score": 0, "winner_id": 1,
+            "timestamp": f"2025-01-0{day}T10:00:00", "sets": [{"set_number": 1, "player1_score": 11, "player2_score": 9}],
+        })
+        assert response.status_code == 200, response.text
+
+    first = api.get("/matches/", params={"limit": 1})
+    assert first.headers["content-type"] == "application/json"
+    assert first.json()[0]["set_scores"] == [{"set_number": 1, "player1_score": 11, "player2_score": 9}]
+    second = api.get("/matches/", params={"limit": 1, "cursor": first.headers["X-Next-Cursor"]})
+    assert second.json()[0]["id"] != first.json()[0]["id"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_fast_json_response_passes_pre_encoded_bytes_through():
+    assert FastJSONResponse(b'[{"id":1}]').body == b'[{"id":1}]'
+    # Same compact output json.dumps gave, int keys included
+    assert FastJSONResponse({1: "é", "rating": None}).body == '{"1":"é","rating":null}'.encode()
@@ -0,0 +1,73 @@
+import random
+from app import seeding
+
+
+def legacy_seeds(n):
+    if n == 1:
+        return [1]
+    prev = legacy_seeds(n // 2)
+    return [x for pair in zip(prev, [n + 1 - x for x in prev]) for x in pair]
+
+
+def legacy_first_round(players, size):
+    # The list-scan version tournament generation used before app.seeding
+    seeds = legacy_seeds(size)
+    bye_positions = []
+    for i in range(size - len(players)):
+        idx = seeds[i] - 1
+        bye_positions.append(idx + 1 if idx % 2 == 0 else idx - 1)
+    slots, pi = {}, 0
+    for seed in seeds:
+        position = seed - 1
+        if position in bye_positions:
+            slots[position] = None
+        elif pi < len(players):
+            slots[position] = players[pi]
+            pi += 1
+    return [(slots.get(i), slots.get(i + 1)) for i in range(0, size, 2)]
+
+
+def test_seed_tables_and_first_round_match_the_recursive_version():
+    for size in (1, 2, 8, 64, 1024):
+        assert list(seeding.seed_order(size)) == legacy_seeds(size)
+    assert seeding.seed_order(8) == (1, 8, 4, 5, 2, 7, 3, 6)
+
+    for num_players in (2, 3, 5, 8, 9, 24, 100, 513, 1024):
+        size = seeding.bracket_size(num_players)
+        assert size == 1 << (num_players - 1).bit_length()
+        players = list(range(1, num_players + 1))
+        assert seeding.first_round(players, size) == legacy_first_round(players, size)
+
+
+def test_avoid_same_group_separates_group_mates():
+    rng = random.Random(3)
+    for num_groups, per_group in ((2, 2), (4, 2), (8, 3), (16, 4), (64, 8)):
+        group_of = {}
+        players = []
+        for g in range(num_groups):
+            for k in range(per_group):
+                pid = len(players) + 1
+                group_of[pid] = g
+                players.append(pid)
+        rng.shuffle(players)
+
+        draw = seeding.first_round(players)
+        seed_of = {pid: seed for seed, pid in enumerate(players)}
+        pairs = seeding.avoid_same_group(draw, group_of, seed_of)
+
+        assert sorted(p for pair in pairs for p in pair if p) == sorted(players)
+        # The better seed of every match keeps their slot
+        for (a, b), (x, y) in zip(draw, pairs):
+            if a and b:
+                assert (x if seed_of[a] < seed_of[b] else y) == min(a, b, key=seed_of.get)
+        assert [b is None for _, b in pairs] == [b is None for _, b in draw]  # byes stay put
+        assert not any(a and b and group_of[a] == group_of[b] for a, b in pairs)
+
+
+def test_avoid_same_group_keeps_clean_draws_and_unavoidable_clashes():
+    draw = [(1, 2), (3, 4), (5, None)]
+    assert seeding.avoid_same_group(draw, {1: 0, 2: 1, 3: 0, 4: 1, 5: 0}) == draw
+    # Everyone in one group: nothing to separate, nobody is dropped
+    assert seeding.avoid_same_group(draw, {p: 0 for p in range(1, 6)}) == draw
+    # Top seeds 1 and 2 stay apart; their group mates 3 and 4 swap opponents
+    assert seeding.avoid_same_group([(1, 3), (4, 2)], {1: 0, 3: 0, 2: 1, 4: 1}, {1: 0, 2: 1, 3: 2, 4: 3}) == [(1, 4), (3, 2)]
@@ -0,0 +1,40 @@
+import pytest
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from app.database import Base
+from app import startup
+
+
+def test_schema_revision_is_the_alembic_head():
+    scripts = ScriptDirectory.from_config(Config("alembic.ini"))
+    assert scripts.get_current_head() == startup.SCHEMA_REVISION
+
+
+async def table_names(engine):
+    async with engine.connect() as conn:
+        return await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+
+
+@pytest.mark.asyncio
+async def test_create_and_skip_modes(empty_engine):
+    await startup.prepare_schema(empty_engine, Base.metadata, startup.SKIP)
+    assert await table_names(empty_engine) == []
+
+    await startup.prepare_schema(empty_engine, Base.metadata, startup.CREATE)
+    assert "matches" in await table_names(empty_engine)
+
+
+@pytest.mark.asyncio
+async def test_verify_mode_checks_the_alembic_version(empty_engine):
+    async with empty_engine.begin() as conn:
+        await conn.exec_driver_sql("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)")
+        await conn.exec_driver_sql("INSERT INTO alembic_version VALUES ('0007')")
+    with pytest.raises(RuntimeError, match="expects"):
+        await startup.prepare_schema(empty_engine, Base.metadata, startup.VERIFY)
+
+    async with empty_engine.begin() as conn:
+        await conn.exec_driver_sql(f"UPDATE alembic_version SET version_num = '{startup.SCHEMA_REVISION}'")
+    await startup.prepare_schema(empty_engine, Base.metadata, startup.VERIFY)
+    # verify never creates anything
+    assert await table_names(empty_engine) == ["alembic_version"]
@@ -0,0 +1,73 @@
+import pytest
+
+
+@pytest.fixture
+def tournament(api):
+    for name in "ABCD":
+        api.post("/players/", json={"name": name})
+    response = api.post("/tournaments/", json={
+        "name": "Club Open", "date": "2025-01-01", "num_groups": 1,
+        "players_per_group_advancing": 2, "player_ids": [1, 2, 3, 4],
+    })
+    return response.json()["tournament_id"]
+
+
+def details(api, tournament_id, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return api.get(f"/tournaments/{tournament_id}/details", headers=headers)
+
+
+def test_matching_etag_gets_304_with_an_empty_body(api, tournament):
+    first = details(api, tournament)
+    etag = first.headers["ETag"]
+
+    cached = details(api, tournament, etag)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    assert details(api, tournament, f'W/{etag}, "other"').status_code == 304
+
+    other = details(api, tournament, '"0-stale"')
+    assert other.status_code == 200
+    assert other.content == first.content
+
+
+def test_result_submission_is_never_served_stale(api, tournament):
+    before = details(api, tournament)
+    match = before.json()["group_matches"][0]
+    api.post(f"/tournaments/matches/{match['id']}/result", json={
+        "player1_id": match["player1_id"], "player2_id": match["player2_id"],
+        "player1_score": 1, "player2_score": 0, "winner_id": match["player1_id"],
+        "sets": [{"set_number": 1, "player1_score": 11, "player2_score": 5}],
+    })
+
+    after = details(api, tournament, before.headers["ETag"])
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert after.json()["group_matches"][0]["winner_id"] == match["player1_id"]
+
+
+def test_player_rename_is_never_served_stale(api, tournament):
+    before = details(api, tournament)
+    assert "Zed" not in before.text
+    assert api.patch("/players/1", json={"name": "Zed"}).status_code == 200
+
+    after = details(api, tournament, before.headers["ETag"])
+    assert after.status_code == 200
+    assert "Zed" in after.text
+
+
+def test_reset_is_never_served_stale(api, tournament):
+    match = details(api, tournament).json()["group_matches"][0]
+    api.post(f"/tournaments/matches/{match['id']}/result", json={
+        "player1_id": match["player1_id"], "player2_id": match["player2_id"],
+        "player1_score": 1, "player2_score": 0, "winner_id": match["player1_id"],
+        "sets": [{"set_number": 1, "player1_score": 11, "player2_score": 5}],
+    })
+    played = details(api, tournament)
+    assert any(m["winner_id"] for m in played.json()["group_matches"])
+
+    assert api.post(f"/tournaments/{tournament}/reset").status_code == 200
+    after = details(api, tournament, played.headers["ETag"])
+    assert after.status_code == 200
+    assert not any(m["winner_id"] for m in after.json()["group_matches"])
@@ -0,0 +1,88 @@
+from datetime import date
+import pytest
+import pytest_asyncio
+from sqlalchemy import update
+from app.models import Player, Tournament, Match, TournamentProgress
+from app import tournament_progress
+
+
+@pytest_asyncio.fixture
+async def session(session):
+    session.add_all([Player(id=i, name=f"P{i}") for i in (1, 2, 3)])
+    session.add(Tournament(id=1, name="T", date=date(2025, 1, 1), created_at=date(2025, 1, 1), num_players=3, num_groups=1))
+    session.add_all([
+        Match(id=1, tournament_id=1, player1_id=1, player2_id=2, stage="group"),
+        Match(id=2, tournament_id=1, player1_id=1, player2_id=3, stage="group", winner_id=1),
+        Match(id=3, tournament_id=1, player1_id=2, player2_id=3, stage="group"),
+    ])
+    await session.commit()
+    return session
+
+
+@pytest.mark.asyncio
+async def test_load_backfills_missing_row(session):
+    progress = await tournament_progress.load(session, 1)
+    assert (progress.group_total, progress.group_completed) == (3, 1)
+    assert (progress.knockout_total, progress.knockout_generated) == (0, False)
+
+
+@pytest.mark.asyncio
+async def test_record_result_counts_first_results_only(session):
+    await tournament_progress.recount(session, 1)
+    await session.commit()
+
+    for match_id, was_completed in ((1, False), (2, True), (3, False)):
+        await session.execute(update(Match).where(Match.id == match_id).values(winner_id=2))
+        await tournament_progress.record_result(session, 1, "group", was_completed)
+    await tournament_progress.record_result(session, 1, None, False)
+    await session.commit()
+
+    progress = await tournament_progress.load(session, 1)
+    assert (progress.group_total, progress.group_completed) == (3, 3)
+    assert tournament_progress.groups_complete(progress)
+    assert not progress.knockout_generated
+
+
+@pytest.mark.asyncio
+async def test_recount_picks_up_knockout_matches(session):
+    session.add(Match(tournament_id=1, player1_id=1, player2_id=None, winner_id=1, stage="knockout"))
+    progress = await tournament_progress.recount(session, 1)
+    assert (progress.knockout_total, progress.knockout_completed, progress.knockout_generated) == (1, 1, True)
+    assert await session.get(TournamentProgress, 1) is progress
+
+
+def test_last_group_result_and_knockout_stage_commit_together(api, monkeypatch):
+    from app import bracket
+
+    for name in "ABC":
+        api.post("/players/", json={"name": name})
+    tournament_id = api.post("/tournaments/", json={
+        "name": "Club Open", "date": "2025-01-01", "num_groups": 1,
+        "players_per_group_advancing": 2, "player_ids": [1, 2, 3],
+    }).json()["tournament_id"]
+    group_matches = api.get(f"/tournaments/{tournament_id}/details").json()["group_matches"]
+
+    def submit(match):
+        return api.post(f"/tournaments/matches/{match['id']}/result", json={
+            "player1_id": match["player1_id"], "player2_id": match["player2_id"],
+            "player1_score": 1, "player2_score": 0, "winner_id": match["player1_id"],
+            "sets": [{"set_number": 1, "player1_score": 11, "player2_score": 5}],
+        })
+
+    for match in group_matches[:-1]:
+        assert submit(match).status_code == 200
+
+    # A crash while building the bracket must take the last group result down with it
+    def crash(*args):
+        raise RuntimeError("worker died")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(bracket, "build", crash)
+        with pytest.raises(RuntimeError):
+            submit(group_matches[-1])
+    details = api.get(f"/tournaments/{tournament_id}/details").json()
+    assert details["group_matches"][-1]["winner_id"] is None
+    assert details["knockout_matches"] == []
+
+    assert submit(group_matches[-1]).status_code == 200
+    assert api.get(f"/tournaments/{tournament_id}/details").json()["knockout_matches"]
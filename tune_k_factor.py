@@ -0,0 +1,122 @@
+"""Replay the match history under candidate K-factor schedules and rank them by predictive accuracy.
+
+    python tune_k_factor.py --db sqlite+aiosqlite:///snapshot.db --save-dump history.npz
+    python tune_k_factor.py --dump history.npz --thresholds "10,200;20,100" --values "40,24,16;32,24,16;32,20,12"
+
+Never point --db at production: load a snapshot once, save it with --save-dump and tune from the file.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# app.database builds an engine at import time; the tuner only uses the engine it creates itself
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from app.elo import K_THRESHOLDS, K_VALUES
+from app.rating_replay import replay_elo, dependency_levels, prediction_scores, INITIAL_RATING
+
+DEFAULT_THRESHOLDS = [(10, 200), (20, 100), (30, 300), (10, 50)]
+DEFAULT_VALUES = [(40, 24, 16), (32, 24, 16), (40, 32, 20), (32, 20, 12), (48, 32, 24), (24, 20, 16)]
+
+_history = None
+_levels = None
+
+
+async def load_from_database(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+    from app.rating_replay import load_match_history
+
+    engine = create_async_engine(url)
+    try:
+        async with AsyncSession(engine) as session:
+            history, _ = await load_match_history(session)
+    finally:
+        await engine.dispose()
+    return history
+
+
+def load_history(args):
+    if args.dump:
+        with np.load(args.dump) as data:
+            return data["history"]
+    return asyncio.run(load_from_database(args.db))
+
+
+def _init_worker(history):
+    # Each worker receives the columnar history once instead of once per schedule, and the
+    # match ordering doesn't depend on K so its dependency levels are computed once too
+    global _history, _levels
+    _history = history
+    _levels = dependency_levels(history[:, 1], history[:, 2])
+
+
+def evaluate(schedule, initial_rating=INITIAL_RATING, skip=0):
+    thresholds, values = schedule
+    history = _history
+    num_slots = int(history[:, 1:3].max()) + 1 if len(history) else 1
+    _, _, changes = replay_elo(
+        history[:, 1], history[:, 2], history[:, 3], num_slots,
+        initial_rating=initial_rating, k_thresholds=thresholds, k_values=values,
+        return_history=True, levels=_levels,
+    )
+    log_loss, brier = prediction_scores(changes["before"], history[:, 1], history[:, 3], skip=skip)
+    return thresholds, values, log_loss, brier
+
+
+def parse_schedules(text):
+    return [tuple(int(n) for n in item.split(",") if n.strip()) for item in text.split(";") if item.strip()]
+
+
+def candidate_schedules(thresholds, values):
+    for t, v in itertools.product(thresholds, values):
+        if len(v) == len(t) + 1 and list(t) == sorted(t):
+            yield t, v
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--db", help="SQLAlchemy async URL of a database snapshot, e.g. sqlite+aiosqlite:///snapshot.db")
+    source.add_argument("--dump", help=".npz file written by --save-dump")
+    parser.add_argument("--save-dump", help="write the loaded history to this .npz file")
+    parser.add_argument("--thresholds", help='game-count thresholds, e.g. "10,200;20,100"')
+    parser.add_argument("--values", help='K values (one more than thresholds), e.g. "40,24,16;32,24,16"')
+    parser.add_argument("--skip", type=int, default=0, help="don't score the first N matches (ratings still settling)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="process pool size")
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    history = load_history(args)
+    print(f"📥 Loaded {len(history)} matches in {time.perf_counter() - start:.2f}s")
+    if args.save_dump:
+        np.savez_compressed(args.save_dump, history=history)
+        print(f"💾 Saved history to {args.save_dump}")
+    if len(history) == 0:
+        return
+
+    thresholds = parse_schedules(args.thresholds) if args.thresholds else DEFAULT_THRESHOLDS
+    values = parse_schedules(args.values) if args.values else DEFAULT_VALUES
+    schedules = list(dict.fromkeys(candidate_schedules(thresholds, values)))
+    if (K_THRESHOLDS, K_VALUES) not in schedules:
+        schedules.insert(0, (K_THRESHOLDS, K_VALUES))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(history,)) as pool:
+        results = list(pool.map(evaluate, schedules, itertools.repeat(INITIAL_RATING), itertools.repeat(args.skip)))
+    print(f"🔁 Replayed {len(schedules)} schedules in {time.perf_counter() - start:.2f}s")
+
+    results.sort(key=lambda r: r[2])
+    print(f"{'thresholds':>14} {'K values':>14} {'log-loss':>10} {'brier':>8}")
+    for t, v, log_loss, brier in results[:args.top]:
+        current = "  ← current" if (t, v) == (K_THRESHOLDS, K_VALUES) else ""
+        print(f"{','.join(map(str, t)):>14} {','.join(map(str, v)):>14} {log_loss:>10.5f} {brier:>8.5f}{current}")
+
+
+if __name__ == "__main__":
+    main()